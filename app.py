@@ -1,9 +1,11 @@
 import streamlit as st
 from github import Github
+from github_sync import GITHUB_REPO_NAME, start_github_sync
 from config import DataManager
 from tab_work_log import WorkLogTab
 from tab_cs_check import CSCheckSheetTab
 from tab_equipment_data import EquipmentDataTab
+from tab_fleet_compare import FleetCompareTab
 from tab_ecn_stn import ECNSTNTab
 from tab_jam_log import JamLogTab
 
@@ -28,7 +30,9 @@ def init_connections():
             g = Github(st.secrets["GITHUB_TOKEN"])
         else:
             g = Github()
-        repo = g.get_repo("saltlightchoi/my-work-log") 
+        repo = g.get_repo(GITHUB_REPO_NAME) 
+        # ★ 저장소 data/ 폴더(라인 팀 월간 보고서)를 백그라운드에서 증분 동기화 → 장비가동데이터 화면에 자동 반영 (github_sync.py)
+        start_github_sync(repo)
     except Exception:
         repo = None
     
@@ -117,6 +121,7 @@ menu_options = [
     "📝 팀 업무일지 대시보드", 
     "✅ 장비 제작 Flow 전체 현황판", 
     "📊 장비가동데이터", 
+    "🏭 SLH1 전 호기 비교", 
     "🛠️ ECN & STN (장비 파트 및 수정사항 관리)", 
     "🚨 Jam & 트러블슈팅 이력"
 ]
@@ -148,6 +153,9 @@ elif menu == "✅ 장비 제작 Flow 전체 현황판":
 elif menu == "📊 장비가동데이터":
     tab = EquipmentDataTab(db_jam_log) # <- 수정: Jam 시트 데이터를 넘겨줌
     tab.render()
+elif menu == "🏭 SLH1 전 호기 비교":
+    tab = FleetCompareTab(db_jam_log)
+    tab.render()
 elif menu == "🛠️ ECN & STN (장비 파트 및 수정사항 관리)":
     tab = ECNSTNTab(db_ecn)
     tab.render()
@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from metrics import labels
+
+
+# ========================================================
+# 📉 긴 조회 기간용 그래프 그리기 (자동 집계 단위 / LTTB 축소 / WebGL / 라벨 생략)
+# ========================================================
+# - 조회 기간이 길면 일별 대신 주간/월간으로 묶어서 그립니다 (auto_freq).
+# - 그래도 점이 CHART_POINT_BUDGET 보다 많으면 LTTB(Largest-Triangle-Three-Buckets)로 줄입니다.
+#   구간마다 "앞뒤 점과 만드는 삼각형이 가장 큰 점"을 고르므로 봉우리/골(Jam 급증일 등)이 사라지지 않습니다.
+#   막대는 줄이지 않습니다. 막대를 골라내면 그 날/주가 통째로 빠져 보이므로(선은 이어져서 티가 안 남) 집계 단위(auto_freq)로만 개수를 줄입니다.
+# - 점이 GL_MIN_POINTS 이상인 선은 SVG(Scatter) 대신 WebGL(Scattergl)로 그립니다.
+# - 점 위 숫자 라벨(<b>1,234</b>)은 점이 LABEL_MAX_POINTS 이하일 때만 붙입니다 (그 외에는 마우스를 올리면 보임).
+#   라벨이 붙는 짧은 구간은 지금처럼 날짜 글자 축(category), 긴 구간은 날짜 축(date)을 씁니다.
+# - 실행하면 30일 / 1년 / 3년 구간의 그래프 생성 시간과 전송 크기를 기존 방식과 비교합니다:  python charts.py
+CHART_POINT_BUDGET = 500
+GL_MIN_POINTS = 200
+LABEL_MAX_POINTS = 62
+AUTO_FREQ_DAYS = [("D", 92), ("W", 731)]  # 92일 이하 일별, 2년 이하 주간, 그 이상 월간
+FREQ_LABELS = {"D": "일별", "W": "주간", "M": "월간"}
+
+
+def auto_freq(start, end):
+    """조회 기간 길이에 맞는 집계 단위 ("D" / "W" / "M")"""
+    days = (pd.Timestamp(end) - pd.Timestamp(start)).days + 1
+    for freq, limit in AUTO_FREQ_DAYS:
+        if days <= limit:
+            return freq
+    return "M"
+
+
+def lttb(values, budget=CHART_POINT_BUDGET):
+    """등간격 계열 values 에서 남길 점의 위치 배열 (처음/끝 점 포함, budget 개 이하)"""
+    y = np.asarray(values, dtype=np.float64)
+    n = len(y)
+    if n <= budget or budget < 3:
+        return np.arange(n)
+    # 첫 점과 끝 점을 뺀 나머지를 budget - 2 개 구간으로 나눕니다.
+    bounds = (np.arange(budget - 1) * ((n - 2) / (budget - 2))).astype(np.int64) + 1
+    bounds[-1] = n - 1
+    # 다음 구간의 평균점은 누적합으로 한 번에 구하고, 구간 안의 비교는 (구간이 작으므로) 파이썬 숫자로 합니다.
+    y = np.nan_to_num(y)
+    cum = np.concatenate([[0.0], np.cumsum(y)])
+    nxt_lo, nxt_hi = bounds[1:], np.append(bounds[2:], n)
+    c_xs = ((nxt_lo + nxt_hi - 1) / 2).tolist()
+    c_ys = ((cum[nxt_hi] - cum[nxt_lo]) / (nxt_hi - nxt_lo)).tolist()
+    values, bounds = y.tolist(), bounds.tolist()
+    keep = [0]
+    a = 0
+    for i in range(budget - 2):
+        a_y, c_x, c_y = values[a], c_xs[i], c_ys[i]
+        best, best_area = bounds[i], -1.0
+        for j in range(bounds[i], bounds[i + 1]):
+            area = abs((a - c_x) * (values[j] - a_y) - (a - j) * (c_y - a_y))
+            if area > best_area:
+                best, best_area = j, area
+        keep.append(best)
+        a = best
+    keep.append(n - 1)
+    return np.array(keep, dtype=np.int64)
+
+
+def x_axis(table, freq):
+    """지표 표(reliability 결과) → (x 값, update_xaxes 인자)"""
+    if len(table) <= LABEL_MAX_POINTS:
+        fmt = "%Y-%m" if freq == "M" else "%m/%d"
+        return table["Date"].dt.strftime(fmt).tolist(), dict(type="category")
+    return table["Date"].to_numpy(), dict(type="date")
+
+
+def line_trace(x, y, name, decimals=0, textposition="top left", **kwargs):
+    """선 그래프 trace (점 수에 따라 LTTB 축소 / Scattergl / 라벨 여부를 정함)"""
+    x, y = np.asarray(x), np.asarray(y, dtype=np.float64)
+    keep = lttb(y)
+    x, y = x[keep], y[keep]
+    trace = go.Scattergl if len(y) >= GL_MIN_POINTS else go.Scatter
+    if len(y) <= LABEL_MAX_POINTS:
+        return trace(x=x, y=y, name=name, mode="lines+markers+text", text=labels(y, decimals),
+                     textposition=textposition, textfont=dict(size=12), **kwargs)
+    return trace(x=x, y=y, name=name, mode="lines", **kwargs)
+
+
+def bar_trace(x, y, name, decimals=0, **kwargs):
+    """막대 그래프 trace (모든 막대를 그리고 라벨 여부만 정함. WebGL 막대가 없고, 막대는 골라내면 데이터가 빠지므로 축소하지 않음)"""
+    x, y = np.asarray(x), np.asarray(y, dtype=np.float64)
+    if len(y) <= LABEL_MAX_POINTS:
+        return go.Bar(x=x, y=y, name=name, text=labels(y, decimals), textposition="outside",
+                      textfont=dict(size=12), **kwargs)
+    return go.Bar(x=x, y=y, name=name, **kwargs)
+
+
+# ========================================================
+# ⏱️ 벤치마크: 기존 그래프(전 구간 일별 + 모든 점 라벨 + SVG) vs 이 모듈
+# ========================================================
+_SERIES = [("Totalunit", 0, False), ("Errorcount", 0, False), ("PPJ", 0, False), ("Cum_PPJ", 0, False),
+           ("MTBA", 0, True), ("MTTR", 0, True), ("MTBI", 0, True),
+           ("MTBA_cum_avg", 1, False), ("MTTR_cum_avg", 1, False), ("MTBI_cum_avg", 1, False)]
+
+
+def _old_figure(table):
+    fig = go.Figure()
+    x = table["Date"].dt.strftime("%m/%d")
+    for col, decimals, is_bar in _SERIES:
+        if is_bar:
+            fig.add_trace(go.Bar(x=x, y=table[col], name=col, text=labels(table[col], decimals), textposition="outside"))
+        else:
+            fig.add_trace(go.Scatter(x=x, y=table[col], name=col, mode="lines+markers+text",
+                                     text=labels(table[col], decimals), textposition="top left"))
+    fig.update_xaxes(type="category")
+    return fig
+
+
+def _new_figure(table, freq):
+    fig = go.Figure()
+    x, axis = x_axis(table, freq)
+    for col, decimals, is_bar in _SERIES:
+        make = bar_trace if is_bar else line_trace
+        fig.add_trace(make(x, table[col], col, decimals))
+    fig.update_xaxes(**axis)
+    return fig
+
+
+def _summary(fig):
+    points = sum(len(t.x) for t in fig.data)
+    texts = sum(len(t.text) for t in fig.data if t.text is not None)
+    gl = sum(t.type == "scattergl" for t in fig.data)
+    return points, texts, gl
+
+
+def benchmark(ranges=(30, 365, 3 * 365), repeat=3):
+    import time
+    from metrics import _synthetic_cube, daily_table, reliability
+
+    def best(fn):
+        times = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - started)
+        return min(times), result
+
+    for days in ranges:
+        cube, start, end = _synthetic_cube(["SLH1 #1"], days)
+        cube = cube.drop(columns="장비")
+        daily = daily_table(cube, start, end)
+        freq = auto_freq(start, end)
+        t_old, payload_old = best(lambda: _old_figure(reliability(daily)).to_json())
+        t_new, payload_new = best(lambda: _new_figure(reliability(daily, freq=freq), freq).to_json())
+        t_forced, payload_forced = best(lambda: _new_figure(reliability(daily), "D").to_json())
+        old_summary = _summary(_old_figure(reliability(daily)))
+        new_summary = _summary(_new_figure(reliability(daily, freq=freq), freq))
+        forced_summary = _summary(_new_figure(reliability(daily), "D"))
+        print(f"{days:,}일 (그래프 계열 {len(_SERIES)}개)")
+        for title, t, payload, (points, texts, gl) in (
+            ("기존 (일별, 전체 라벨, SVG)", t_old, payload_old, old_summary),
+            (f"자동 ({FREQ_LABELS[freq]})", t_new, payload_new, new_summary),
+            ("일별 고정 (LTTB / WebGL)", t_forced, payload_forced, forced_summary),
+        ):
+            print(f"  {title:<28}: 생성+직렬화 {t * 1000:6.1f} ms, 전송 {len(payload) / 1024:7.1f} KB, "
+                  f"점 {points:6,}개, 라벨 {texts:6,}개, WebGL 계열 {gl}개")
+
+
+if __name__ == "__main__":
+    benchmark()
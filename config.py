@@ -4,6 +4,16 @@ from oauth2client.service_account import ServiceAccountCredentials
 import os
 import streamlit as st
 import json
+import threading
+import uuid
+import hashlib
+import time
+import random
+import datetime
+from collections import Counter, OrderedDict
+from sheet_mirror import SheetMirror
+from storage import LocalBackend, LatencyBackend
+from schema import JAM_SCHEMA, register_schema, get_schema
 
 
 # ========================================================
@@ -13,6 +23,10 @@ BASE_PATH_RAW = r"\\192.168.0.100\500 생산\550 국내CS\공유사진\\"
 
 EQUIPMENT_OPTIONS = ["SLH1", "4010H", "3208H", "3208AT", "3208M", "3208C", "32CM", "32XM", "ADC200", "ADC300", "ADC400", "AH5200", "AM5"]
 
+# Jam 스프레드시트의 SLH1 장비별 탭 이름
+JAM_SHEET_OPTIONS = ["SLH1 #1", "SLH1 #4", "SLH1 #5", "SLH1 #6", "SLH1 #7"]
+register_schema(JAM_SHEET_OPTIONS, JAM_SCHEMA)
+
 CS_TEMPLATE = [
     {"대항목": "공통", "순서": 1, "작업내용": "I/O Check\n- Out Put으로 동작 후 In Put LED 확인\n- Cylinder 정상 동작 확인\n- Manual에서 Cylinder 동작 후 LED 점등 확인\n- 미비된 부분 I/O List, PC에 저장 후 전장 수정 요청 진행\n- 전장 수정 후 수정되었는지 동작, LED 확인", "상태": "⬜ 대기", "비고": "", "첨부": ""},
     {"대항목": "공통", "순서": 2, "작업내용": "공압 Leak Check", "상태": "⬜ 대기", "비고": "", "첨부": ""},
@@ -58,43 +72,1283 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CREDS_FILE = os.path.join(BASE_DIR, 'service-account.json')
 SCOPE = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
 
+# ★ 프로세스 전체가 공유하는 gspread 클라이언트 & 워크시트 핸들 풀
+#   - 인증(authorize)은 프로세스당 1번, HTTP 세션도 하나만 재사용합니다.
+#   - (spreadsheet_id, sheet_name) 별로 핸들을 보관해서 DataManager 를 새로 만들어도 네트워크 호출이 없습니다.
+#   - 토큰이 만료되면 클라이언트와 핸들을 통째로 다시 만듭니다.
+#   - 처음 여는 핸들(네트워크 호출)은 풀 전체 락 밖에서 키별 락으로 한 번만 엽니다. (느린 호출 하나가 다른 탭 조회를 막지 않음)
+class SheetClientPool:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._creds = None
+        self._client = None
+        self._spreadsheets = {}
+        self._worksheets = {}
+        self._open_locks = {}  # 핸들 키 → 여는 중 락
+        self._generation = 0  # 재인증/무효화마다 증가 (그 전에 열던 핸들은 보관하지 않음)
+
+    def _load_creds(self):
+        if os.path.exists(CREDS_FILE):
+            return ServiceAccountCredentials.from_json_keyfile_name(CREDS_FILE, SCOPE)
+        creds_dict = json.loads(st.secrets["GCP_CREDENTIALS"])
+        return ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, SCOPE)
+
+    def _token_expired(self):
+        return bool(getattr(self._creds, "access_token_expired", False))
+
+    def _authorize(self):
+        if self._creds is None:
+            self._creds = self._load_creds()
+        self._client = gspread.authorize(self._creds)
+        self._spreadsheets.clear()
+        self._worksheets.clear()
+        self._generation += 1
+
+    @property
+    def creds(self):
+        with self._lock:
+            if self._creds is None:
+                self._creds = self._load_creds()
+            return self._creds
+
+    def client(self):
+        with self._lock:
+            if self._client is None or self._token_expired():
+                self._authorize()
+            return self._client
+
+    def _open(self, cache, key, open_fn):
+        """cache 에 없으면 키별 락을 잡고 한 번만 열어서 넣습니다 (네트워크 호출 중에는 풀 전체 락을 잡지 않음)"""
+        with self._lock:
+            self.client()  # 토큰 만료 체크 (만료 시 핸들 캐시가 비워짐)
+            handle = cache.get(key)
+            if handle is not None:
+                return handle
+            open_lock = self._open_locks.setdefault((id(cache), key), threading.Lock())
+        with open_lock:
+            with self._lock:
+                handle = cache.get(key)
+                generation = self._generation
+            if handle is not None:
+                return handle  # 기다리는 동안 다른 스레드가 열었음
+            handle = open_fn()
+            with self._lock:
+                if self._generation == generation:
+                    cache[key] = handle
+            return handle
+
+    def spreadsheet(self, spreadsheet_id):
+        client = self.client()
+        return self._open(self._spreadsheets, spreadsheet_id,
+                          lambda: SHEETS_GOVERNOR.call(spreadsheet_id, lambda: client.open_by_key(spreadsheet_id)))
+
+    def worksheet(self, spreadsheet_id, sheet_name):
+        def _open_worksheet():
+            sh = self.spreadsheet(spreadsheet_id)
+            return SHEETS_GOVERNOR.call(spreadsheet_id, lambda: sh.worksheet(sheet_name))
+        return self._open(self._worksheets, (spreadsheet_id, sheet_name), _open_worksheet)
+
+    def invalidate(self, spreadsheet_id=None, sheet_name=None):
+        """핸들 캐시 비우기 (인자가 없으면 클라이언트까지 재인증)"""
+        with self._lock:
+            self._generation += 1
+            if spreadsheet_id is None:
+                self._client = None
+                self._spreadsheets.clear()
+                self._worksheets.clear()
+            elif sheet_name is None:
+                self._spreadsheets.pop(spreadsheet_id, None)
+                for key in [k for k in self._worksheets if k[0] == spreadsheet_id]:
+                    del self._worksheets[key]
+            else:
+                self._worksheets.pop((spreadsheet_id, sheet_name), None)
+
+
+SHEET_POOL = SheetClientPool()
+
+
+def _is_auth_error(e):
+    response = getattr(e, "response", None)
+    return getattr(response, "status_code", None) == 401
+
+
+# ★ Sheets API 호출 관리자 (프로세스 전체 공유)
+#   - 스프레드시트별 토큰 버킷으로 분당 호출 수를 제한합니다. (구글 읽기 할당량: 사용자당 분당 60회)
+#   - 429(할당량 초과) / 5xx 응답은 지수 백오프 + 지터로 다시 시도합니다.
+#   - 같은 읽기 요청이 동시에 들어오면 한 번만 보내고 결과를 나눠 씁니다 (single-flight).
+SHEETS_RATE_PER_MIN = 55
+SHEETS_BURST = 10
+SHEETS_MAX_RETRIES = 5
+SHEETS_BACKOFF_BASE_SEC = 1.0
+SHEETS_BACKOFF_MAX_SEC = 32.0
+
+
+def _api_status(e):
+    response = getattr(e, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def _is_retryable(e):
+    status = _api_status(e)
+    return status == 429 or (status is not None and status >= 500)
+
+
+class _TokenBucket:
+    def __init__(self, rate_per_sec, burst):
+        self.rate = rate_per_sec
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def reserve(self):
+        """토큰 1개를 예약하고, 토큰이 생길 때까지 기다려야 하는 시간(초)을 반환"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SheetsGovernor:
+    def __init__(self, rate_per_min=SHEETS_RATE_PER_MIN, burst=SHEETS_BURST, max_retries=SHEETS_MAX_RETRIES,
+                 backoff_base=SHEETS_BACKOFF_BASE_SEC, backoff_max=SHEETS_BACKOFF_MAX_SEC):
+        self.rate = rate_per_min / 60.0
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._flights = {}
+        self.stats = Counter()
+
+    def _acquire(self, spreadsheet_id):
+        with self._lock:
+            bucket = self._buckets.get(spreadsheet_id)
+            if bucket is None:
+                bucket = self._buckets[spreadsheet_id] = _TokenBucket(self.rate, self.burst)
+            wait = bucket.reserve()
+            self.stats["calls"] += 1
+            if wait > 0:
+                self.stats["throttled"] += 1
+                self.stats["throttled_ms"] += int(wait * 1000)
+        if wait > 0:
+            time.sleep(wait)
+
+    def _backoff(self, attempt):
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, delay)  # full jitter: 여러 세션이 같은 순간에 다시 몰리지 않도록
+
+    def _run(self, spreadsheet_id, fn, retry_5xx):
+        attempt = 0
+        while True:
+            self._acquire(spreadsheet_id)
+            try:
+                return fn()
+            except gspread.exceptions.APIError as e:
+                status = _api_status(e)
+                retryable = status == 429 or (retry_5xx and _is_retryable(e))
+                if not retryable or attempt >= self.max_retries:
+                    with self._lock:
+                        self.stats["failed"] += 1
+                    raise
+                with self._lock:
+                    self.stats["retried"] += 1
+                    self.stats[f"status_{status}"] += 1
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+
+    def call(self, spreadsheet_id, fn, key=None, retry_5xx=True):
+        """fn() 을 할당량 안에서 실행
+
+        key 를 주면(읽기 전용 호출) 같은 key 로 진행 중인 호출이 끝나길 기다렸다가 그 결과를 같이 씁니다.
+        append 처럼 다시 보내면 중복이 생길 수 있는 쓰기는 retry_5xx=False 로 429 만 재시도합니다.
+        """
+        if key is None:
+            return self._run(spreadsheet_id, fn, retry_5xx)
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.stats["coalesced"] += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._run(spreadsheet_id, fn, retry_5xx)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def snapshot(self):
+        """현재까지의 카운터 (calls / throttled / throttled_ms / coalesced / retried / failed / status_xxx)"""
+        with self._lock:
+            out = dict(self.stats)
+            out["in_flight"] = len(self._flights)
+        for name in ("calls", "throttled", "throttled_ms", "coalesced", "retried", "failed"):
+            out.setdefault(name, 0)
+        return out
+
+
+SHEETS_GOVERNOR = SheetsGovernor()
+
+
+def _last_update_time(spreadsheet_id):
+    """드라이브 파일 수정 시각 (여러 세션이 동시에 물어봐도 한 번만 호출)"""
+    return SHEETS_GOVERNOR.call(
+        spreadsheet_id, lambda: SHEET_POOL.spreadsheet(spreadsheet_id).get_lastUpdateTime(),
+        key=("mtime", spreadsheet_id)
+    )
+
+
+# ★ 읽기 캐시 설정
+#   - READ_CACHE_MAX_STALENESS_SEC 안에서는 네트워크 없이 메모리에서 바로 반환합니다.
+#   - 그 이후에는 변경 토큰(드라이브 modifiedTime)만 가볍게 확인하고, 바뀌었으면 다시 읽습니다.
+#   - READ_CACHE_TTL_SEC 가 지나면 토큰과 상관없이 무조건 다시 읽습니다.
+READ_CACHE_MAX_STALENESS_SEC = 30
+READ_CACHE_TTL_SEC = 600
+READ_CACHE_MAX_ENTRIES = 64
+READ_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+class _CacheEntry:
+    __slots__ = ("df", "snapshot", "token", "loaded_at", "checked_at", "nbytes", "typed")
+
+    def __init__(self, df, snapshot, token, now):
+        self.df = df
+        self.snapshot = snapshot
+        self.token = token
+        self.loaded_at = now
+        self.checked_at = now
+        # 원본 셀 값(snapshot)도 같이 보관하므로 대략 2배로 잡습니다.
+        self.nbytes = 2 * int(df.memory_usage(index=True, deep=True).sum())
+        self.typed = None  # 스키마대로 변환한 DataFrame (처음 요청할 때 한 번 만듦)
+
+
+class SheetReadCache:
+    """시트별 DataFrame 공유 캐시 (LRU + TTL + 변경 토큰 재검증)"""
+
+    def __init__(self, max_staleness=READ_CACHE_MAX_STALENESS_SEC, ttl=READ_CACHE_TTL_SEC,
+                 max_entries=READ_CACHE_MAX_ENTRIES, max_bytes=READ_CACHE_MAX_BYTES):
+        self.max_staleness = max_staleness
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._generations = {}
+        self.stats = {"hit": 0, "revalidated": 0, "miss": 0, "evicted": 0, "invalidated": 0}
+
+    def get(self, key, token_fn):
+        """캐시 항목(df, snapshot) 반환 (없거나 오래됐으면 None). token_fn 은 재검증이 필요할 때만 호출됩니다."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["miss"] += 1
+                return None
+            if now - entry.loaded_at > self.ttl:
+                self._drop(key)
+                self.stats["miss"] += 1
+                return None
+            if now - entry.checked_at <= self.max_staleness:
+                self._entries.move_to_end(key)
+                self.stats["hit"] += 1
+                return entry
+
+        # 신선도 한계를 넘긴 항목은 변경 토큰으로 재검증 (네트워크 호출은 락 밖에서)
+        try:
+            token = token_fn()
+        except Exception:
+            token = None
+
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not entry:
+                self.stats["miss"] += 1
+                return None
+            if token is None or token != entry.token:
+                self._drop(key)
+                self.stats["miss"] += 1
+                return None
+            entry.checked_at = now
+            self._entries.move_to_end(key)
+            self.stats["revalidated"] += 1
+            return entry
+
+    def generation(self, spreadsheet_id, sheet_name):
+        with self._lock:
+            return self._generations.get((spreadsheet_id, sheet_name), 0)
+
+    def put(self, key, df, snapshot, token, generation=None):
+        """캐시에 넣은 항목을 반환 (읽는 도중 저장이 있어 버렸으면 None)"""
+        entry = _CacheEntry(df, snapshot, token, time.monotonic())
+        with self._lock:
+            # 읽는 도중 같은 시트에 저장이 있었다면 방금 읽은 내용은 이미 낡은 것이므로 버립니다.
+            if generation is not None and generation != self._generations.get(key[:2], 0):
+                return None
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self._bytes += entry.nbytes
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                if oldest == key and len(self._entries) == 1:
+                    break
+                self._drop(oldest)
+                self.stats["evicted"] += 1
+        return entry
+
+    def peek_snapshot(self, spreadsheet_id, sheet_name):
+        """재검증 없이 해당 시트의 마지막 원본 셀 값과 그때의 변경 토큰 → (snapshot, token), 없으면 (None, None)
+
+        delta 저장 기준용이며, 쓰기 전에 토큰을 다시 확인해야 합니다 (DataManager.save).
+        """
+        with self._lock:
+            for key, entry in self._entries.items():
+                if key[0] == spreadsheet_id and key[1] == sheet_name:
+                    return entry.snapshot, entry.token
+        return None, None
+
+    def invalidate(self, spreadsheet_id, sheet_name=None):
+        """같은 프로세스에서 저장이 일어나면 해당 시트의 캐시(모든 변형)를 지웁니다."""
+        with self._lock:
+            if sheet_name is None:
+                for gen_key in [g for g in self._generations if g[0] == spreadsheet_id]:
+                    self._generations[gen_key] += 1
+            else:
+                gen_key = (spreadsheet_id, sheet_name)
+                self._generations[gen_key] = self._generations.get(gen_key, 0) + 1
+            for key in [k for k in self._entries if k[0] == spreadsheet_id and (sheet_name is None or k[1] == sheet_name)]:
+                self._drop(key)
+                self.stats["invalidated"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.nbytes
+
+
+READ_CACHE = SheetReadCache()
+
+
+# ★ delta 저장 설정: 바뀐 행이 이 비율을 넘으면 전체 덮어쓰기로 전환합니다.
+DELTA_FULL_REWRITE_RATIO = 0.5
+
+
+def _grid_to_frame(grid):
+    """get_values() 결과를 get_all_records() 와 같은 규칙(헤더 중복 검사, 숫자 변환)으로 DataFrame 으로 변환"""
+    if not grid or grid == [[]]:
+        return pd.DataFrame()
+    keys = grid[0]
+    dupes = [k for k, n in Counter(keys).items() if n > 1]
+    if dupes:
+        raise gspread.exceptions.GSpreadException(f"the header row in the worksheet contains duplicates: {dupes}")
+    values = [gspread.utils.numericise_all(row) for row in grid[1:]]
+    if not values:
+        return pd.DataFrame()
+    return pd.DataFrame(values, columns=keys)
+
+
+def _pad_grid(values):
+    """values API 응답(행마다 길이가 다름)을 get_values() 처럼 직사각형으로 채웁니다."""
+    if not values:
+        return [[]]
+    width = max(len(r) for r in values)
+    return [list(r) + [""] * (width - len(r)) for r in values]
+
+
+def _cell_value(v):
+    """시트로 보낼 값 정리 (NaN/None → 빈칸, numpy 스칼라 → 파이썬 값, 날짜 → 문자열)"""
+    if v is None:
+        return ""
+    if isinstance(v, float) and v != v:
+        return ""
+    if v is pd.NaT:
+        return ""
+    if hasattr(v, "item") and not isinstance(v, (str, bytes)):
+        v = v.item()
+    if isinstance(v, (pd.Timestamp, datetime.datetime, datetime.date, datetime.time)):
+        return str(v)
+    return v
+
+
+def _cell_text(v):
+    """시트에 표시되는 문자열 기준으로 비교하기 위한 정규화"""
+    if isinstance(v, bool):
+        return "TRUE" if v else "FALSE"
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+
+def _strip_blank_tail(cells):
+    cells = list(cells)
+    while cells and cells[-1] == "":
+        cells.pop()
+    return cells
+
+
+def _row_key(cells):
+    """행 내용 지문 (읽은 뒤 그 행이 바뀌거나 밀렸는지 확인용)"""
+    text = "\x1f".join(_strip_blank_tail([_cell_text(v) for v in cells]))
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _a1_block(row, col, values):
+    end_row = row + len(values) - 1
+    end_col = col + max(len(r) for r in values) - 1
+    return gspread.utils.rowcol_to_a1(row, col) + ":" + gspread.utils.rowcol_to_a1(end_row, end_col)
+
+
+def plan_sheet_write(old_grid, header, rows, full_ratio=DELTA_FULL_REWRITE_RATIO):
+    """이전 스냅샷과 비교해서 보낼 블록 목록 [(row, col, values), ...] 과 전체 덮어쓰기 여부를 반환
+
+    - 헤더가 바뀌었거나 스냅샷이 없으면 전체 덮어쓰기 (남는 꼬리 행/열은 빈칸으로 지움)
+    - 그 외에는 바뀐 행의 변경 구간, 추가된 행, 삭제된 꼬리 행만 보냅니다.
+    """
+    new_texts = [[_cell_text(v) for v in r] for r in rows]
+    old_rows = old_grid[1:] if old_grid else []
+    old_width = max((len(r) for r in old_grid), default=0) if old_grid else 0
+    width = len(header)
+
+    blocks = []
+    full = old_grid is None or _strip_blank_tail([_cell_text(v) for v in header]) != _strip_blank_tail(old_grid[0] if old_grid else [])
+
+    if not full:
+        common = min(len(old_rows), len(rows))
+        changed = []
+        for i in range(common):
+            old_row = old_rows[i]
+            new_row = new_texts[i]
+            diff_cols = [j for j in range(width) if (old_row[j] if j < len(old_row) else "") != new_row[j]]
+            diff_cols += [j for j in range(width, len(old_row)) if old_row[j] != ""]
+            if diff_cols:
+                changed.append((i, diff_cols[0], diff_cols[-1]))
+        if len(changed) > full_ratio * max(len(rows), 1):
+            full = True
+        else:
+            for i, first, last in changed:
+                values = [rows[i][j] if j < width else "" for j in range(first, last + 1)]
+                blocks.append((i + 2, first + 1, [values]))
+            if len(rows) > len(old_rows):
+                blocks.append((len(old_rows) + 2, 1, [list(r) for r in rows[len(old_rows):]]))
+
+    if full:
+        blocks = [(1, 1, [list(header)] + [list(r) for r in rows])] if width else []
+        if old_width > width:
+            # 헤더가 좁아졌으면 오른쪽에 남는 예전 열도 비웁니다.
+            blocks.append((1, width + 1, [[""] * (old_width - width) for _ in range(max(len(old_rows), len(rows)) + 1)]))
+
+    if len(old_rows) > len(rows) and max(old_width, width):
+        blocks.append((len(rows) + 2, 1, [[""] * max(old_width, width) for _ in range(len(old_rows) - len(rows))]))
+
+    return blocks, full
+
+
+# ★ 저장소 선택 (DataManager 가 실제로 셀을 읽고 쓰는 곳)
+#   - WORKLOG_STORAGE=sheets (기본값) : 구글 시트 (SHEET_POOL + SHEETS_GOVERNOR)
+#   - WORKLOG_STORAGE=local          : 로컬 SQLite 파일 (WORKLOG_LOCAL_DB), 처음 읽을 때 저장소의 CSV 로 채움
+#   - WORKLOG_LATENCY_MS="읽기ms,쓰기ms" 를 주면 어느 저장소든 호출마다 지연을 넣습니다 (예: "400,900")
+STORAGE_BACKEND = os.environ.get("WORKLOG_STORAGE", "sheets").strip().lower()
+LOCAL_STORE_DB = os.environ.get("WORKLOG_LOCAL_DB", os.path.join(BASE_DIR, ".local_store.sqlite"))
+LOCAL_STORE_SEEDS = {
+    "업무일지": [os.path.join(BASE_DIR, "data.csv"), os.path.join(BASE_DIR, "work_log.csv")],
+    "CS체크리스트": [os.path.join(BASE_DIR, "cs_flow_data.csv")],
+}
+STORAGE_LATENCY_MS = os.environ.get("WORKLOG_LATENCY_MS", "")
+
+
+class SheetsBackend:
+    """구글 시트 저장소 (인터페이스 설명은 storage.py 참고)"""
+
+    def _call(self, spreadsheet_id, sheet_name, fn, key=None, retry_5xx=True):
+        """워크시트 호출 래퍼: SHEETS_GOVERNOR 를 거쳐 호출하고, 401(토큰 만료)이면 핸들을 새로 받아 한 번 더 시도"""
+        run = lambda: fn(SHEET_POOL.worksheet(spreadsheet_id, sheet_name))
+        try:
+            return SHEETS_GOVERNOR.call(spreadsheet_id, run, key, retry_5xx)
+        except gspread.exceptions.APIError as e:
+            if not _is_auth_error(e):
+                raise
+            SHEET_POOL.invalidate()
+            return SHEETS_GOVERNOR.call(spreadsheet_id, run, key, retry_5xx)
+
+    def change_token(self, spreadsheet_id, sheet_name):
+        return _last_update_time(spreadsheet_id)
+
+    def read_grid(self, spreadsheet_id, sheet_name):
+        return self._call(spreadsheet_id, sheet_name, lambda ws: ws.get_values(), key=("values", spreadsheet_id, sheet_name))
+
+    def read_grids(self, spreadsheet_id, sheet_names):
+        """values_batch_get 한 번으로 여러 탭을 읽습니다."""
+        sheet_names = list(sheet_names)
+        ranges = ["'" + name.replace("'", "''") + "'" for name in sheet_names]
+        fetch = lambda: SHEET_POOL.spreadsheet(spreadsheet_id).values_batch_get(ranges)
+        flight_key = ("batch", spreadsheet_id, tuple(ranges))
+        try:
+            resp = SHEETS_GOVERNOR.call(spreadsheet_id, fetch, key=flight_key)
+        except gspread.exceptions.APIError as e:
+            if not _is_auth_error(e):
+                raise
+            SHEET_POOL.invalidate()
+            resp = SHEETS_GOVERNOR.call(spreadsheet_id, fetch, key=flight_key)
+        value_ranges = resp.get("valueRanges", [])
+        return {name: _pad_grid(vr.get("values", [])) for name, vr in zip(sheet_names, value_ranges)}
+
+    def read_header(self, spreadsheet_id, sheet_name):
+        return self._call(spreadsheet_id, sheet_name, lambda ws: ws.row_values(1), key=("header", spreadsheet_id, sheet_name))
+
+    def read_row(self, spreadsheet_id, sheet_name, row):
+        return self._call(spreadsheet_id, sheet_name, lambda ws: ws.row_values(row))
+
+    def read_rows(self, spreadsheet_id, sheet_name, start, end):
+        rows = self._call(spreadsheet_id, sheet_name, lambda ws: ws.get_values(f"{start}:{end}"))
+        # 끝쪽의 빈 행은 응답에서 빠지므로 행 수를 맞춥니다.
+        return [list(r) for r in rows] + [[] for _ in range(end - start + 1 - len(rows))]
+
+    def write_blocks(self, spreadsheet_id, sheet_name, blocks):
+        def _write(ws):
+            need_rows = max(r + len(v) - 1 for r, _, v in blocks)
+            need_cols = max(c + max(len(x) for x in v) - 1 for _, c, v in blocks)
+            if need_rows > ws.row_count:
+                ws.add_rows(need_rows - ws.row_count)
+            if need_cols > ws.col_count:
+                ws.add_cols(need_cols - ws.col_count)
+            ws.batch_update([{"range": _a1_block(r, c, v), "values": v} for r, c, v in blocks])
+        if blocks:
+            self._call(spreadsheet_id, sheet_name, _write)
+
+    def append_rows(self, spreadsheet_id, sheet_name, rows):
+        # append 는 다시 보내면 행이 중복될 수 있으므로 429 일 때만 재시도합니다.
+        self._call(spreadsheet_id, sheet_name, lambda ws: ws.append_rows(rows), retry_5xx=False)
+
+    def delete_rows(self, spreadsheet_id, sheet_name, start, end=None):
+        # 다시 보내면 아래 행까지 지워질 수 있으므로 429 일 때만 재시도합니다.
+        self._call(spreadsheet_id, sheet_name, lambda ws: ws.delete_rows(start, end), retry_5xx=False)
+
+    def delete_row_ranges(self, spreadsheet_id, sheet_name, ranges):
+        # 아래 구간부터 deleteDimension 을 이어 붙여 batch_update 1번으로 보냅니다 (위쪽 번호가 밀리지 않음).
+        def _delete(ws):
+            requests = [{"deleteDimension": {"range": {"sheetId": ws.id, "dimension": "ROWS",
+                                                       "startIndex": start - 1, "endIndex": end}}}
+                        for start, end in sorted(ranges, reverse=True)]
+            ws.spreadsheet.batch_update({"requests": requests})
+        if ranges:
+            self._call(spreadsheet_id, sheet_name, _delete, retry_5xx=False)
+
+    def ensure_sheet(self, spreadsheet_id, sheet_name):
+        try:
+            SHEET_POOL.worksheet(spreadsheet_id, sheet_name)
+        except gspread.exceptions.WorksheetNotFound:
+            sh = SHEET_POOL.spreadsheet(spreadsheet_id)
+            SHEETS_GOVERNOR.call(spreadsheet_id, lambda: sh.add_worksheet(sheet_name, rows=1000, cols=26), retry_5xx=False)
+            SHEET_POOL.invalidate(spreadsheet_id, sheet_name)
+
+
+def _make_storage():
+    if STORAGE_BACKEND == "local":
+        backend = LocalBackend(LOCAL_STORE_DB, LOCAL_STORE_SEEDS)
+    elif STORAGE_BACKEND == "sheets":
+        backend = SheetsBackend()
+    else:
+        raise ValueError(f"알 수 없는 WORKLOG_STORAGE 값입니다: {STORAGE_BACKEND} (sheets / local)")
+    if STORAGE_LATENCY_MS:
+        parts = [float(x) for x in STORAGE_LATENCY_MS.split(",")]
+        backend = LatencyBackend(backend, read_ms=parts[0], write_ms=parts[-1])
+    return backend
+
+
+STORAGE = _make_storage()
+
+
+# ★ 새 행 쓰기 지연(write-behind) 큐 설정
+#   - 새 Jam/업무일지 행을 워크시트별로 모았다가 append_rows 한 번으로 보냅니다.
+#   - APPEND_FLUSH_SEC 가 지나거나 APPEND_FLUSH_ROWS 만큼 쌓이면 전송합니다.
+#   - 전송 전 행은 저널 파일에 먼저 기록되어, 프로세스가 죽어도 다음 실행 때 다시 보냅니다.
+APPEND_FLUSH_SEC = 2.0
+APPEND_FLUSH_ROWS = 20
+APPEND_JOURNAL_FILE = os.environ.get("WORKLOG_APPEND_JOURNAL", os.path.join(BASE_DIR, ".append_journal.jsonl"))
+
+
+class AppendQueue:
+    """워크시트별 새 행 모음 전송 큐 (저널 기반 crash 복구 + 전송 상태 조회)"""
+
+    def __init__(self, journal_path=APPEND_JOURNAL_FILE, flush_sec=APPEND_FLUSH_SEC, flush_rows=APPEND_FLUSH_ROWS):
+        self.journal_path = journal_path
+        self.flush_sec = flush_sec
+        self.flush_rows = flush_rows
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._pending = OrderedDict()  # (spreadsheet_id, sheet_name) -> [(ticket, row, queued_at), ...]
+        self._status = {}              # ticket -> (상태, 메시지)
+        self._thread = None
+        self._replayed = False
+
+    # ---------- 저널 ----------
+    def _journal(self, record):
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _replay(self):
+        """이전 실행에서 전송되지 못한 행을 저널에서 다시 큐에 올립니다."""
+        self._replayed = True
+        if not os.path.exists(self.journal_path):
+            return
+        added, acked = OrderedDict(), set()
+        with open(self.journal_path, encoding="utf-8") as f:
+            lines = f.read().split("\n")
+        if lines[-1]:
+            # 기록 도중 죽어서 잘린 마지막 줄 뒤에 이어 쓰지 않도록 줄바꿈을 보충
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write("\n")
+        for line in lines:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue  # 빈 줄 또는 기록 도중 잘린 줄
+            if rec.get("op") == "add":
+                added[rec["ticket"]] = rec
+            elif rec.get("op") == "ack":
+                acked.update(rec.get("tickets", []))
+        now = time.monotonic()
+        for ticket, rec in added.items():
+            if ticket in acked:
+                continue
+            key = (rec["spreadsheet_id"], rec["sheet_name"])
+            self._pending.setdefault(key, []).append((ticket, rec["row"], now))
+            self._status[ticket] = ("pending", "이전 실행에서 복구됨")
+        if not any(self._pending.values()):
+            open(self.journal_path, "w").close()
+
+    def _ensure_started(self):
+        if not self._replayed:
+            self._replay()
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="sheet-append-queue", daemon=True)
+            self._thread.start()
+
+    # ---------- 공개 API ----------
+    def enqueue(self, spreadsheet_id, sheet_name, row):
+        """행(헤더 순서의 값 리스트)을 큐에 넣고 상태 조회용 티켓을 반환"""
+        ticket = uuid.uuid4().hex[:12]
+        key = (spreadsheet_id, sheet_name)
+        with self._cond:
+            self._ensure_started()
+            self._journal({"op": "add", "ticket": ticket, "spreadsheet_id": spreadsheet_id, "sheet_name": sheet_name, "row": row})
+            self._pending.setdefault(key, []).append((ticket, row, time.monotonic()))
+            self._status[ticket] = ("pending", "")
+            self._cond.notify()
+        return ticket
+
+    def status(self, ticket):
+        """(상태, 메시지) — 상태는 pending / retrying / done 중 하나"""
+        with self._cond:
+            return self._status.get(ticket, ("unknown", ""))
+
+    def pending_rows(self, spreadsheet_id, sheet_name):
+        with self._cond:
+            if not self._replayed:
+                self._ensure_started()
+            return [row for _, row, _ in self._pending.get((spreadsheet_id, sheet_name), [])]
+
+    def flush(self, spreadsheet_id=None, sheet_name=None):
+        """대기 중인 행을 즉시 전송하고, 전송된 행 목록을 반환 (인자로 시트를 좁힐 수 있음)"""
+        with self._cond:
+            if not self._replayed:
+                self._ensure_started()
+            keys = [k for k in self._pending if (spreadsheet_id is None or k[0] == spreadsheet_id) and (sheet_name is None or k[1] == sheet_name)]
+        flushed = []
+        for key in keys:
+            flushed += self._flush_key(key)
+        return flushed
+
+    # ---------- 내부 ----------
+    def _flush_key(self, key):
+        with self._flush_lock:
+            with self._cond:
+                items = list(self._pending.get(key, []))
+            if not items:
+                return []
+            rows = [row for _, row, _ in items]
+            tickets = [t for t, _, _ in items]
+            try:
+                STORAGE.append_rows(*key, rows)
+            except Exception as e:
+                if _is_auth_error(e):
+                    SHEET_POOL.invalidate()
+                with self._cond:
+                    for t in tickets:
+                        self._status[t] = ("retrying", str(e))
+                return []
+            with self._cond:
+                remaining = self._pending.get(key, [])[len(items):]
+                if remaining:
+                    self._pending[key] = remaining
+                else:
+                    self._pending.pop(key, None)
+                for t in tickets:
+                    self._status[t] = ("done", "")
+                self._journal({"op": "ack", "tickets": tickets})
+                if not self._pending:
+                    open(self.journal_path, "w").close()  # 모두 전송됐으면 저널 비우기
+            # 시트(원본)에는 이미 들어갔으므로 미러 쪽 실패로 다시 보내지 않습니다.
+            _mirror_append(*key, rows)
+            READ_CACHE.invalidate(*key)
+            return rows
+
+    def _due_keys(self):
+        now = time.monotonic()
+        return [k for k, items in self._pending.items()
+                if items and (len(items) >= self.flush_rows or now - items[0][2] >= self.flush_sec)]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._due_keys():
+                    self._cond.wait(timeout=self.flush_sec if self._pending else None)
+                keys = self._due_keys()
+            for key in keys:
+                if not self._flush_key(key):
+                    time.sleep(self.flush_sec)  # 실패 시 잠깐 쉬고 다음 주기에 재시도
+
+
+APPEND_QUEUE = AppendQueue()
+
+
+# ★ 새 행 추가 알림 (enqueue_row / save_new_row 로 행이 추가될 때마다 호출)
+#   - fn(spreadsheet_id, sheet_name, {컬럼: 값}) 형태. 시트 전체를 다시 읽지 않고 상태를 갱신하는 모듈(spc.py 등)이 등록합니다.
+#   - 알림 쪽 오류는 저장에 영향을 주지 않도록 무시합니다.
+APPEND_LISTENERS = []
+
+
+def add_append_listener(fn):
+    if fn not in APPEND_LISTENERS:
+        APPEND_LISTENERS.append(fn)
+
+
+def _notify_append(spreadsheet_id, sheet_name, record):
+    for fn in list(APPEND_LISTENERS):
+        try:
+            fn(spreadsheet_id, sheet_name, record)
+        except Exception:
+            pass
+
+
+# ★ 기존 행 수정/삭제 알림 (update_row / delete_row / save 로 이미 있던 행이 바뀔 때마다 호출)
+#   - fn(spreadsheet_id, sheet_name) 형태. 새 행만 더해 가는 상태(spc.py 등)를 다음 조회 때 다시 만들도록 표시하는 용도입니다.
+CHANGE_LISTENERS = []
+
+
+def add_change_listener(fn):
+    if fn not in CHANGE_LISTENERS:
+        CHANGE_LISTENERS.append(fn)
+
+
+def _notify_change(spreadsheet_id, sheet_name):
+    for fn in list(CHANGE_LISTENERS):
+        try:
+            fn(spreadsheet_id, sheet_name)
+        except Exception:
+            pass
+
+
+# ★ 로컬 SQLite 미러 (선택 사항)
+#   - WORKLOG_MIRROR_DB 환경변수에 파일 경로를 지정하면 켜집니다. (비워두면 기존처럼 시트에서 바로 읽음)
+#   - 한 번 읽은 워크시트는 백그라운드에서 MIRROR_SYNC_SEC 마다 변경 여부를 확인하고 바뀐 행만 반영합니다.
+#   - 탭의 모든 읽기는 미러에서, 쓰기는 시트와 미러에 같이 반영됩니다.
+#   - 구글 시트 저장소(WORKLOG_STORAGE=sheets)일 때만 의미가 있습니다.
+MIRROR_DB_PATH = os.environ.get("WORKLOG_MIRROR_DB", "")
+MIRROR_SYNC_SEC = 15
+
+SHEET_MIRROR = SheetMirror(MIRROR_DB_PATH) if MIRROR_DB_PATH and STORAGE_BACKEND == "sheets" else None
+
+
+class MirrorSyncer:
+    """미러에 올라간 워크시트를 주기적으로 시트와 맞추는 백그라운드 작업"""
+
+    def __init__(self, mirror, interval=MIRROR_SYNC_SEC):
+        self.mirror = mirror
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._watched = set()
+        self._tokens = {}
+        self._thread = None
+
+    def watch(self, spreadsheet_id, sheet_name):
+        """동기화 대상에 추가 (이번 프로세스에서 처음 등록된 시트면 True)"""
+        with self._lock:
+            is_new = (spreadsheet_id, sheet_name) not in self._watched
+            self._watched.add((spreadsheet_id, sheet_name))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="sheet-mirror-sync", daemon=True)
+                self._thread.start()
+        return is_new
+
+    def sync_sheet(self, spreadsheet_id, sheet_name):
+        """시트 1개를 지금 바로 동기화하고 바뀐 행 수를 반환"""
+        grid = STORAGE.read_grid(spreadsheet_id, sheet_name)
+        changed = self.mirror.apply_grid(spreadsheet_id, sheet_name, grid)
+        if changed:
+            READ_CACHE.invalidate(spreadsheet_id, sheet_name)
+        return changed
+
+    def sync_once(self):
+        with self._lock:
+            watched = sorted(self._watched)
+        by_spreadsheet = {}
+        for sid, name in watched:
+            by_spreadsheet.setdefault(sid, []).append(name)
+        for sid, names in by_spreadsheet.items():
+            try:
+                # 스프레드시트 수정 시각이 그대로면 탭 내용을 받을 필요가 없습니다.
+                token = _last_update_time(sid)
+                if token == self._tokens.get(sid):
+                    continue
+                for name in names:
+                    self.sync_sheet(sid, name)
+                self._tokens[sid] = token
+            except Exception as e:
+                if _is_auth_error(e):
+                    SHEET_POOL.invalidate()
+
+    def mark_stale(self, spreadsheet_id):
+        """다음 동기화 주기에 수정 시각과 관계없이 이 스프레드시트의 탭을 다시 맞춤"""
+        with self._lock:
+            self._tokens.pop(spreadsheet_id, None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.sync_once()
+
+
+MIRROR_SYNC = MirrorSyncer(SHEET_MIRROR) if SHEET_MIRROR is not None else None
+
+
+def _mirror_append(spreadsheet_id, sheet_name, rows):
+    """시트에 추가한 행을 미러에도 추가. 실패하면 시트에서 다시 맞추고, 그것도 안 되면 다음 동기화 때 맞춥니다."""
+    if SHEET_MIRROR is None:
+        return
+    try:
+        SHEET_MIRROR.append_rows(spreadsheet_id, sheet_name, [[_cell_text(v) for v in r] for r in rows])
+        return
+    except Exception as e:
+        print(f"[mirror] '{sheet_name}' 미러 추가 실패, 시트에서 다시 맞춥니다: {e}")
+    try:
+        MIRROR_SYNC.sync_sheet(spreadsheet_id, sheet_name)
+    except Exception as e:
+        print(f"[mirror] '{sheet_name}' 미러 재동기화 실패, 다음 동기화 때 다시 맞춥니다: {e}")
+        MIRROR_SYNC.mark_stale(spreadsheet_id)
+
+
+# ★ 행 단위 수정/삭제용 숨김 컬럼 (load(with_row_ids=True) 일 때만 붙음)
+#   - ROW_ID_COLUMN : 시트의 실제 행 번호 (헤더가 1행이므로 데이터는 2부터)
+#   - ROW_KEY_COLUMN: 읽을 당시 행 내용의 지문. 수정/삭제 직전에 그 행을 다시 읽어 비교합니다.
+ROW_ID_COLUMN = "_row"
+ROW_KEY_COLUMN = "_row_key"
+
+
+class RowConflictError(Exception):
+    """읽은 뒤 다른 사람이 수정/삭제/정렬해서 대상 행의 위치나 내용이 바뀐 경우"""
+
+
 class DataManager:
-    def __init__(self, spreadsheet_id, sheet_name, text_columns=None):
+    def __init__(self, spreadsheet_id, sheet_name, text_columns=None, schema=None):
         self.spreadsheet_id = spreadsheet_id
         self.sheet_name = sheet_name
         self.text_columns = text_columns or []
-        
-        if os.path.exists(CREDS_FILE):
-            self.creds = ServiceAccountCredentials.from_json_keyfile_name(CREDS_FILE, SCOPE)
-        else:
-            creds_dict = json.loads(st.secrets["GCP_CREDENTIALS"])
-            self.creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, SCOPE)
-            
-        self.client = gspread.authorize(self.creds)
-        self.sheet = self.client.open_by_key(self.spreadsheet_id).worksheet(self.sheet_name)
-
-    # ★ 캐시(Cache) 완벽 제거! 매번 구글시트에서 진짜 최신 데이터를 강제로 읽어옵니다.
-    def load(self):
-        data = self.sheet.get_all_records()
-        df = pd.DataFrame(data)
+        self.schema = schema if schema is not None else get_schema(sheet_name)  # load_typed() 용 (schema.py)
+        self._snapshot = None  # 마지막으로 읽거나 쓴 시트 원본 셀 값 (delta 저장 기준)
+        self._snapshot_token = None  # _snapshot 을 읽기 직전의 변경 토큰 (저장 전 재검증용, 쓴 뒤에는 맞지 않게 됨)
+
+    # 기존 코드 호환용: creds / client / sheet 는 풀에서 꺼내 씁니다 (생성 시점엔 네트워크 호출 없음)
+    @property
+    def creds(self):
+        return SHEET_POOL.creds
+
+    @property
+    def client(self):
+        return SHEET_POOL.client()
+
+    @property
+    def sheet(self):
+        return SHEET_POOL.worksheet(self.spreadsheet_id, self.sheet_name)
+
+    @property
+    def snapshot(self):
+        """마지막으로 읽거나 쓴 원본 셀 값 [[헤더], [행], ...] (읽기 전용, 대기 중인 새 행은 제외)"""
+        return self._snapshot
+
+    def _cache_key(self):
+        return (self.spreadsheet_id, self.sheet_name, tuple(self.text_columns))
+
+    def _change_token(self):
+        """시트 변경 여부를 싸게 확인하는 토큰 (드라이브 파일 수정 시각, 미러 사용 시 미러 버전)"""
+        if SHEET_MIRROR is not None:
+            return ("mirror", SHEET_MIRROR.version(self.spreadsheet_id, self.sheet_name))
+        return STORAGE.change_token(self.spreadsheet_id, self.sheet_name)
+
+    def _fetch(self):
+        grid = None
+        if SHEET_MIRROR is not None:
+            # 이전 실행에서 남은 미러 파일은 낡았을 수 있으므로, 프로세스에서 처음 읽을 때 한 번 맞춥니다.
+            if MIRROR_SYNC.watch(self.spreadsheet_id, self.sheet_name):
+                MIRROR_SYNC.sync_sheet(self.spreadsheet_id, self.sheet_name)
+            grid = SHEET_MIRROR.grid(self.spreadsheet_id, self.sheet_name)
+        if grid is None:
+            grid = STORAGE.read_grid(self.spreadsheet_id, self.sheet_name)
+            if SHEET_MIRROR is not None:
+                SHEET_MIRROR.apply_grid(self.spreadsheet_id, self.sheet_name, grid)
+        return self._frame_from_grid(grid), grid
+
+    def _frame_from_grid(self, grid):
+        df = _grid_to_frame(grid)
         for col in self.text_columns:
             if col in df.columns:
                 df[col] = df[col].fillna("").astype(str)
+        return df
+
+    def _with_pending(self, df, pending=None):
+        """아직 전송 대기 중인 새 행도 바로 보이도록 뒤에 붙인 복사본을 반환"""
+        if pending is None:
+            pending = APPEND_QUEUE.pending_rows(self.spreadsheet_id, self.sheet_name)
+        if pending and len(df.columns):
+            width = len(df.columns)
+            extra = pd.DataFrame(
+                [gspread.utils.numericise_all([_cell_text(v) for v in (r + [""] * width)[:width]]) for r in pending],
+                columns=df.columns
+            )
+            for col in self.text_columns:
+                if col in extra.columns:
+                    extra[col] = extra[col].fillna("").astype(str)
+            return pd.concat([df, extra], ignore_index=True)
+        return df.copy()
+
+    def _typed(self, entry):
+        """스키마대로 변환한 DataFrame (캐시 항목에 한 번만 만들어 두고 복사본을 반환)"""
+        if self.schema is None:
+            raise ValueError(f"'{self.sheet_name}' 시트에 등록된 스키마가 없습니다. (schema.py)")
+        pending = APPEND_QUEUE.pending_rows(self.spreadsheet_id, self.sheet_name)
+        if pending and self._snapshot:
+            # 전송 대기 행이 있을 때만 캐시와 별도로 변환합니다 (보통은 몇 초 이내)
+            return self.schema.parse(self._snapshot + [[_cell_text(v) for v in r] for r in pending])
+        if entry is None:
+            return self.schema.parse(self._snapshot)
+        if entry.typed is None:
+            entry.typed = self.schema.parse(entry.snapshot)
+        return entry.typed.copy()
+
+    def _load_entry(self):
+        """(원본 DataFrame, 캐시 항목) 반환. 캐시에 넣지 못했으면 항목은 None"""
+        key = self._cache_key()
+        entry = READ_CACHE.get(key, self._change_token)
+        if entry is not None:
+            self._snapshot, self._snapshot_token = entry.snapshot, entry.token
+            return entry.df, entry
+        # 토큰을 먼저 받아두어야 읽는 도중 바뀐 내용이 다음 재검증에서 걸러집니다.
+        generation = READ_CACHE.generation(self.spreadsheet_id, self.sheet_name)
+        try:
+            token = self._change_token()
+        except Exception:
+            token = None
+        df, self._snapshot = self._fetch()
+        self._snapshot_token = token
+        return df, READ_CACHE.put(key, df, self._snapshot, token, generation)
+
+    # ★ 공유 읽기 캐시 사용: 신선도 한계(READ_CACHE_MAX_STALENESS_SEC)보다 오래된 데이터는 절대 반환하지 않습니다.
+    #   with_row_keys=False 면 행 번호만 붙이고, 지문은 실제로 수정할 행만 row_keys() 로 따로 계산합니다 (큰 시트의 페이지 편집용)
+    def load(self, with_row_ids=False, with_row_keys=True):
+        df, _ = self._load_entry()
+        if not with_row_ids:
+            return self._with_pending(df), None
+        pending = APPEND_QUEUE.pending_rows(self.spreadsheet_id, self.sheet_name)
+        df = self._with_pending(df, pending)
+        if len(df.columns):
+            # 대기 중인 행은 전송되면 시트 맨 아래에 붙으므로 스냅샷 다음 번호를 미리 줍니다.
+            df[ROW_ID_COLUMN] = range(2, len(df) + 2)
+            if with_row_keys:
+                df[ROW_KEY_COLUMN] = self.row_keys(df[ROW_ID_COLUMN], pending)
         return df, None
 
+    def row_keys(self, row_ids, pending=None):
+        """마지막 load() 기준으로 row_ids(시트 행 번호) 각각의 지문 목록 (update_row / delete_row 의 row_key)"""
+        if pending is None:
+            pending = APPEND_QUEUE.pending_rows(self.spreadsheet_id, self.sheet_name)
+        rows = (self._snapshot or [[]])[1:]
+        keys = []
+        for row_id in row_ids:
+            i = int(row_id) - 2
+            if 0 <= i < len(rows):
+                keys.append(_row_key(rows[i]))
+            elif 0 <= i - len(rows) < len(pending):
+                keys.append(_row_key([_cell_text(v) for v in pending[i - len(rows)]]))
+            else:
+                keys.append(_row_key([]))
+        return keys
+
+    # ★ 분석 화면용: 날짜/숫자/카테고리 타입 변환을 읽을 때 한 번만 하고 캐시에 같이 보관합니다.
+    def load_typed(self):
+        _, entry = self._load_entry()
+        return self._typed(entry)
+
+    @classmethod
+    def load_entries(cls, spreadsheet_id, sheet_names, text_columns=None):
+        """{탭 이름: (DataManager, 캐시 항목 또는 None, 원본 DataFrame)} - 캐시에 없는 탭만 모아서 한 번에 읽습니다.
+
+        반환되는 DataFrame 은 캐시에 있는 원본이므로 고치지 말고 읽기만 합니다. (대기 중인 새 행 미포함)
+        """
+        managers = {name: cls(spreadsheet_id, name, text_columns) for name in sheet_names}
+        loaded, missing = {}, []
+        for name, dm in managers.items():
+            if SHEET_MIRROR is not None:
+                # 미러는 로컬이라 탭별로 읽어도 충분히 빠릅니다.
+                df, entry = dm._load_entry()
+                loaded[name] = (dm, entry, df)
+                continue
+            entry = READ_CACHE.get(dm._cache_key(), dm._change_token)
+            if entry is not None:
+                dm._snapshot, dm._snapshot_token = entry.snapshot, entry.token
+                loaded[name] = (dm, entry, entry.df)
+            else:
+                missing.append(name)
+
+        if missing:
+            generations = {name: READ_CACHE.generation(spreadsheet_id, name) for name in missing}
+            try:
+                token = managers[missing[0]]._change_token()
+            except Exception:
+                token = None
+            grids = STORAGE.read_grids(spreadsheet_id, missing)
+            for name in missing:
+                dm = managers[name]
+                grid = grids[name]
+                df = dm._frame_from_grid(grid)
+                dm._snapshot, dm._snapshot_token = grid, token
+                loaded[name] = (dm, READ_CACHE.put(dm._cache_key(), df, grid, token, generations[name]), df)
+        return {name: loaded[name] for name in sheet_names}
+
+    # ★ 같은 스프레드시트의 여러 탭(예: SLH1 전 호기)을 한 번에 읽습니다 (구글 시트는 values_batch_get 1회).
+    @classmethod
+    def load_many(cls, spreadsheet_id, sheet_names, text_columns=None, concat=False, name_column="장비", typed=False):
+        """{탭 이름: DataFrame} 반환. concat=True 면 탭 이름을 name_column 에 넣어 하나로 합친 DataFrame 반환
+
+        typed=True 면 load_typed() 와 같이 스키마대로 변환된 DataFrame 을 반환합니다.
+        """
+        loaded = cls.load_entries(spreadsheet_id, sheet_names, text_columns)
+        managers = {name: dm for name, (dm, _, _) in loaded.items()}
+        frames = {
+            name: dm._typed(entry) if typed else dm._with_pending(df)
+            for name, (dm, entry, df) in loaded.items()
+        }
+        if not concat:
+            return frames
+        parts = [df.assign(**{name_column: name}) for name, df in frames.items() if not df.empty]
+        if not parts:
+            return pd.DataFrame(columns=[name_column])
+        schema = next((dm.schema for dm in managers.values() if dm.schema is not None), None)
+        if typed and schema is not None:
+            return schema.concat(parts)
+        return pd.concat(parts, ignore_index=True)
+
+    # ★ 시트를 비우고(clear) 통째로 다시 쓰지 않고, 마지막으로 읽은 스냅샷과 비교해서 바뀐 부분만 한 번에 보냅니다.
     def save(self, df):
-        self.sheet.clear()
-        data_to_save = [df.columns.values.tolist()] + df.values.tolist()
-        self.sheet.update(data_to_save)
+        # 큐에 남은 새 행을 먼저 보내고 스냅샷에 반영해야 아래 비교에서 덮어쓰지 않습니다.
+        flushed = APPEND_QUEUE.flush(self.spreadsheet_id, self.sheet_name)
+        if flushed and self._snapshot is not None:
+            self._snapshot = self._snapshot + [[_cell_text(v) for v in r] for r in flushed]
+
+        header = [_cell_value(c) for c in df.columns.values.tolist()]
+        rows = [[_cell_value(v) for v in r] for r in df.values.tolist()]
+        if self._snapshot is not None:
+            old_grid, old_token = self._snapshot, self._snapshot_token
+        else:
+            old_grid, old_token = READ_CACHE.peek_snapshot(self.spreadsheet_id, self.sheet_name)
+
+        try:
+            # 비교할 스냅샷이 없거나, 그 뒤로 시트가 바뀌었거나(다른 곳에서 행 추가/삭제 등) 확인할 수 없으면
+            # 현재 시트를 한 번 읽어서 기준으로 삼습니다. 낡은 기준과 비교하면 밀린 행과 새 행이 섞여 써집니다.
+            if old_grid is None or not self._token_unchanged(old_token):
+                old_grid = STORAGE.read_grid(self.spreadsheet_id, self.sheet_name)
+            blocks, _ = plan_sheet_write(old_grid, header, rows)
+            STORAGE.write_blocks(self.spreadsheet_id, self.sheet_name, blocks)
+            self._snapshot = [[_cell_text(v) for v in header]] + [[_cell_text(v) for v in r] for r in rows]
+            if SHEET_MIRROR is not None:
+                SHEET_MIRROR.apply_grid(self.spreadsheet_id, self.sheet_name, self._snapshot)
+        except Exception:
+            self._snapshot = None
+            raise
+        finally:
+            READ_CACHE.invalidate(self.spreadsheet_id, self.sheet_name)
+            _notify_change(self.spreadsheet_id, self.sheet_name)
+
+    def _token_unchanged(self, token):
+        """token 을 받은 뒤로 시트(원본 저장소)가 그대로인지 (미러 버전 토큰이나 확인 실패는 False)"""
+        if token is None:
+            return False
+        try:
+            return STORAGE.change_token(self.spreadsheet_id, self.sheet_name) == token
+        except Exception:
+            return False
+
+    # ★ 행 단위 수정/삭제: 시트 전체가 아니라 해당 행만 보냅니다.
+    #   대상 행 구간을 한 번 읽어 모든 행의 지문을 확인한 뒤, 수정은 write_blocks 1번, 삭제는 요청 1번으로 보냅니다.
+    def _header(self):
+        header = self._snapshot[0] if self._snapshot else None
+        if header is None:
+            header = STORAGE.read_header(self.spreadsheet_id, self.sheet_name)
+        return _strip_blank_tail(header)
+
+    def save_row_edits(self, updates, deleted_ids, row_keys):
+        """여러 행을 한 번에 수정/삭제
+
+        updates: {row_id: {컬럼: 값}} (헤더에 있는 컬럼만 반영, 나머지 칸은 기존 값 유지), deleted_ids: [row_id],
+        row_keys: {row_id: load 당시 지문}. 하나라도 불러온 뒤에 바뀐 행이 있으면 아무것도 쓰지 않고 RowConflictError
+        """
+        updates = {int(r): values for r, values in updates.items()}
+        deleted = sorted({int(r) for r in deleted_ids})
+        row_keys = {int(r): key for r, key in row_keys.items()}
+        ids = sorted(set(updates) | set(deleted))
+        if not ids:
+            return
+        APPEND_QUEUE.flush(self.spreadsheet_id, self.sheet_name)  # 대기 중인 행이 있으면 먼저 시트에 붙입니다.
+        current = dict(zip(range(ids[0], ids[-1] + 1), STORAGE.read_rows(self.spreadsheet_id, self.sheet_name, ids[0], ids[-1])))
+        changed = [r for r in ids if _row_key(current[r]) != row_keys[r]]
+        if changed:
+            READ_CACHE.invalidate(self.spreadsheet_id, self.sheet_name)
+            shown = ", ".join(str(r) for r in changed[:5]) + (" 등" if len(changed) > 5 else "")
+            raise RowConflictError(
+                f"'{self.sheet_name}' {shown}행이 불러온 뒤에 바뀌었습니다. 새로고침 후 다시 시도해주세요."
+            )
+
+        header = self._header()
+        blocks = []
+        for row_id in sorted(set(updates) - set(deleted)):
+            old = list(current[row_id]) + [""] * (len(header) - len(current[row_id]))
+            values = updates[row_id]
+            blocks.append((row_id, 1, [[_cell_value(values[col]) if col in values else old[i] for i, col in enumerate(header)]]))
+        ranges = []
+        for row_id in deleted:
+            if ranges and row_id == ranges[-1][1] + 1:
+                ranges[-1][1] = row_id
+            else:
+                ranges.append([row_id, row_id])
+        ranges = [tuple(r) for r in ranges]
+        try:
+            if blocks:
+                STORAGE.write_blocks(self.spreadsheet_id, self.sheet_name, blocks)
+            if ranges:
+                STORAGE.delete_row_ranges(self.spreadsheet_id, self.sheet_name, ranges)
+            if self._snapshot is not None and len(self._snapshot) >= ids[-1]:
+                snapshot = list(self._snapshot)
+                for row_id, _, (row,) in blocks:
+                    snapshot[row_id - 1] = [_cell_text(v) for v in row]
+                for start, end in reversed(ranges):
+                    del snapshot[start - 1:end]
+                self._snapshot = snapshot
+                if SHEET_MIRROR is not None:
+                    SHEET_MIRROR.apply_grid(self.spreadsheet_id, self.sheet_name, self._snapshot)
+            else:
+                self._snapshot = None
+        except Exception:
+            self._snapshot = None
+            raise
+        finally:
+            READ_CACHE.invalidate(self.spreadsheet_id, self.sheet_name)
+            _notify_change(self.spreadsheet_id, self.sheet_name)
+
+    def update_row(self, row_id, new_data_dict, row_key):
+        """row_id(시트 행 번호) 한 줄만 덮어쓰기. 헤더에 있는 컬럼만 반영하고 나머지 칸은 기존 값 유지"""
+        self.save_row_edits({row_id: new_data_dict}, [], {row_id: row_key})
+
+    def delete_row(self, row_id, row_key):
+        """row_id(시트 행 번호) 한 줄만 삭제 (아래 행들은 한 칸씩 올라옵니다)"""
+        self.save_row_edits({}, [row_id], {row_id: row_key})
+
     # ========================================================
     # 📱 API (모바일 앱) 연동을 위해 추가된 함수
     # ========================================================
     def save_new_row(self, new_data_dict):
         """새로운 데이터 1줄(Row)을 구글 시트 맨 아래에 추가"""
         row_values = list(new_data_dict.values())
-        self.sheet.append_row(row_values)
+        try:
+            STORAGE.append_rows(self.spreadsheet_id, self.sheet_name, [row_values])
+            _mirror_append(self.spreadsheet_id, self.sheet_name, [row_values])
+        finally:
+            self._snapshot = None
+            READ_CACHE.invalidate(self.spreadsheet_id, self.sheet_name)
+        _notify_append(self.spreadsheet_id, self.sheet_name, dict(new_data_dict))
         return True
 
+    def query(self, date_from=None, date_to=None, **equals):
+        """날짜 구간(Date/날짜 컬럼)과 컬럼 값 일치 조건으로 행을 골라 DataFrame 으로 반환
+
+        미러가 켜져 있으면 인덱스를 타는 SQLite 조회로, 아니면 전체를 읽어서 걸러냅니다.
+        """
+        if SHEET_MIRROR is not None:
+            if SHEET_MIRROR.version(self.spreadsheet_id, self.sheet_name) is None:
+                self.load()
+            result = SHEET_MIRROR.query(self.spreadsheet_id, self.sheet_name, date_from, date_to, **equals)
+            if result is None:
+                return pd.DataFrame()
+            header, rows = result
+            df = _grid_to_frame([header] + rows)
+            if df.empty:
+                df = pd.DataFrame(columns=header)
+            for col in self.text_columns:
+                if col in df.columns:
+                    df[col] = df[col].fillna("").astype(str)
+            return df
+
+        df, _ = self.load()
+        date_col = next((c for c in ("Date", "날짜") if c in df.columns), None)
+        if date_col is not None and date_from is not None:
+            df = df[df[date_col].astype(str) >= str(date_from)]
+        if date_col is not None and date_to is not None:
+            df = df[df[date_col].astype(str) <= str(date_to)]
+        for name, value in equals.items():
+            df = df[df[name].astype(str) == str(value)]
+        return df.reset_index(drop=True)
+
+    def enqueue_row(self, new_data_dict):
+        """새 행을 쓰기 큐에 넣고 티켓을 반환 (실제 전송은 APPEND_QUEUE 가 모아서 처리)
+
+        헤더 순서는 마지막으로 읽은 스냅샷 기준이며, 시트가 비어 있으면(헤더 없음) 바로 저장하고 None 을 반환합니다.
+        """
+        header = self._header()
+        if not header:
+            self.save(pd.DataFrame([new_data_dict]))
+            return None
+        row = [_cell_value(new_data_dict.get(col, "")) for col in header]
+        ticket = APPEND_QUEUE.enqueue(self.spreadsheet_id, self.sheet_name, row)
+        _notify_append(self.spreadsheet_id, self.sheet_name, dict(zip(header, row)))
+        return ticket
+
 # ========================================================
 # 3. 유틸리티 함수
 # ========================================================
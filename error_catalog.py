@@ -0,0 +1,168 @@
+import re
+import threading
+import time
+
+from config import DataManager
+
+
+# ========================================================
+# 📖 에러코드 카탈로그 (Jam 입력 자동완성용)
+# ========================================================
+# - ErrorList 시트를 한 번 읽어서 메모리 인덱스를 만들고, 모든 세션이 같이 씁니다.
+# - 코드 / 모듈(Err.Point) / 알람명 각각 "완전 일치" 해시맵 + 부분 일치용 3글자(trigram) 색인을 둡니다.
+# - 자동완성 콜백은 메모리 조회만 하고, 시트 변경 반영은 백그라운드에서 ERROR_CATALOG_REFRESH_SEC 마다 합니다.
+ERROR_CATALOG_REFRESH_SEC = 300
+
+FIELD_ALIASES = {
+    "code": ("errorcode", "알람코드", "code"),
+    "point": ("err.point", "모듈", "point", "errpoint"),
+    "msg": ("errormasage", "알람명", "errormessage", "message", "error message"),
+}
+NGRAM = 3
+
+
+def _norm_name(name):
+    return str(name).lower().replace(" ", "")
+
+
+def _clean(value):
+    """시트 숫자 값에서 넘어오는 '.0' 꼬리 제거 + 공백 정리"""
+    return re.sub(r"\.0$", "", str(value)).strip()
+
+
+def _ngrams(text):
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class _CatalogIndex:
+    """한 번 만들면 바뀌지 않는 색인 (새로 읽으면 통째로 교체)"""
+
+    def __init__(self, df):
+        self.fields = {}
+        for field, aliases in FIELD_ALIASES.items():
+            wanted = {_norm_name(a) for a in aliases}
+            self.fields[field] = next((c for c in df.columns if _norm_name(c) in wanted), None)
+
+        df = df.fillna("")
+        columns = {f: df[c].tolist() if c is not None else [""] * len(df) for f, c in self.fields.items()}
+        self.records = [
+            {f: _clean(v) for f, v in zip(columns, values)}
+            for values in zip(*columns.values())
+        ]
+
+        self.exact = {f: {} for f in FIELD_ALIASES}
+        self.lowered = {f: [] for f in FIELD_ALIASES}
+        self.grams = {f: {} for f in FIELD_ALIASES}
+        for i, rec in enumerate(self.records):
+            for f in FIELD_ALIASES:
+                value = rec[f].lower()
+                self.lowered[f].append(value)
+                if not value:
+                    continue
+                self.exact[f].setdefault(value, i)  # 같은 값이 여러 번 나오면 시트 위쪽 행 우선
+                for g in _ngrams(value):
+                    self.grams[f].setdefault(g, []).append(i)
+
+    def find(self, field, value):
+        if self.fields.get(field) is None:
+            return None
+        query = _clean(value).lower()
+        if not query:
+            return None
+        i = self.exact[field].get(query)
+        if i is not None:
+            return self.records[i]
+
+        values = self.lowered[field]
+        if len(query) < NGRAM:
+            candidates = range(len(values))
+        else:
+            # 가장 짧은 목록부터 교집합 → 후보만 실제 포함 여부 확인
+            postings = sorted((self.grams[field].get(g, []) for g in _ngrams(query)), key=len)
+            if not postings or not postings[0]:
+                return None
+            candidates = set(postings[0])
+            for p in postings[1:]:
+                candidates.intersection_update(p)
+                if not candidates:
+                    return None
+            candidates = sorted(candidates)
+        for i in candidates:
+            if query in values[i]:
+                return self.records[i]
+        return None
+
+
+class ErrorCatalog:
+    def __init__(self, spreadsheet_id, sheet_name):
+        self.spreadsheet_id = spreadsheet_id
+        self.sheet_name = sheet_name
+        self._lock = threading.Lock()
+        self._index = None
+        self._grid = None
+        self.loaded_at = None
+
+    def refresh(self):
+        """시트(읽기 캐시 경유)를 다시 확인해서 내용이 바뀌었을 때만 색인을 새로 만듭니다."""
+        with self._lock:
+            dm = DataManager(self.spreadsheet_id, self.sheet_name)
+            df, _ = dm.load()
+            if self._index is None or dm._snapshot is not self._grid:
+                self._index = _CatalogIndex(df)
+                self._grid = dm._snapshot
+            self.loaded_at = time.time()
+        _ensure_refresher()
+
+    def ensure_loaded(self):
+        if self._index is None:
+            self.refresh()
+        return self
+
+    def lookup(self, field, value):
+        """field("code" / "point" / "msg") 값으로 에러 1건 찾기 → {"code", "point", "msg"} 또는 None
+
+        완전 일치(대소문자 무시)를 먼저 보고, 없으면 그 값을 포함하는 첫 행을 반환합니다.
+        """
+        index = self._index
+        if index is None:
+            return None
+        return index.find(field, value)
+
+    def columns(self):
+        index = self._index
+        return dict(index.fields) if index is not None else {}
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+_refresher = None
+
+
+def get_error_catalog(spreadsheet_id, sheet_name):
+    """프로세스 전체에서 공유하는 카탈로그 (처음 호출 때 한 번 읽음)"""
+    key = (spreadsheet_id, sheet_name)
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = _catalogs[key] = ErrorCatalog(spreadsheet_id, sheet_name)
+    return catalog.ensure_loaded()
+
+
+def _refresh_all():
+    while True:
+        time.sleep(ERROR_CATALOG_REFRESH_SEC)
+        with _catalogs_lock:
+            catalogs = list(_catalogs.values())
+        for catalog in catalogs:
+            try:
+                catalog.refresh()
+            except Exception:
+                pass  # 다음 주기에 다시 시도 (기존 색인은 그대로 사용)
+
+
+def _ensure_refresher():
+    global _refresher
+    with _catalogs_lock:
+        if _refresher is None or not _refresher.is_alive():
+            _refresher = threading.Thread(target=_refresh_all, name="error-catalog-refresh", daemon=True)
+            _refresher.start()
@@ -0,0 +1,100 @@
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+# ========================================================
+# 📥 엑셀 다운로드 (필요할 때만 생성 + 결과 캐시)
+# ========================================================
+# - st.download_button 의 data 에 함수를 넘기면, 사용자가 버튼을 눌렀을 때만 파일을 만듭니다.
+# - openpyxl write-only 모드로 한 행씩 흘려 쓰므로 표가 커져도 작업 메모리가 늘지 않습니다.
+# - 같은 내용(데이터 버전 + 필터 결과)을 다시 받으면 캐시된 파일을 그대로 돌려줍니다.
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+EXPORT_CACHE_MAX_ENTRIES = 16
+EXPORT_CACHE_MAX_BYTES = 128 * 1024 * 1024
+
+try:
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE as _ILLEGAL_RE  # 엑셀에 못 넣는 제어문자
+except ImportError:
+    _ILLEGAL_RE = None
+
+
+def _cell(v):
+    if v is None:
+        return None
+    if isinstance(v, float) and v != v:
+        return None
+    if v is pd.NaT:
+        return None
+    if hasattr(v, "item") and not isinstance(v, (str, bytes)):
+        v = v.item()  # numpy 숫자 → 파이썬 숫자
+    if isinstance(v, pd.Timestamp):
+        v = v.to_pydatetime()
+    if isinstance(v, str):
+        return _ILLEGAL_RE.sub("", v) if _ILLEGAL_RE is not None else v
+    return v
+
+
+def xlsx_bytes(df, sheet_name="데이터"):
+    """DataFrame → xlsx 파일 내용 (write-only 스트리밍)"""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_name)
+    ws.append([str(c) for c in df.columns])
+    for row in df.itertuples(index=False, name=None):
+        ws.append([_cell(v) for v in row])
+    out = io.BytesIO()
+    wb.save(out)
+    return out.getvalue()
+
+
+def _fingerprint(df):
+    """내용이 같으면 같은 값 (컬럼 이름 + 행 내용 해시)"""
+    columns = tuple(str(c) for c in df.columns)
+    if df.empty:
+        return columns, ""
+    hashed = pd.util.hash_pandas_object(df.astype(str), index=False)
+    return columns, hashlib.blake2b(hashed.values.tobytes(), digest_size=16).hexdigest()
+
+
+class ExportCache:
+    def __init__(self, max_entries=EXPORT_CACHE_MAX_ENTRIES, max_bytes=EXPORT_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.stats = {"hit": 0, "miss": 0}
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.stats["hit"] += 1
+                return data
+            self.stats["miss"] += 1
+        data = build()
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = data
+                self._bytes += len(data)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, old = self._entries.popitem(last=False)
+                self._bytes -= len(old)
+        return data
+
+
+EXPORT_CACHE = ExportCache()
+
+
+def xlsx_download(df, sheet_name="데이터"):
+    """st.download_button(data=...) 에 넘길 함수. 버튼을 눌렀을 때만 xlsx 를 만들고, 같은 내용이면 캐시 사용"""
+    def _build():
+        key = ("xlsx", sheet_name, _fingerprint(df))
+        return EXPORT_CACHE.get_or_build(key, lambda: xlsx_bytes(df, sheet_name))
+    return _build
@@ -0,0 +1,223 @@
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+
+from config import BASE_DIR
+
+
+# ========================================================
+# 🔄 GitHub 저장소 data/ 폴더 증분 동기화 (라인 팀이 올린 월간 보고서 자동 반영)
+# ========================================================
+# - init_connections() 의 repo(PyGithub) 로 data/ 폴더를 GITHUB_SYNC_DIR/data/ 에 그대로 맞춰 둡니다.
+# - 변경 확인 순서 (바뀐 게 없으면 앞 단계에서 끝)
+#     ① 브랜치 조회에 If-None-Match(ETag) → 304 면 끝 (GitHub 는 304 응답을 호출 한도에 세지 않음)
+#     ② 루트 트리에서 data/ 하위 트리 SHA 확인 → 지난번과 같으면 끝 (다른 폴더만 바뀐 커밋)
+#     ③ data/ 트리(재귀)를 받아서, 로컬 보관소에 없는 blob SHA 만 내려받음
+# - 내려받은 파일은 GITHUB_SYNC_DIR/.sync/objects/<SHA 앞 2자리>/<SHA> 에 내용 주소로 보관하고
+#   (git blob 해시로 검증), data/ 아래 파일은 SHA 가 바뀐 것만 다시 씁니다. 저장소에서 지워진 파일은 같이 지웁니다.
+# - 저장소 접근은 head / tree / blob 세 가지만 쓰므로, 테스트할 때는 LocalGitSource(로컬 git 저장소)로 바꿔 끼웁니다.
+GITHUB_REPO_NAME = "saltlightchoi/my-work-log"
+GITHUB_SYNC_PREFIX = "data"
+GITHUB_SYNC_DIR = os.environ.get("WORKLOG_GITHUB_SYNC_DIR", os.path.join(BASE_DIR, "github_data"))
+GITHUB_SYNC_SEC = 300
+
+
+def git_blob_sha(data):
+    """git 이 blob 에 붙이는 SHA-1 (GitHub 트리의 sha 와 같은 값)"""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class GithubSource:
+    """PyGithub Repository 를 head / tree / blob 으로 감쌉니다 (calls: 이번 프로세스의 API 호출 수)"""
+
+    def __init__(self, repo, branch=None):
+        self.repo = repo
+        self.branch = branch or repo.default_branch
+        self.calls = 0
+
+    def head(self, etag=None):
+        """브랜치가 그대로면 None, 바뀌었으면 (새 ETag, 루트 트리 SHA)"""
+        headers = {"If-None-Match": etag} if etag else None
+        self.calls += 1
+        status, response_headers, output = self.repo._requester.requestJson(
+            "GET", f"{self.repo.url}/branches/{self.branch}", headers=headers
+        )
+        if status == 304:
+            return None
+        if status >= 400:
+            raise RuntimeError(f"GitHub 브랜치 조회 실패 ({status}): {output[:200]}")
+        data = json.loads(output)
+        return response_headers.get("etag"), data["commit"]["commit"]["tree"]["sha"]
+
+    def tree(self, sha, recursive=False):
+        """[(경로, 종류("blob"/"tree"), SHA)]"""
+        self.calls += 1
+        tree = self.repo.get_git_tree(sha, recursive=recursive)
+        return [(e.path, e.type, e.sha) for e in tree.tree]
+
+    def blob(self, sha):
+        import base64
+
+        self.calls += 1
+        blob = self.repo.get_git_blob(sha)
+        return base64.b64decode(blob.content) if blob.encoding == "base64" else blob.content.encode("utf-8")
+
+
+class LocalGitSource:
+    """로컬 git 저장소를 GithubSource 와 같은 모양으로 (테스트 / 사내망 미러용 대역)"""
+
+    def __init__(self, path, branch="HEAD"):
+        self.path = path
+        self.branch = branch
+        self.calls = 0
+
+    def _git(self, *args):
+        return subprocess.run(["git", "-C", self.path, *args], check=True, capture_output=True).stdout
+
+    def head(self, etag=None):
+        # 로컬에는 ETag 가 없으므로 루트 트리 SHA 를 ETag 로 씁니다.
+        self.calls += 1
+        tree = self._git("rev-parse", f"{self.branch}^{{tree}}").decode().strip()
+        return None if tree == etag else (tree, tree)
+
+    def tree(self, sha, recursive=False):
+        self.calls += 1
+        out = self._git("ls-tree", "-z", *(["-r"] if recursive else []), sha).decode("utf-8")
+        entries = []
+        for line in filter(None, out.split("\0")):
+            meta, path = line.split("\t", 1)
+            _, kind, object_sha = meta.split()
+            entries.append((path, kind, object_sha))
+        return entries
+
+    def blob(self, sha):
+        self.calls += 1
+        return self._git("cat-file", "blob", sha)
+
+
+class GithubSync:
+    def __init__(self, source, root=GITHUB_SYNC_DIR, prefix=GITHUB_SYNC_PREFIX, interval=GITHUB_SYNC_SEC):
+        self.source = source
+        self.root = root
+        self.prefix = prefix.strip("/")
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._thread = None
+        self.last_result = None
+        self.last_error = ""
+
+    # ---------- 로컬 상태 ----------
+    @property
+    def _meta_dir(self):
+        return os.path.join(self.root, ".sync")
+
+    def _state(self):
+        try:
+            with open(os.path.join(self._meta_dir, "state.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {"etag": None, "tree": None, "files": {}}
+
+    def _save_state(self, state):
+        os.makedirs(self._meta_dir, exist_ok=True)
+        path = os.path.join(self._meta_dir, "state.json")
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=1)
+        os.replace(f"{path}.tmp", path)
+
+    def _object_path(self, sha):
+        return os.path.join(self._meta_dir, "objects", sha[:2], sha[2:])
+
+    def _fetch(self, sha):
+        """blob 을 내용 주소 보관소에 (없을 때만 내려받음) → 받았으면 True"""
+        path = self._object_path(sha)
+        if os.path.exists(path):
+            return False
+        data = self.source.blob(sha)
+        if git_blob_sha(data) != sha:
+            raise RuntimeError(f"내려받은 파일의 해시가 다릅니다: {sha}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(data)
+        os.replace(f"{path}.tmp", path)
+        return True
+
+    def _prefix_tree(self, root_tree):
+        """루트 트리에서 prefix 폴더의 트리 SHA (없으면 None)"""
+        sha = root_tree
+        for part in self.prefix.split("/"):
+            found = [s for path, kind, s in self.source.tree(sha) if path == part and kind == "tree"]
+            if not found:
+                return None
+            sha = found[0]
+        return sha
+
+    # ---------- 동기화 ----------
+    def sync_once(self):
+        """한 번 동기화 → {"status", "downloaded", "updated", "removed", "calls"}"""
+        with self._lock:
+            calls = self.source.calls
+            state = self._state()
+            result = {"status": "unchanged", "downloaded": 0, "updated": [], "removed": []}
+            head = self.source.head(state["etag"])
+            if head is not None:
+                etag, root_tree = head
+                tree = self._prefix_tree(root_tree)
+                if tree != state["tree"]:
+                    entries = self.source.tree(tree, recursive=True) if tree else []
+                    files = {f"{self.prefix}/{path}": sha for path, kind, sha in entries if kind == "blob"}
+                    for path, sha in files.items():
+                        result["downloaded"] += self._fetch(sha)
+                        dest = os.path.join(self.root, *path.split("/"))
+                        if state["files"].get(path) != sha or not os.path.exists(dest):
+                            os.makedirs(os.path.dirname(dest), exist_ok=True)
+                            shutil.copyfile(self._object_path(sha), f"{dest}.tmp")
+                            os.replace(f"{dest}.tmp", dest)
+                            result["updated"].append(path)
+                    for path in set(state["files"]) - set(files):
+                        try:
+                            os.remove(os.path.join(self.root, *path.split("/")))
+                        except FileNotFoundError:
+                            pass
+                        result["removed"].append(path)
+                    state["files"], state["tree"] = files, tree
+                    result["status"] = "synced"
+                state["etag"] = etag
+                self._save_state(state)
+            result["calls"] = self.source.calls - calls
+            self.last_result = result
+            return result
+
+    def start(self):
+        """백그라운드에서 interval 마다 sync_once (이미 돌고 있으면 그대로)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="github-data-sync", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            try:
+                self.sync_once()
+                self.last_error = ""
+            except Exception as e:
+                self.last_error = str(e)  # 네트워크/권한 오류는 다음 주기에 다시 시도
+            time.sleep(self.interval)
+
+
+_syncs = {}
+_syncs_lock = threading.Lock()
+
+
+def start_github_sync(repo, root=GITHUB_SYNC_DIR):
+    """repo(PyGithub) 의 data/ 폴더 백그라운드 동기화를 켭니다 (프로세스당 저장소별 1개)"""
+    key = (repo.full_name, root)
+    with _syncs_lock:
+        sync = _syncs.get(key)
+        if sync is None:
+            sync = _syncs[key] = GithubSync(GithubSource(repo), root=root)
+    return sync.start()
@@ -0,0 +1,414 @@
+import datetime
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import gspread
+import numpy as np
+import pandas as pd
+
+from config import DataManager, APPEND_QUEUE, BASE_DIR, STORAGE, READ_CACHE, MIRROR_SYNC, RowConflictError
+from schema import JAM_SCHEMA, JAM_COLUMNS
+
+
+# ========================================================
+# 🗄️ Jam 이력 월별 보관 (hot 시트 / cold 보관 탭)
+# ========================================================
+# - 최근 JAM_HOT_MONTHS 개월(이번 달 포함)은 지금처럼 장비 탭(hot)에 둡니다.
+# - 그보다 오래된 달은 "보관 실행"(관리자) 때 같은 스프레드시트의 "<탭 이름> 보관" 탭으로 옮깁니다.
+#   보관 탭도 구글 시트이므로 서버를 다시 띄워도, API 서버(main.py)에서도 그대로 보이고, 필요하면 손으로 되돌릴 수 있습니다.
+#     보관 탭 컬럼 = 장비 탭 컬럼 + _보관ID / _원본행 / _행키 / _상태
+#       _보관ID: 보관 실행 1회마다 새 값,  _원본행/_행키: 옮길 당시 장비 탭의 행 번호와 행 내용 지문
+#       _상태  : 대기(복사만 됨) → 완료(장비 탭에서 지움) / 취소(장비 탭이 바뀌어 되돌림). 조회에는 "완료" 행만 씁니다.
+# - 보관 순서: 장비 탭 읽기 → 보관 탭에 "대기"로 추가 → 장비 탭을 다시 읽어 그대로인지 확인 → 아래 구간부터 (구간 전체를 다시 확인하고) 삭제 → "완료" 표시
+#   확인 단계나 삭제 직전 구간 확인에서 장비 탭이 바뀌었으면(다른 사람이 추가/수정/삭제) 아직 지우지 않은 행을 "취소"로 바꾸고 처음부터 다시 합니다.
+#   중간에 멈춘 "대기" 행은 다음 보관 때 (_원본행, _행키) 로 장비 탭에 아직 남은 행인지 확인해서 마저 옮깁니다.
+# - 조회용으로 보관 탭을 월별 parquet 파일로 풀어 둡니다 (로컬 캐시, 지워져도 보관 탭에서 다시 만듦).
+#     JAM_ARCHIVE_DIR/<스프레드시트 ID>/<탭 이름>/2024-01.parquet ...
+#     JAM_ARCHIVE_DIR/<스프레드시트 ID>/<탭 이름>/manifest.json  (월 → 파일, 행 수, 최소/최대 날짜, 보관 탭 지문)
+# - 조회할 때는 시트 + "조회 기간과 겹치는 달"의 파일만 읽으므로, 읽는 양은 장비 사용 기간이 아니라 조회 기간에 비례합니다.
+JAM_HOT_MONTHS = 3
+JAM_ARCHIVE_DIR = os.environ.get("WORKLOG_JAM_ARCHIVE_DIR", os.path.join(BASE_DIR, "jam_archive"))
+ARCHIVE_CACHE_MAX_PARTITIONS = 64
+JAM_ARCHIVE_SUFFIX = " 보관"
+ARCHIVE_META_COLUMNS = ["_보관ID", "_원본행", "_행키", "_상태"]
+ARCHIVE_PENDING, ARCHIVE_DONE, ARCHIVE_CANCELLED = "대기", "완료", "취소"
+ARCHIVE_RETRIES = 3
+ARCHIVE_ABSENT_RECHECK_SEC = 300
+
+
+def archive_tab(sheet_name):
+    """장비 탭의 보관 탭 이름"""
+    return f"{sheet_name}{JAM_ARCHIVE_SUFFIX}"
+
+
+def _safe_name(name):
+    return re.sub(r"[^\w.-]+", "_", str(name)).strip("_") or "_"
+
+
+def hot_cutoff(today=None, keep_months=JAM_HOT_MONTHS):
+    """이 날짜(월 첫날)보다 이전 행은 보관 대상"""
+    today = pd.Timestamp(today or datetime.date.today())
+    return (today.to_period("M") - (keep_months - 1)).to_timestamp()
+
+
+def _write_atomic(path, write):
+    tmp = f"{path}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+
+
+def _trim(cells):
+    cells = [str(v) for v in cells]
+    while cells and cells[-1] == "":
+        cells.pop()
+    return cells
+
+
+def _cells_key(cells):
+    """행 내용 지문 (끝의 빈칸 무시) - 보관 탭의 _행키"""
+    return hashlib.blake2b("\x1f".join(_trim(cells)).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _runs(numbers):
+    """정렬된 번호 목록 → 연속 구간 [(처음, 끝)]"""
+    runs = []
+    for n in numbers:
+        if runs and n == runs[-1][1] + 1:
+            runs[-1][1] = n
+        else:
+            runs.append([n, n])
+    return [tuple(r) for r in runs]
+
+
+def _refresh_reads(spreadsheet_id, sheet_name):
+    """저장소에 직접 쓴 뒤 읽기 캐시(미러 사용 시 미러)를 맞춥니다"""
+    if MIRROR_SYNC is not None:
+        MIRROR_SYNC.sync_sheet(spreadsheet_id, sheet_name)
+    READ_CACHE.invalidate(spreadsheet_id, sheet_name)
+
+
+class JamArchive:
+    def __init__(self, root=JAM_ARCHIVE_DIR, schema=JAM_SCHEMA):
+        self.root = root
+        self.schema = schema
+        self._lock = threading.Lock()
+        self._archive_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._partitions = OrderedDict()  # (경로, 수정시각, 크기) → 타입 변환된 DataFrame
+        self._synced = {}  # (스프레드시트 ID, 탭) → (보관 탭 스냅샷, manifest)
+        self._absent = {}  # (스프레드시트 ID, 탭) → 보관 탭이 없다고 확인한 시각
+        self.stats = {"partition_reads": 0, "partition_hits": 0, "materialized": 0}
+
+    def _dir(self, spreadsheet_id, sheet_name):
+        return os.path.join(self.root, _safe_name(spreadsheet_id), _safe_name(sheet_name))
+
+    # ---------- 보관 탭 읽기 ----------
+    def load_tab(self, spreadsheet_id, sheet_name, text_columns=JAM_COLUMNS):
+        """보관 탭 원본 → (DataFrame(load() 와 같은 값, 메타 컬럼 포함, 읽기 전용), 원본 셀 값). 보관 탭이 없으면 (빈 DataFrame, None)"""
+        key = (spreadsheet_id, sheet_name)
+        checked = self._absent.get(key)
+        if checked is not None and time.time() - checked < ARCHIVE_ABSENT_RECHECK_SEC:
+            return pd.DataFrame(), None
+        dm = DataManager(spreadsheet_id, archive_tab(sheet_name), text_columns)
+        try:
+            df, _ = dm._load_entry()
+        except gspread.exceptions.WorksheetNotFound:
+            self._absent[key] = time.time()
+            return pd.DataFrame(), None
+        self._absent.pop(key, None)
+        if not dm.snapshot or not dm.snapshot[0]:
+            return pd.DataFrame(), None
+        return df, dm.snapshot
+
+    @staticmethod
+    def completed(df):
+        """보관 탭 DataFrame 에서 보관이 끝난 행만, 메타 컬럼을 빼고 반환 (index 는 보관 탭 안의 위치 그대로)"""
+        if df.empty or "_상태" not in df.columns:
+            return df.iloc[0:0]
+        df = df[df["_상태"].astype(str) == ARCHIVE_DONE]
+        return df.drop(columns=[c for c in ARCHIVE_META_COLUMNS if c in df.columns])
+
+    def archived_rows(self, spreadsheet_id, sheet_name, text_columns=JAM_COLUMNS):
+        """보관된 행 (load() 와 같은 원본 값, 메타 컬럼 제외)"""
+        df, _ = self.load_tab(spreadsheet_id, sheet_name, text_columns)
+        return self.completed(df)
+
+    def with_archived(self, spreadsheet_id, sheet_name, df, text_columns=JAM_COLUMNS):
+        """장비 탭에서 읽은 df(load() 결과) 앞에 보관된 행을 붙인 조회용 DataFrame"""
+        archived = self.archived_rows(spreadsheet_id, sheet_name, text_columns)
+        if archived.empty:
+            return df
+        return pd.concat([archived, df], ignore_index=True)
+
+    def _read_archive_grid(self, spreadsheet_id, sheet_name):
+        """보관 탭을 캐시 없이 바로 읽기 (없으면 None)"""
+        try:
+            return STORAGE.read_grid(spreadsheet_id, archive_tab(sheet_name))
+        except gspread.exceptions.WorksheetNotFound:
+            return None
+
+    # ---------- 조회용 로컬 월 파일 ----------
+    def _read_manifest(self, spreadsheet_id, sheet_name):
+        path = os.path.join(self._dir(spreadsheet_id, sheet_name), "manifest.json")
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"partitions": {}, "updated_at": None}
+
+    def _materialize(self, spreadsheet_id, sheet_name, snapshot):
+        """보관 탭(완료 행)을 월 파일로 풀어 씁니다. 내용이 그대로인 달은 다시 쓰지 않습니다 → manifest"""
+        folder = self._dir(spreadsheet_id, sheet_name)
+        manifest = self._read_manifest(spreadsheet_id, sheet_name)
+        if snapshot is None:
+            digest = None
+        else:
+            digest = hashlib.blake2b("\x1e".join("\x1f".join(map(str, r)) for r in snapshot).encode("utf-8"), digest_size=16).hexdigest()
+        if manifest.get("tab_digest") == digest:
+            return manifest
+
+        partitions = {}
+        if snapshot is not None:
+            header = [str(c) for c in snapshot[0]]
+            width = len(header)
+            status = header.index("_상태") if "_상태" in header else None
+            data_idx = [i for i, c in enumerate(header) if c not in ARCHIVE_META_COLUMNS]
+            rows = [(list(r) + [""] * width)[:width] for r in snapshot[1:]]
+            done = [[r[i] for i in data_idx] for r in rows if status is not None and r[status] == ARCHIVE_DONE]
+            typed = self.schema.parse([[header[i] for i in data_idx]] + done)
+            if "Date" in typed.columns:
+                typed = typed.dropna(subset=["Date"])
+                os.makedirs(folder, exist_ok=True)
+                for month, part in typed.groupby(typed["Date"].dt.to_period("M").astype(str), sort=True):
+                    part = part.sort_values("Date", kind="stable").reset_index(drop=True)
+                    part_digest = hashlib.blake2b(
+                        pd.util.hash_pandas_object(part.astype(str), index=False).to_numpy().tobytes(), digest_size=8
+                    ).hexdigest()
+                    old = manifest["partitions"].get(month, {})
+                    path = os.path.join(folder, f"{month}.parquet")
+                    if old.get("digest") != part_digest or not os.path.exists(path):
+                        _write_atomic(path, lambda tmp: part.to_parquet(tmp, index=False))
+                    partitions[month] = {
+                        "file": f"{month}.parquet", "rows": int(len(part)), "digest": part_digest,
+                        "min": part["Date"].min().strftime("%Y-%m-%d"), "max": part["Date"].max().strftime("%Y-%m-%d"),
+                    }
+        for month in set(manifest["partitions"]) - set(partitions):
+            for suffix in (".parquet", ".cube.parquet"):
+                try:
+                    os.remove(os.path.join(folder, f"{month}{suffix}"))
+                except FileNotFoundError:
+                    pass
+        manifest = {"partitions": partitions, "updated_at": time.strftime("%Y-%m-%d %H:%M:%S"), "tab_digest": digest}
+        os.makedirs(folder, exist_ok=True)
+        _write_atomic(os.path.join(folder, "manifest.json"), lambda tmp: _write_json(tmp, manifest))
+        self.stats["materialized"] += 1
+        return manifest
+
+    def manifest(self, spreadsheet_id, sheet_name):
+        """{"partitions": {"2024-01": {"file", "rows", "min", "max"}}, "updated_at"} (보관 탭이 바뀌었으면 월 파일을 먼저 맞춤)"""
+        _, snapshot = self.load_tab(spreadsheet_id, sheet_name)
+        key = (spreadsheet_id, sheet_name)
+        with self._lock:
+            cached = self._synced.get(key)
+        if cached is not None and cached[0] is snapshot:
+            return cached[1]
+        with self._sync_lock:
+            manifest = self._materialize(spreadsheet_id, sheet_name, snapshot)
+        with self._lock:
+            self._synced[key] = (snapshot, manifest)
+        return manifest
+
+    def bounds(self, spreadsheet_id, sheet_name):
+        """보관된 데이터의 (최소 날짜, 최대 날짜) 또는 None"""
+        parts = self.manifest(spreadsheet_id, sheet_name)["partitions"].values()
+        if not parts:
+            return None
+        return pd.Timestamp(min(p["min"] for p in parts)), pd.Timestamp(max(p["max"] for p in parts))
+
+    def _read_partition(self, path):
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            df = self._partitions.get(key)
+            if df is not None:
+                self._partitions.move_to_end(key)
+                self.stats["partition_hits"] += 1
+                return df
+        df = pd.read_parquet(path)
+        with self._lock:
+            self.stats["partition_reads"] += 1
+            self._partitions[key] = df
+            while len(self._partitions) > ARCHIVE_CACHE_MAX_PARTITIONS:
+                self._partitions.popitem(last=False)
+        return df
+
+    def partition_paths(self, spreadsheet_id, sheet_name, start=None, end=None):
+        """start~end 와 날짜가 겹치는 달의 [(월, 파일 경로)] (월 오름차순)"""
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+        folder = self._dir(spreadsheet_id, sheet_name)
+        paths = []
+        for month, part in sorted(self.manifest(spreadsheet_id, sheet_name)["partitions"].items()):
+            if start is not None and pd.Timestamp(part["max"]) < start.normalize():
+                continue
+            if end is not None and pd.Timestamp(part["min"]) > end:
+                continue
+            paths.append((month, os.path.join(folder, part["file"])))
+        return paths
+
+    def read(self, spreadsheet_id, sheet_name, start=None, end=None):
+        """보관된 행 중 Date 가 start~end(날짜 포함) 인 행만 (겹치는 달의 파일만 읽음)"""
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+        frames = [self._read_partition(path) for _, path in self.partition_paths(spreadsheet_id, sheet_name, start, end)]
+        if not frames:
+            return self.schema.empty()
+        return _in_range(self.schema.concat(frames), start, end)
+
+    def load_range(self, spreadsheet_id, sheet_name, hot_df, start, end):
+        """시트(hot) 데이터 + 보관(cold) 데이터에서 start~end 구간만 합쳐서 반환 (Date 오름차순)"""
+        frames = [_in_range(hot_df, pd.Timestamp(start), pd.Timestamp(end))]
+        cold = self.read(spreadsheet_id, sheet_name, start, end)
+        if not cold.empty:
+            frames.append(cold)
+        df = self.schema.concat(frames) if len(frames) > 1 else frames[0]
+        return df.sort_values("Date", kind="stable").reset_index(drop=True)
+
+    # ---------- 보관 실행 (관리자) ----------
+    def archive(self, spreadsheet_id, sheet_name, keep_months=JAM_HOT_MONTHS, today=None):
+        """hot_cutoff 이전 달의 행을 보관 탭으로 옮기고 장비 탭에서 지웁니다 → {월: 옮긴 행 수}
+
+        옮기는 도중 장비 탭이 바뀌면 그 묶음을 되돌리고 ARCHIVE_RETRIES 번까지 다시 시도합니다 (계속 바뀌면 RowConflictError).
+        """
+        moved = {}
+        with self._archive_lock:
+            try:
+                for _ in range(ARCHIVE_RETRIES):
+                    if self._archive_once(spreadsheet_id, sheet_name, hot_cutoff(today, keep_months), moved):
+                        return dict(sorted(moved.items()))
+            finally:
+                _refresh_reads(spreadsheet_id, sheet_name)
+                _refresh_reads(spreadsheet_id, archive_tab(sheet_name))
+                self._absent.pop((spreadsheet_id, sheet_name), None)
+            raise RowConflictError(f"'{sheet_name}' 시트가 보관하는 동안 계속 바뀌었습니다. 잠시 후 다시 시도해주세요.")
+
+    def _archive_once(self, spreadsheet_id, sheet_name, cutoff, moved):
+        """보관 1회 시도 (옮긴 행 수는 moved {월: 행 수} 에 더함) → 끝났으면 True, 장비 탭이 도중에 바뀌어 다시 해야 하면 False"""
+        APPEND_QUEUE.flush(spreadsheet_id, sheet_name)
+        grid = STORAGE.read_grid(spreadsheet_id, sheet_name)
+        if not grid or not grid[0] or "Date" not in grid[0]:
+            return True
+        header = [str(c) for c in grid[0]]
+        width = len(header)
+        rows = [(list(r) + [""] * width)[:width] for r in grid[1:]]
+        keys = [_cells_key(r) for r in rows]
+        typed = self.schema.coerce(pd.DataFrame(rows, columns=header, dtype=object))
+        cold = set(np.flatnonzero((typed["Date"] < cutoff).to_numpy()).tolist())
+
+        # 1) 지난번에 멈춘 "대기" 행 정리: 장비 탭의 같은 자리에 같은 내용이 남아 있으면 이번에 마저 지웁니다.
+        tab = archive_tab(sheet_name)
+        arch = self._read_archive_grid(spreadsheet_id, sheet_name)
+        arch_header = _trim(arch[0]) if arch else []
+        claimed, finish, cancel = {}, [], []  # claimed: 장비 탭 위치 → 보관 탭 행 번호
+        if "_상태" in arch_header:
+            col = {c: i for i, c in enumerate(arch_header)}
+            cold_keys = {keys[i] for i in cold}
+            for number, r in enumerate(arch[1:], start=2):
+                cell = lambda name: str(r[col[name]]) if name in col and col[name] < len(r) else ""
+                if cell("_상태") != ARCHIVE_PENDING:
+                    continue
+                pos = int(cell("_원본행")) - 2 if cell("_원본행").isdigit() else -1
+                if 0 <= pos < len(keys) and keys[pos] == cell("_행키") and pos not in claimed:
+                    if pos in cold:
+                        claimed[pos] = number
+                    else:
+                        cancel.append(number)  # 그사이 날짜가 고쳐져 보관 대상이 아님
+                elif cell("_행키") in cold_keys:
+                    raise RowConflictError(
+                        f"이전 보관 작업이 멈춘 뒤 '{sheet_name}' 시트의 행 위치가 바뀌었습니다. "
+                        f"'{tab}' 탭에서 _상태가 '{ARCHIVE_PENDING}'인 행(보관ID {cell('_보관ID')})을 확인해주세요."
+                    )
+                else:
+                    finish.append(number)  # 장비 탭에서는 이미 지워짐
+        new = sorted(cold - set(claimed))
+        if not new and not claimed and not finish and not cancel:
+            return True
+
+        # 2) 새로 옮길 행을 보관 탭에 "대기"로 추가
+        batch_rows = []
+        if new:
+            target = arch_header or header + ARCHIVE_META_COLUMNS
+            missing = [c for c in header + ARCHIVE_META_COLUMNS if c not in target]
+            if arch is None:
+                STORAGE.ensure_sheet(spreadsheet_id, tab)
+            if not arch_header or missing:
+                target = target + missing
+                STORAGE.write_blocks(spreadsheet_id, tab, [(1, 1, [target])])
+            arch_header = target
+            batch = time.strftime("%Y%m%d%H%M%S") + "-" + uuid.uuid4().hex[:6]
+            out = []
+            for pos in new:
+                values = dict(zip(header, rows[pos]))
+                values.update({"_보관ID": batch, "_원본행": pos + 2, "_행키": keys[pos], "_상태": ARCHIVE_PENDING})
+                out.append([values.get(c, "") for c in target])
+            STORAGE.append_rows(spreadsheet_id, tab, out)
+            batch_col = target.index("_보관ID")
+            batch_rows = [n for n, r in enumerate(STORAGE.read_grid(spreadsheet_id, tab)[1:], start=2)
+                          if batch_col < len(r) and r[batch_col] == batch]
+
+        # 3) 장비 탭이 처음 읽은 그대로인지 확인 (바뀌었으면 이번 묶음 취소 후 다시 시도)
+        if STORAGE.read_grid(spreadsheet_id, sheet_name) != grid:
+            self._set_status(spreadsheet_id, tab, arch_header, batch_rows, ARCHIVE_CANCELLED)
+            return False
+
+        # 4) 아래 구간부터 삭제 (위쪽 행 번호가 밀리지 않음). 지우기 직전에 구간 전체를 다시 읽어 모든 행을 확인하고,
+        #    바뀐 행이 있으면 이미 지운 구간만 "완료", 나머지는 "취소"로 표시하고 다시 시도합니다.
+        arch_rows = dict(claimed)
+        arch_rows.update(zip(new, batch_rows))
+        moving = sorted(arch_rows)
+        deleted = []
+        for first, last in reversed(_runs(moving)):
+            current = STORAGE.read_rows(spreadsheet_id, sheet_name, first + 2, last + 2)
+            if any(_cells_key(cells) != keys[pos] for pos, cells in zip(range(first, last + 1), current)):
+                break
+            STORAGE.delete_rows(spreadsheet_id, sheet_name, first + 2, last + 2)
+            deleted.extend(range(first, last + 1))
+
+        # 5) 보관 탭 상태 표시
+        left = [arch_rows[pos] for pos in moving if pos not in set(deleted)]
+        self._set_status(spreadsheet_id, tab, arch_header, sorted(finish + [arch_rows[pos] for pos in deleted]), ARCHIVE_DONE)
+        self._set_status(spreadsheet_id, tab, arch_header, sorted(cancel + left), ARCHIVE_CANCELLED)
+        for month in typed["Date"].iloc[sorted(deleted)].dt.to_period("M").astype(str):
+            moved[month] = moved.get(month, 0) + 1
+        return not left
+
+    def _set_status(self, spreadsheet_id, tab, header, numbers, status):
+        if not numbers:
+            return
+        col = header.index("_상태") + 1
+        blocks = [(first, col, [[status]] * (last - first + 1)) for first, last in _runs(sorted(numbers))]
+        STORAGE.write_blocks(spreadsheet_id, tab, blocks)
+
+def _in_range(df, start, end):
+    if df.empty or "Date" not in df.columns:
+        return df
+    mask = df["Date"].notna()
+    if start is not None:
+        mask &= df["Date"] >= start.normalize()
+    if end is not None:
+        mask &= df["Date"] < end.normalize() + pd.Timedelta(days=1)
+    return df.loc[mask]
+
+
+JAM_ARCHIVE = JamArchive()
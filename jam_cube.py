@@ -0,0 +1,186 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from config import DataManager, APPEND_QUEUE
+from schema import JAM_SCHEMA
+from jam_archive import JAM_ARCHIVE
+
+
+# ========================================================
+# 🧊 Jam 일별 집계 테이블 (장비 가동 분석 화면용)
+# ========================================================
+# - (날짜, Err.Point, 분류) 마다 Errorcount 합계, Totalunit / MTBA / MTTR / MTBI 최대값, 행 수를 미리 모아 둡니다.
+#   화면의 일별 그래프 / 모듈 점유율 / 분류별 건수는 전부 이 작은 표를 다시 합치거나(max 의 max, sum 의 sum) 잘라서 만듭니다.
+# - hot(시트): 데이터 버전(스냅샷)마다 메모리에 유지하고, 뒤에 행만 붙은 경우에는 새 행만 집계해서 더합니다.
+#   쓰기 큐에서 전송 대기 중인 행은 조회할 때 따로 집계해서 얹습니다.
+# - cold(보관 탭): jam_archive 가 풀어 둔 월 파일 옆에 <월>.cube.parquet 로 저장하고, 월 파일이 바뀌었을 때만 다시 만듭니다.
+CUBE_KEYS = ["Date", "Err.Point", "분류"]
+CUBE_SUMS = ["Errorcount"]
+CUBE_MAXES = ["Totalunit", "MTBA", "MTTR", "MTBI"]
+CUBE_COLUMNS = CUBE_KEYS + CUBE_SUMS + CUBE_MAXES + ["건수"]
+CUBE_CACHE_MAX_FILES = 256
+CUBE_WORKERS = 4
+
+
+def aggregate(df):
+    """타입 변환된 Jam DataFrame → 일별 집계 테이블"""
+    df = df.dropna(subset=["Date"]) if "Date" in df.columns else df.iloc[0:0]
+    if df.empty:
+        return pd.DataFrame(columns=CUBE_COLUMNS)
+    keys = [df["Date"].dt.normalize()] + [df[c].astype(str) if c in df.columns else pd.Series("", index=df.index, name=c) for c in CUBE_KEYS[1:]]
+    values = df.reindex(columns=CUBE_SUMS + CUBE_MAXES).fillna(0)
+    grouped = values.groupby(keys, sort=False, dropna=False)
+    out = grouped[CUBE_SUMS].sum().join(grouped[CUBE_MAXES].max()).join(grouped.size().rename("건수"))
+    return out.reset_index()
+
+
+def combine(cubes):
+    """집계 테이블 여러 개를 합칩니다 (같은 키는 합계/최대값으로 다시 모음)"""
+    cubes = [c for c in cubes if not c.empty]
+    if not cubes:
+        return pd.DataFrame(columns=CUBE_COLUMNS)
+    if len(cubes) == 1:
+        return cubes[0]
+    merged = pd.concat(cubes, ignore_index=True)
+    grouped = merged.groupby(CUBE_KEYS, sort=False)
+    out = grouped[CUBE_SUMS + ["건수"]].sum().join(grouped[CUBE_MAXES].max())
+    return out.reset_index()[CUBE_COLUMNS]
+
+
+def in_range(cube, start, end):
+    if cube.empty:
+        return cube
+    start = pd.Timestamp(start).normalize()
+    end = pd.Timestamp(end).normalize()
+    return cube[(cube["Date"] >= start) & (cube["Date"] <= end)]
+
+
+class SheetCube:
+    """시트(hot) 한 장의 집계 테이블 (스냅샷 기준으로 갱신)"""
+
+    def __init__(self, schema=JAM_SCHEMA):
+        self.schema = schema
+        self._lock = threading.Lock()
+        self.cube = pd.DataFrame(columns=CUBE_COLUMNS)
+        self.snapshot = None
+        self.builds = 0
+        self.appended = 0
+
+    def sync(self, snapshot, typed=None):
+        """스냅샷(원본 셀 값)에 맞춰 갱신하고 집계 테이블을 반환. typed 가 있으면 전체 재집계 때 다시 변환하지 않고 씁니다."""
+        with self._lock:
+            old = self.snapshot
+            if snapshot is old:
+                return self.cube
+            if old and snapshot and old[0] == snapshot[0] and len(snapshot) >= len(old) and snapshot[:len(old)] == old:
+                tail = self.schema.parse([snapshot[0]] + snapshot[len(old):])
+                self.cube = combine([self.cube, aggregate(tail)])
+                self.appended += len(snapshot) - len(old)
+            else:
+                if typed is None:
+                    typed = self.schema.parse(snapshot)
+                self.cube = aggregate(typed)
+                self.builds += 1
+            self.snapshot = snapshot
+            return self.cube
+
+
+_cubes = {}
+_cubes_lock = threading.Lock()
+_cold = OrderedDict()  # (경로, 수정시각) → 집계 테이블
+_cold_lock = threading.Lock()
+
+
+def get_sheet_cube(spreadsheet_id, sheet_name):
+    key = (spreadsheet_id, sheet_name)
+    with _cubes_lock:
+        cube = _cubes.get(key)
+        if cube is None:
+            cube = _cubes[key] = SheetCube()
+        return cube
+
+
+def hot_cube(dm, entry=None):
+    """DataManager(방금 load/load_entries 한 것)의 시트 + 전송 대기 행 집계"""
+    if not dm.snapshot:
+        return pd.DataFrame(columns=CUBE_COLUMNS)
+    typed = entry.typed if entry is not None else None
+    cube = get_sheet_cube(dm.spreadsheet_id, dm.sheet_name).sync(dm.snapshot, typed)
+    pending = APPEND_QUEUE.pending_rows(dm.spreadsheet_id, dm.sheet_name)
+    if pending and dm.snapshot[0]:
+        extra = JAM_SCHEMA.parse([dm.snapshot[0]] + [["" if v is None else str(v) for v in r] for r in pending])
+        cube = combine([cube, aggregate(extra)])
+    return cube
+
+
+def _month_cube(path):
+    """월 보관 파일 옆의 <월>.cube.parquet (없거나 월 파일보다 오래됐으면 새로 만들어 저장)"""
+    cube_path = path[:-len(".parquet")] + ".cube.parquet"
+    part_mtime = os.stat(path).st_mtime_ns
+    try:
+        cube_mtime = os.stat(cube_path).st_mtime_ns
+    except FileNotFoundError:
+        cube_mtime = None
+    if cube_mtime is None or cube_mtime < part_mtime:
+        cube = aggregate(pd.read_parquet(path))
+        tmp = f"{cube_path}.tmp"
+        cube.to_parquet(tmp, index=False)
+        os.replace(tmp, cube_path)
+        cube_mtime = os.stat(cube_path).st_mtime_ns
+    key = (cube_path, cube_mtime)
+    with _cold_lock:
+        cube = _cold.get(key)
+        if cube is not None:
+            _cold.move_to_end(key)
+            return cube
+    cube = pd.read_parquet(cube_path)
+    with _cold_lock:
+        _cold[key] = cube
+        while len(_cold) > CUBE_CACHE_MAX_FILES:
+            _cold.popitem(last=False)
+    return cube
+
+
+def cold_cube(spreadsheet_id, sheet_name, start=None, end=None):
+    """보관된 달 중 start~end 와 겹치는 달의 집계"""
+    return combine([_month_cube(path) for _, path in JAM_ARCHIVE.partition_paths(spreadsheet_id, sheet_name, start, end)])
+
+
+def cube_range(dm, entry, start, end):
+    """hot + cold 집계에서 start~end(날짜 포함) 만 잘라서 반환"""
+    hot = in_range(hot_cube(dm, entry), start, end)
+    cold = in_range(cold_cube(dm.spreadsheet_id, dm.sheet_name, start, end), start, end)
+    return combine([hot, cold])
+
+
+# ========================================================
+# 🏭 여러 장비 집계 (전 호기 비교 화면용)
+# ========================================================
+# - 캐시에 없는 탭은 load_entries 가 한 번의 일괄 호출로 읽으므로, 장비 수와 상관없이 시트 지연은 1번만 듭니다.
+# - 탭별 집계(꼬리 행 파싱, 보관 월 집계 파일 읽기)는 공유 스레드 풀에서 동시에 돌립니다.
+_executor = ThreadPoolExecutor(max_workers=CUBE_WORKERS, thread_name_prefix="jam-cube")
+
+
+def hot_cubes(loaded):
+    """DataManager.load_entries() 결과의 탭별 hot 집계를 동시에 계산 → {탭 이름: 집계표}"""
+    futures = {name: _executor.submit(hot_cube, dm, entry) for name, (dm, entry, _) in loaded.items()}
+    return {name: future.result() for name, future in futures.items()}
+
+
+def fleet_cube(spreadsheet_id, sheet_names, start, end, text_columns=None, name_column="장비", loaded=None):
+    """여러 장비 탭의 start~end 집계를 한 표로 합칩니다 (name_column 에 탭 이름)
+
+    loaded 에 DataManager.load_entries() 결과를 넘기면 다시 읽지 않습니다.
+    """
+    if loaded is None:
+        loaded = DataManager.load_entries(spreadsheet_id, sheet_names, text_columns)
+    futures = [(name, _executor.submit(cube_range, loaded[name][0], loaded[name][1], start, end)) for name in sheet_names]
+    parts = [future.result().assign(**{name_column: name}) for name, future in futures]
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return pd.DataFrame(columns=[name_column] + CUBE_COLUMNS)
+    return pd.concat(parts, ignore_index=True)[[name_column] + CUBE_COLUMNS]
@@ -0,0 +1,232 @@
+import re
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from config import DataManager
+from jam_archive import JAM_ARCHIVE, archive_tab
+
+
+# ========================================================
+# 🔎 Jam 이력 상세 검색용 역색인 (장비 탭별)
+# ========================================================
+# - 컬럼마다 "서로 다른 값" 목록을 두고, 값 → 행 번호 목록 / 글자 2-gram → 값 번호 목록 을 저장합니다.
+#   (현상/원인/조치 같은 한글 짧은 단어도 2글자 단위로 잡힙니다)
+# - 여러 칸에 검색어를 넣으면 칸별로 맞는 행 번호를 구한 뒤 교집합만 남깁니다.
+# - 시트가 바뀌면(데이터 버전) 다시 만들고, 뒤에 행만 붙은 경우에는 새 행만 색인에 추가합니다.
+#   색인은 프로세스 공유이므로 세션마다 들고 있는 스냅샷이 달라도(조금 전에 읽은 세션 = 앞부분만 같음)
+#   스냅샷 객체가 아니라 내용으로 비교해서, 색인된 내용의 앞부분이면 다시 만들지 않고 그 행 수까지만 씁니다.
+# - 아직 시트로 전송 대기 중인 행(쓰기 큐)은 색인에 넣지 않고 검색할 때 직접 비교합니다.
+SEARCH_NGRAM = 2
+SEARCH_MAX_VIEWS = 8  # 색인 내용의 앞부분으로 확인된 (다른 세션의) 스냅샷을 기억해 둘 개수
+
+
+def _norm(value):
+    """엑셀 Ctrl+F 와 같은 비교 기준: 문자열, 숫자의 '.0' 꼬리 제거, 대소문자 무시"""
+    return re.sub(r"\.0$", "", str(value)).lower()
+
+
+def _grams(text):
+    return {text[i:i + SEARCH_NGRAM] for i in range(len(text) - SEARCH_NGRAM + 1)}
+
+
+class _ColumnIndex:
+    def __init__(self):
+        self.values = []       # 값 번호 → 정규화된 값
+        self.value_ids = {}    # 정규화된 값 → 값 번호
+        self.value_rows = []   # 값 번호 → 행 번호 array
+        self.grams = {}        # 2-gram → 값 번호 array
+
+    def add(self, row, value):
+        text = _norm(value)
+        vid = self.value_ids.get(text)
+        if vid is None:
+            vid = len(self.values)
+            self.value_ids[text] = vid
+            self.values.append(text)
+            self.value_rows.append(array("i"))
+            for g in _grams(text):
+                posting = self.grams.get(g)
+                if posting is None:
+                    posting = self.grams[g] = array("i")
+                posting.append(vid)
+        self.value_rows[vid].append(row)
+
+    def match(self, query):
+        """query 를 포함하는 행 번호 (정렬된 numpy 배열)"""
+        if len(query) < SEARCH_NGRAM:
+            vids = range(len(self.values))
+        else:
+            postings = sorted((self.grams.get(g) for g in _grams(query)), key=lambda p: 0 if p is None else len(p))
+            if postings[0] is None:
+                return np.empty(0, dtype=np.int64)
+            vids = set(postings[0])
+            for p in postings[1:]:
+                vids.intersection_update(p)
+                if not vids:
+                    return np.empty(0, dtype=np.int64)
+        parts = [self.value_rows[v] for v in vids if query in self.values[v]]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate([np.frombuffer(p, dtype=np.int32) for p in parts]).astype(np.int64))
+
+
+class JamSearchIndex:
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, snapshot):
+        self._cols = {c: _ColumnIndex() for c in self.columns}
+        self._snapshot = snapshot
+        self._views = OrderedDict()  # id(스냅샷) → (스냅샷, 색인 앞부분 중 그 스냅샷에 해당하는 행 수)
+        self.size = 0
+        self.builds = 0
+        self.appended = 0
+
+    def _add_rows(self, df, start, stop):
+        for col in self.columns:
+            index = self._cols[col]
+            if col in df.columns:
+                for i, v in enumerate(df[col].iloc[start:stop].tolist(), start=start):
+                    index.add(i, v)
+            else:
+                for i in range(start, stop):
+                    index.add(i, "")
+        self.size = stop
+
+    def _sync(self, df, snapshot):
+        """df(load() 결과)와 그 원본 셀 값(snapshot)에 맞춰 색인을 갱신하고, 이 df 에 쓸 수 있는 색인 행 수를 반환 (락을 잡은 상태에서 호출)"""
+        indexed = max(len(snapshot) - 1, 0) if snapshot else 0
+        indexed = min(indexed, len(df))
+        if snapshot is self._snapshot and self.size == indexed:
+            return indexed
+        view = self._views.get(id(snapshot))
+        if view is not None and view[0] is snapshot:
+            self._views.move_to_end(id(snapshot))
+            return min(view[1], indexed)
+        old = self._snapshot
+        if old and snapshot and self.size == len(old) - 1 and len(snapshot) < len(old) and old[:len(snapshot)] == snapshot:
+            # 색인보다 먼저 읽은 스냅샷 (다른 세션): 색인의 앞부분만 씁니다.
+            self._views[id(snapshot)] = (snapshot, indexed)
+            while len(self._views) > SEARCH_MAX_VIEWS:
+                self._views.popitem(last=False)
+            return indexed
+        appended_only = (
+            old and snapshot and self.size == len(old) - 1
+            and len(snapshot) >= len(old) and snapshot[:len(old)] == old
+        )
+        if appended_only:
+            start = self.size
+            self._snapshot = snapshot
+            self.appended += indexed - start
+        else:
+            builds = self.builds
+            self._reset(snapshot)
+            self.builds = builds + 1
+            start = 0
+        self._add_rows(df, start, indexed)
+        return indexed
+
+    def search(self, df, snapshot, criteria):
+        """criteria = {컬럼: 검색어}. 모든 조건을 만족하는 df 행 위치(정렬된 배열) 반환"""
+        criteria = {c: str(q).strip().lower() for c, q in criteria.items() if str(q).strip()}
+        if not criteria:
+            return np.arange(len(df))
+        with self._lock:
+            size = self._sync(df, snapshot)
+            result = None
+            for col, query in sorted(criteria.items(), key=lambda kv: -len(kv[1])):
+                if col not in self._cols:
+                    continue
+                rows = self._cols[col].match(query)
+                if size < self.size:
+                    rows = rows[:np.searchsorted(rows, size)]
+                result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+                if len(result) == 0:
+                    break
+        if result is None:
+            result = np.arange(size)
+
+        # 색인 뒤에 붙은 (전송 대기) 행은 직접 비교
+        tail = []
+        for i in range(size, len(df)):
+            row = df.iloc[i]
+            if all(col in df.columns and query in _norm(row[col]) for col, query in criteria.items() if col in self.columns):
+                tail.append(i)
+        if tail:
+            result = np.concatenate([result, np.asarray(tail, dtype=np.int64)])
+        return result
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_search_index(spreadsheet_id, sheet_name, columns):
+    """장비 탭별로 프로세스 전체가 공유하는 검색 색인"""
+    key = (spreadsheet_id, sheet_name, tuple(columns))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = JamSearchIndex(columns)
+        return index
+
+
+def search_archive(spreadsheet_id, sheet_name, text_columns, search_columns, criteria):
+    """장비 탭의 보관 탭("<탭> 보관")에서 criteria 에 맞는 보관 완료 행 (보관 탭도 같은 방식의 색인을 씀)"""
+    df, snapshot = JAM_ARCHIVE.load_tab(spreadsheet_id, sheet_name, text_columns)
+    if df.empty:
+        return JAM_ARCHIVE.completed(df)
+    if criteria:
+        index = get_search_index(spreadsheet_id, archive_tab(sheet_name), search_columns)
+        df = df.iloc[index.search(df, snapshot, criteria)]
+    return JAM_ARCHIVE.completed(df)
+
+
+# ========================================================
+# 🌐 전체 장비 동시 검색
+# ========================================================
+# - 장비 탭마다 읽기 + 색인 검색을 스레드 풀에서 동시에 돌리고, 끝나는 순서대로 결과를 돌려줍니다.
+# - 풀은 프로세스 전체가 공유하므로 여러 명이 동시에 검색해도 시트 호출이 JAM_SEARCH_WORKERS 개를 넘지 않습니다.
+JAM_SEARCH_WORKERS = 4
+
+_executor = ThreadPoolExecutor(max_workers=JAM_SEARCH_WORKERS, thread_name_prefix="jam-search")
+
+
+def _search_tab(spreadsheet_id, sheet_name, text_columns, search_columns, criteria, type_filter):
+    started = time.perf_counter()
+    dm = DataManager(spreadsheet_id, sheet_name, text_columns)
+    df, _ = dm.load()
+    if not df.empty and criteria:
+        index = get_search_index(spreadsheet_id, sheet_name, search_columns)
+        df = df.iloc[index.search(df, dm.snapshot, criteria)]
+    # 보관 탭으로 옮긴 이전 달도 같이 찾습니다 (jam_archive.py)
+    archived = search_archive(spreadsheet_id, sheet_name, text_columns, search_columns, criteria)
+    if not archived.empty:
+        df = pd.concat([archived, df], ignore_index=True)
+    if type_filter and "분류" in df.columns:
+        df = df[df["분류"] == type_filter]
+    return df, time.perf_counter() - started
+
+
+def search_all(spreadsheet_id, sheet_names, text_columns, search_columns, criteria, type_filter=None):
+    """여러 장비 탭을 동시에 검색해서, 끝나는 순서대로 (탭 이름, 결과 DataFrame, 걸린 초, 에러) 를 yield"""
+    submitted = time.perf_counter()
+    futures = {
+        _executor.submit(_search_tab, spreadsheet_id, name, text_columns, search_columns, criteria, type_filter): name
+        for name in sheet_names
+    }
+    for future in as_completed(futures):
+        name = futures[future]
+        try:
+            df, elapsed = future.result()
+            yield name, df, elapsed, None
+        except Exception as e:
+            yield name, None, time.perf_counter() - submitted, e
@@ -1,7 +1,10 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from database import DataManager
+from config import DataManager, SHEETS_GOVERNOR, READ_CACHE
+from schema import JAM_COLUMNS
+from spc import ensure_spc
+from jam_archive import JAM_ARCHIVE
 
 app = FastAPI(title="CS 장비관리 통합 시스템 API 서버", version="1.0.0")
 
@@ -14,7 +17,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-SPREADSHEET_ID = "1XcqwD79ggyoZ82OWVGRqJ_vXbA3fBU77b1vompB3bjA"
+SPREADSHEET_ID = "1XcqwD79ggyoZ82OWVGRqJ_vXbA3fBU77b1vompB3bjA"      # 마스터 파일 (업무일지 등)
+JAM_SPREADSHEET_ID = "1vGc9beBabeNpI-AU5zbiVwXkHDyDz-pN1qfrPpHfKxs"  # Jam 파일 (SLH1 호기별 탭, app.py 와 같은 값)
 
 # ==========================================
 # 📝 1. 업무일지 API
@@ -78,16 +82,13 @@ class JamLogEntry(BaseModel):
     조치결과: str = ""
 
 @app.get("/api/jamlog/{equipment_name}")
-def get_jam_log(equipment_name: str):
-    """모바일 앱에서 특정 장비의 Jam 이력을 요청할 때 사용"""
+def get_jam_log(equipment_name: str, include_archive: bool = True):
+    """모바일 앱에서 특정 장비의 Jam 이력을 요청할 때 사용 (include_archive 면 보관 탭으로 옮긴 이전 달도 포함)"""
     try:
-        exact_columns = [
-            "Date", "Totalunit", "Errorcode", "Errorcount", "Error Masage", 
-            "현상", "원인", "조치", "Err.Point", "분류", "조치자", "Err. Time", 
-            "MTBA", "MTTR", "MTBI", "도번", "수량", "입고일", "반입일", "조치위치", "조치결과"
-        ]
-        db = DataManager(SPREADSHEET_ID, equipment_name, exact_columns)
+        db = DataManager(JAM_SPREADSHEET_ID, equipment_name, JAM_COLUMNS)
         df, _ = db.load()
+        if include_archive:
+            df = JAM_ARCHIVE.with_archived(JAM_SPREADSHEET_ID, equipment_name, df, JAM_COLUMNS)
         
         data = df.to_dict(orient="records")
         return {"status": "success", "equipment": equipment_name, "data": data}
@@ -98,7 +99,7 @@ def get_jam_log(equipment_name: str):
 def add_jam_log(equipment_name: str, entry: JamLogEntry):
     """모바일 앱에서 특정 장비에 새로운 Jam 이력을 등록할 때 사용"""
     try:
-        db = DataManager(SPREADSHEET_ID, equipment_name)
+        db = DataManager(JAM_SPREADSHEET_ID, equipment_name)
         
         # Pydantic 모델의 언더바(_) 변수를 구글시트 실제 컬럼명(공백, 점 등)에 맞춰 복구
         save_data = entry.dict()
@@ -110,3 +111,30 @@ def add_jam_log(equipment_name: str, entry: JamLogEntry):
         return {"status": "success", "message": f"{equipment_name} 장비에 Jam 이력이 등록되었습니다."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+# ==========================================
+# 📊 3. 구글 시트 호출 현황 API
+# ==========================================
+@app.get("/api/sheets/stats")
+def get_sheets_stats():
+    """할당량 관리자(제한/합쳐진/재시도 호출 수)와 읽기 캐시 카운터 조회"""
+    return {"status": "success", "governor": SHEETS_GOVERNOR.snapshot(), "read_cache": dict(READ_CACHE.stats)}
+
+# ==========================================
+# 🚨 4. SPC 이상 감지 API (EWMA / CUSUM)
+# ==========================================
+@app.get("/api/spc/{equipment_name}")
+def get_spc_flags(equipment_name: str, date_from: str = None, date_to: str = None, include_open_day: bool = False):
+    """장비의 일별 Jam / PPJ / Err.Point 관리도 이상 판정 목록과 항목별 현재 상태 (spc.py)
+
+    include_open_day 면 아직 끝나지 않은 마지막 날의 잠정 판정도 포함합니다 ("잠정" 이 true 인 행).
+    """
+    try:
+        dm, entry, _ = DataManager.load_entries(JAM_SPREADSHEET_ID, [equipment_name], JAM_COLUMNS)[equipment_name]
+        monitor = ensure_spc(dm, entry)
+        flags = monitor.flag_table(date_from, date_to, include_open_day)
+        flags["Date"] = flags["Date"].dt.strftime("%Y-%m-%d")
+        return {"status": "success", "equipment": equipment_name,
+                "flags": flags.to_dict(orient="records"), "series": monitor.summary()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
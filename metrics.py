@@ -0,0 +1,232 @@
+import numpy as np
+import pandas as pd
+
+
+# ========================================================
+# 📐 신뢰성 지표 계산 (PPJ / 누적 PPJ / MTBA·MTTR·MTBI / Jam 발생률)
+# ========================================================
+# - 입력은 jam_cube 의 일별 집계표(날짜별 Totalunit 최대, Errorcount 합계, MTBA/MTTR/MTBI 최대)입니다.
+# - 장비 여러 대를 (장비 × 날짜) 2차원 배열로 펴서 누적합/이동평균을 NumPy 로 한 번에 계산합니다.
+#   (행마다 파이썬 함수를 부르는 DataFrame.apply / expanding().mean() 을 쓰지 않습니다)
+# - 주간/월간은 일별 값을 묶어서 계산합니다: 생산량·Jam 은 합계, MTBA/MTTR/MTBI 는 최대값.
+# - 실행하면 기존 화면 계산 방식과 속도를 비교하는 벤치마크를 돌립니다:  python metrics.py
+MT_COLUMNS = ["MTBA", "MTTR", "MTBI"]
+DAILY_COLUMNS = ["Totalunit", "Errorcount"] + MT_COLUMNS
+FREQ_RULES = {"D": None, "W": "W-SUN", "M": "M"}  # 주간은 월요일~일요일 (pandas 주 기간은 끝나는 요일로 표기)
+ROLLING_WINDOW = 7
+
+
+def _ratio(num, den):
+    """den 이 0 이면 num 그대로 (기존 화면의 PPJ 규칙: Jam 이 없으면 생산량을 PPJ 로 표시)"""
+    num = np.asarray(num, dtype=np.float64)
+    den = np.asarray(den, dtype=np.float64)
+    return np.divide(num, den, out=num.copy(), where=den > 0)
+
+
+def _rate(num, den):
+    """den 이 0 이면 0"""
+    num = np.asarray(num, dtype=np.float64)
+    den = np.asarray(den, dtype=np.float64)
+    return np.divide(num, den, out=np.zeros_like(num), where=den > 0)
+
+
+def daily_table(cube, start, end, by=None):
+    """일별 집계표 → start~end 모든 날짜가 있는 일별 표 (없는 날은 0)
+
+    by 에 컬럼 이름(예: "장비")을 주면 그 값마다 같은 날짜 뼈대를 만들어 세로로 이어 붙입니다.
+    """
+    dates = pd.date_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize(), freq="D")
+    if cube.empty:
+        grouped = pd.DataFrame(columns=DAILY_COLUMNS)
+        groups = [None] if by is None else []
+    else:
+        keys = ["Date"] if by is None else [by, "Date"]
+        grouped = cube.groupby(keys, sort=False, observed=True).agg(
+            Totalunit=("Totalunit", "max"), Errorcount=("Errorcount", "sum"),
+            MTBA=("MTBA", "max"), MTTR=("MTTR", "max"), MTBI=("MTBI", "max"),
+        )
+        groups = [None] if by is None else list(dict.fromkeys(cube[by].tolist()))
+    if by is None:
+        out = grouped.reindex(dates).fillna(0)
+        out.index.name = "Date"
+        return out.astype("float64").reset_index()
+    index = pd.MultiIndex.from_product([groups, dates], names=[by, "Date"])
+    return grouped.reindex(index).fillna(0).astype("float64").reset_index()
+
+
+def _bucket(daily, freq, by):
+    """일별 표 → 주간/월간 표 (생산량·Jam 합계, MTBA/MTTR/MTBI 최대)"""
+    rule = FREQ_RULES[freq]
+    if rule is None:
+        return daily
+    period = daily["Date"].dt.to_period(rule).dt.start_time
+    keys = [period] if by is None else [daily[by], period]
+    grouped = daily.groupby(keys, sort=False)
+    out = grouped[["Totalunit", "Errorcount"]].sum().join(grouped[MT_COLUMNS].max())
+    return out.reset_index()
+
+
+def reliability(daily, freq="D", window=ROLLING_WINDOW, by=None):
+    """daily_table() 결과 → 지표 표
+
+    추가 컬럼: PPJ, Cum_Totalunit, Cum_Errorcount, Cum_PPJ, Jam_Rate(천 개당 Jam),
+              MTBA/MTTR/MTBI 각각 <컬럼>_cum_avg(누적 평균), <컬럼>_roll(최근 window 구간 평균)
+    by 를 주면 그 값(장비)마다 따로 누적합니다. 모든 장비를 (장비 × 기간) 배열 하나로 계산합니다.
+    """
+    table = _bucket(daily, freq, by)
+    if by is None:
+        groups = np.zeros(len(table), dtype=np.int64)
+    else:
+        groups = pd.factorize(table[by])[0]
+    n_groups = int(groups.max()) + 1 if len(groups) else 0
+    # 장비마다 기간 수가 같으므로 (daily_table 이 같은 뼈대를 만듦) 2차원으로 펼 수 있습니다.
+    width = len(table) // n_groups if n_groups else 0
+    order = np.argsort(groups, kind="stable")
+
+    def grid(col):
+        return table[col].to_numpy(dtype=np.float64)[order].reshape(n_groups, width)
+
+    def flat(values):
+        out = np.empty(len(table), dtype=np.float64)
+        out[order] = values.reshape(-1)
+        return out
+
+    tu, err = grid("Totalunit"), grid("Errorcount")
+    cum_tu, cum_err = np.cumsum(tu, axis=1), np.cumsum(err, axis=1)
+    table["PPJ"] = flat(_ratio(tu, err))
+    table["Cum_Totalunit"] = flat(cum_tu)
+    table["Cum_Errorcount"] = flat(cum_err)
+    table["Cum_PPJ"] = flat(_ratio(cum_tu, cum_err))
+    table["Jam_Rate"] = flat(_rate(err * 1000.0, tu))
+
+    counts = np.arange(1, width + 1, dtype=np.float64)
+    for col in MT_COLUMNS:
+        values = grid(col)
+        cum = np.cumsum(values, axis=1)
+        table[f"{col}_cum_avg"] = flat(cum / counts)
+        # 이동 평균: 누적합의 차이 / 구간 길이 (앞쪽 window 미만 구간은 있는 만큼으로 평균)
+        shifted = np.zeros_like(cum)
+        if window < width:
+            shifted[:, window:] = cum[:, :-window]
+        table[f"{col}_roll"] = flat((cum - shifted) / np.minimum(counts, window))
+    return table
+
+
+def ranking(daily, cube, by="장비"):
+    """장비별 순위표 (PPJ 낮은 순) - 합쳐진 일별 표 / 집계표를 각각 groupby 한 번으로 계산
+
+    컬럼: 순위, by, 생산량, Jam, PPJ, Jam_Rate, MTBA/MTTR/MTBI(값이 있는 날의 평균), 최다 Err.Point, 최다 Err.Point Jam
+    """
+    columns = ["순위", by, "생산량", "Jam", "PPJ", "Jam_Rate"] + MT_COLUMNS + ["최다 Err.Point", "최다 Err.Point Jam"]
+    if daily.empty:
+        return pd.DataFrame(columns=columns)
+    grouped = daily.groupby(by, sort=False)
+    table = grouped[["Totalunit", "Errorcount"]].sum()
+    # 일별 표의 빈 날(0)은 평균에서 뺍니다.
+    table = table.join(daily[MT_COLUMNS].where(daily[MT_COLUMNS] > 0).groupby(daily[by], sort=False).mean().fillna(0))
+    table["PPJ"] = _ratio(table["Totalunit"], table["Errorcount"])
+    table["Jam_Rate"] = _rate(table["Errorcount"].to_numpy() * 1000.0, table["Totalunit"])
+
+    points = cube[(cube["Err.Point"] != "") & (cube["Errorcount"] > 0)]
+    top = (points.groupby([by, "Err.Point"], sort=False, observed=True)["Errorcount"].sum().reset_index()
+           .sort_values([by, "Errorcount"], ascending=[True, False], kind="stable").drop_duplicates(by)
+           .set_index(by).rename(columns={"Err.Point": "최다 Err.Point", "Errorcount": "최다 Err.Point Jam"}))
+    table = table.join(top)
+    table["최다 Err.Point"] = table["최다 Err.Point"].fillna("")
+    table["최다 Err.Point Jam"] = table["최다 Err.Point Jam"].fillna(0)
+
+    table = table.rename(columns={"Totalunit": "생산량", "Errorcount": "Jam"}).sort_values("PPJ", kind="stable").reset_index()
+    table.insert(0, "순위", np.arange(1, len(table) + 1))
+    return table[columns]
+
+
+def labels(values, decimals=0):
+    """그래프 막대/점 위에 표시할 굵은 숫자 라벨 목록 (Series.apply 대신 리스트 한 번에)"""
+    fmt = f"<b>{{:,.{decimals}f}}</b>"
+    return [fmt.format(v) for v in np.asarray(values, dtype=np.float64).tolist()]
+
+
+# ========================================================
+# ⏱️ 벤치마크: 기존 화면 계산 방식 vs 이 모듈
+# ========================================================
+def _synthetic_cube(equipment, days, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end=pd.Timestamp("2026-10-17"), periods=days, freq="D")
+    parts = []
+    for name in equipment:
+        n = days * 4
+        parts.append(pd.DataFrame({
+            "장비": name,
+            "Date": np.repeat(dates, 4),
+            "Err.Point": np.tile(["P1", "P2", "P3", ""], days),
+            "분류": np.tile(["A", "B", "C", "D"], days),
+            "Errorcount": rng.integers(0, 5, n),
+            "Totalunit": rng.integers(0, 20000, n),
+            "MTBA": rng.random(n) * 60, "MTTR": rng.random(n) * 10, "MTBI": rng.random(n) * 80,
+            "건수": 1,
+        }))
+    return pd.concat(parts, ignore_index=True), dates[0], dates[-1]
+
+
+def _current_code_path(cube, start, end):
+    """tab_equipment_data 의 기존 계산 (장비 하나)"""
+    full_date_range = pd.date_range(start=start, end=end).date
+    grouped_basic = cube.groupby(cube["Date"].dt.date).agg({"Totalunit": "max", "Errorcount": "sum"})
+    df = grouped_basic.reindex(full_date_range).fillna(0).reset_index()
+    df["Cum_Totalunit"] = df["Totalunit"].cumsum()
+    df["Cum_Errorcount"] = df["Errorcount"].cumsum()
+    df["PPJ"] = df.apply(lambda row: row["Totalunit"] / row["Errorcount"] if row["Errorcount"] > 0 else row["Totalunit"], axis=1)
+    df["Cum_PPJ"] = df.apply(lambda row: row["Cum_Totalunit"] / row["Cum_Errorcount"] if row["Cum_Errorcount"] > 0 else row["Cum_Totalunit"], axis=1)
+    texts = [df[c].apply(lambda x: f"<b>{x:,.0f}</b>") for c in ("Totalunit", "Errorcount", "PPJ", "Cum_PPJ")]
+    grouped_mt = cube.groupby(cube["Date"].dt.date)[MT_COLUMNS].max()
+    mt = grouped_mt.reindex(full_date_range).fillna(0).reset_index()
+    for col in MT_COLUMNS:
+        mt[f"{col}_cum_avg"] = mt[col].expanding().mean()
+        texts.append(mt[col].apply(lambda x: f"<b>{x:,.0f}</b>"))
+        texts.append(mt[f"{col}_cum_avg"].apply(lambda x: f"<b>{x:,.1f}</b>"))
+    return df, mt, texts
+
+
+def benchmark(equipment=("SLH1 #1", "SLH1 #4", "SLH1 #5", "SLH1 #6", "SLH1 #7"), years=4, repeat=3):
+    import time
+
+    cube, start, end = _synthetic_cube(equipment, years * 365)
+
+    def best(fn):
+        times = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - started)
+        return min(times), result
+
+    t_old, old = best(lambda: {name: _current_code_path(part, start, end) for name, part in cube.groupby("장비", sort=False)})
+
+    def new():
+        table = reliability(daily_table(cube, start, end, by="장비"), by="장비")
+        texts = [labels(table[c]) for c in ("Totalunit", "Errorcount", "PPJ", "Cum_PPJ")]
+        for col in MT_COLUMNS:
+            texts += [labels(table[col]), labels(table[f"{col}_cum_avg"], 1)]
+        return table, texts
+    t_new, (table, _) = best(new)
+    t_calc, _ = best(lambda: reliability(daily_table(cube, start, end, by="장비"), by="장비"))
+
+    # 결과가 같은지 확인 (장비별 PPJ / 누적 PPJ / 누적 평균)
+    for name, (df, mt, _) in old.items():
+        mine = table[table["장비"] == name]
+        for col in ("PPJ", "Cum_PPJ"):
+            assert np.allclose(mine[col].to_numpy(), df[col].to_numpy()), col
+        for col in MT_COLUMNS:
+            assert np.allclose(mine[f"{col}_cum_avg"].to_numpy(), mt[f"{col}_cum_avg"].to_numpy()), col
+
+    t_weekly, _ = best(lambda: reliability(daily_table(cube, start, end, by="장비"), freq="W", by="장비"))
+    t_monthly, _ = best(lambda: reliability(daily_table(cube, start, end, by="장비"), freq="M", by="장비"))
+    print(f"장비 {len(equipment)}대 × {years}년 ({len(cube):,} 집계 행, 일별 {years * 365:,}일)")
+    print(f"  기존 방식 (apply / expanding / Series.apply 라벨): {t_old * 1000:,.0f} ms")
+    print(f"  metrics.py 일별 (지표 + 라벨)                    : {t_new * 1000:,.0f} ms  ({t_old / t_new:,.1f}배)")
+    print(f"  metrics.py 일별 (지표만)                         : {t_calc * 1000:,.0f} ms")
+    print(f"  metrics.py 주간 / 월간                           : {t_weekly * 1000:,.0f} ms / {t_monthly * 1000:,.0f} ms")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,103 @@
+import pandas as pd
+
+
+# ========================================================
+# 📐 워크시트 스키마 레지스트리
+# ========================================================
+# - 시트마다 컬럼 이름과 타입을 여기서 한 번만 선언합니다.
+# - 읽을 때 원본 셀 문자열(grid)을 바로 타입 변환하므로, 화면마다 to_datetime / to_numeric 을 다시 돌릴 필요가 없습니다.
+# - 타입 종류
+#     text     : 문자열 (앞뒤 공백 제거)
+#     code     : 문자열 + 숫자처럼 저장된 값의 ".0" 꼬리 제거 (예: 에러코드)
+#     date     : datetime64 (변환 실패는 NaT)
+#     int      : int32 (빈칸/변환 실패는 0)
+#     float    : float32 (빈칸/변환 실패는 0)
+#     category : 반복되는 값이 많은 문자열 (분류, Err.Point, 조치자 등)
+class SheetSchema:
+    def __init__(self, name, columns):
+        self.name = name
+        self.dtypes = dict(columns)
+
+    @property
+    def columns(self):
+        return list(self.dtypes)
+
+    def parse(self, grid):
+        """get_values() 모양의 원본 셀 값 → 타입이 지정된 DataFrame
+
+        빈 행도 그대로 둡니다 (i 번째 행 = 시트 i+2 행). 집계할 때는 Date 가 NaT 인 행을 거르면 됩니다.
+        """
+        if not grid or not grid[0]:
+            return self.empty()
+        header = [str(c) for c in grid[0]]
+        width = len(header)
+        rows = [(list(r) + [""] * width)[:width] for r in grid[1:]]
+        raw = pd.DataFrame(rows, columns=header, dtype=object) if rows else pd.DataFrame(columns=header, dtype=object)
+        return self.coerce(raw)
+
+    def coerce(self, df):
+        """문자열 DataFrame 의 선언된 컬럼을 타입 변환 (선언되지 않은 컬럼은 문자열 그대로)"""
+        out = {}
+        for col in df.columns:
+            values = df[col].fillna("").astype(str).str.strip()
+            out[col] = _convert(values, self.dtypes.get(col, "text"))
+        typed = pd.DataFrame(out, index=df.index)
+        return typed.reset_index(drop=True)
+
+    def concat(self, frames):
+        """타입 변환된 DataFrame 여러 개를 합칩니다 (카테고리 종류가 달라도 카테고리 타입 유지)"""
+        df = pd.concat(frames, ignore_index=True)
+        for col, kind in self.dtypes.items():
+            if kind == "category" and col in df.columns and df[col].dtype != "category":
+                df[col] = df[col].astype(str).astype("category")
+        return df
+
+    def empty(self):
+        return self.coerce(pd.DataFrame(columns=self.columns, dtype=object))
+
+
+def _convert(values, kind):
+    if kind == "code":
+        return values.str.replace(r"\.0$", "", regex=True)
+    if kind == "date":
+        return pd.to_datetime(values.replace("", None), errors="coerce", format="mixed")
+    if kind == "int":
+        return pd.to_numeric(values.str.replace(",", ""), errors="coerce").fillna(0).round().astype("int32")
+    if kind == "float":
+        return pd.to_numeric(values.str.replace(",", ""), errors="coerce").fillna(0).astype("float32")
+    if kind == "category":
+        return values.astype("category")
+    return values
+
+
+# ---------- 시트별 스키마 ----------
+JAM_SCHEMA = SheetSchema("jam", [
+    ("Date", "date"), ("Totalunit", "int"), ("Errorcode", "code"), ("Errorcount", "int"),
+    ("Error Masage", "text"), ("현상", "text"), ("원인", "text"), ("조치", "text"),
+    ("Err.Point", "category"), ("분류", "category"), ("조치자", "category"), ("Err. Time", "text"),
+    ("MTBA", "float"), ("MTTR", "float"), ("MTBI", "float"), ("도번", "code"), ("수량", "code"),
+    ("입고일", "text"), ("반입일", "text"), ("조치위치", "text"), ("조치결과", "category"),
+])
+
+WORK_LOG_SCHEMA = SheetSchema("work_log", [
+    ("날짜", "date"), ("장비", "category"), ("작성자", "category"),
+    ("업무내용", "text"), ("비고", "text"), ("첨부", "text"),
+])
+
+# Jam 시트 컬럼 순서 (입력 폼 / API / 분석 화면 공용)
+JAM_COLUMNS = JAM_SCHEMA.columns
+WORK_LOG_COLUMNS = WORK_LOG_SCHEMA.columns
+
+_REGISTRY = {"업무일지": WORK_LOG_SCHEMA}
+
+
+def register_schema(sheet_names, schema):
+    if isinstance(sheet_names, str):
+        sheet_names = [sheet_names]
+    for name in sheet_names:
+        _REGISTRY[name] = schema
+
+
+def get_schema(sheet_name):
+    """시트 이름에 등록된 스키마 (없으면 None)"""
+    return _REGISTRY.get(sheet_name)
@@ -0,0 +1,175 @@
+import sqlite3
+import threading
+import hashlib
+import json
+import time
+
+
+# ========================================================
+# 🗄️ 구글 시트 로컬 SQLite 미러
+# ========================================================
+# - 워크시트 1개 = SQLite 테이블 1개 (c0, c1, ... 위치 기반 컬럼 + 시트 행 번호 _row)
+# - 행마다 내용 해시(_hash)를 같이 저장해서, 동기화할 때는 바뀐 행만 고쳐 씁니다.
+# - 날짜(Date/날짜)와 장비(장비) 컬럼에는 인덱스를 걸어 기간/장비 조회를 빠르게 합니다.
+DATE_COLUMN_NAMES = ("Date", "날짜")
+EQUIP_COLUMN_NAMES = ("장비", "장비호기")
+
+
+def _row_hash(row):
+    return hashlib.blake2b("\x1f".join(row).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _table_name(spreadsheet_id, sheet_name):
+    return "t_" + hashlib.blake2b(f"{spreadsheet_id}/{sheet_name}".encode("utf-8"), digest_size=8).hexdigest()
+
+
+class SheetMirror:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS _sheets ("
+            " spreadsheet_id TEXT, sheet_name TEXT, table_name TEXT, header TEXT,"
+            " version INTEGER DEFAULT 0, synced_at REAL, PRIMARY KEY (spreadsheet_id, sheet_name))"
+        )
+        self._conn.commit()
+
+    # ---------- 메타 정보 ----------
+    def _meta(self, spreadsheet_id, sheet_name):
+        row = self._conn.execute(
+            "SELECT table_name, header, version, synced_at FROM _sheets WHERE spreadsheet_id=? AND sheet_name=?",
+            (spreadsheet_id, sheet_name)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"table": row[0], "header": json.loads(row[1]), "version": row[2], "synced_at": row[3]}
+
+    def version(self, spreadsheet_id, sheet_name):
+        """동기화로 내용이 바뀔 때마다 올라가는 번호 (한 번도 동기화 안 됐으면 None)"""
+        with self._lock:
+            meta = self._meta(spreadsheet_id, sheet_name)
+            return None if meta is None else meta["version"]
+
+    def synced_at(self, spreadsheet_id, sheet_name):
+        with self._lock:
+            meta = self._meta(spreadsheet_id, sheet_name)
+            return None if meta is None else meta["synced_at"]
+
+    # ---------- 쓰기 ----------
+    def _create_table(self, spreadsheet_id, sheet_name, header, version):
+        table = _table_name(spreadsheet_id, sheet_name)
+        cols = ", ".join(f"c{i} TEXT" for i in range(len(header)))
+        self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+        self._conn.execute(f"CREATE TABLE {table} (_row INTEGER PRIMARY KEY, _hash TEXT{', ' + cols if cols else ''})")
+        for i, name in enumerate(header):
+            if name in DATE_COLUMN_NAMES or name in EQUIP_COLUMN_NAMES:
+                self._conn.execute(f"CREATE INDEX {table}_c{i} ON {table} (c{i})")
+        self._conn.execute(
+            "INSERT OR REPLACE INTO _sheets (spreadsheet_id, sheet_name, table_name, header, version, synced_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (spreadsheet_id, sheet_name, table, json.dumps(header, ensure_ascii=False), version, time.time())
+        )
+        return table
+
+    def apply_grid(self, spreadsheet_id, sheet_name, grid):
+        """시트 전체 셀 값(grid)을 받아 바뀐 행만 반영. 바뀐 행 수를 반환합니다."""
+        header = [str(c) for c in grid[0]] if grid and grid != [[]] else []
+        width = len(header)
+        rows = [[str(v) for v in (list(r) + [""] * width)[:width]] for r in grid[1:]] if width else []
+
+        with self._lock, self._conn:
+            meta = self._meta(spreadsheet_id, sheet_name)
+            if meta is None or meta["header"] != header:
+                version = (meta["version"] + 1) if meta else 1
+                table = self._create_table(spreadsheet_id, sheet_name, header, version)
+                existing = {}
+            else:
+                table = meta["table"]
+                version = meta["version"]
+                existing = dict(self._conn.execute(f"SELECT _row, _hash FROM {table}"))
+
+            placeholders = ", ".join(["?"] * (width + 2))
+            changed = []
+            for i, row in enumerate(rows, start=2):
+                h = _row_hash(row)
+                if existing.get(i) != h:
+                    changed.append([i, h] + row)
+            if changed and width:
+                self._conn.executemany(f"INSERT OR REPLACE INTO {table} VALUES ({placeholders})", changed)
+            removed = self._conn.execute(f"DELETE FROM {table} WHERE _row > ?", (len(rows) + 1,)).rowcount if existing else 0
+
+            n_changed = len(changed) + removed
+            if n_changed and meta is not None and meta["header"] == header:
+                version += 1
+            self._conn.execute(
+                "UPDATE _sheets SET version=?, synced_at=? WHERE spreadsheet_id=? AND sheet_name=?",
+                (version, time.time(), spreadsheet_id, sheet_name)
+            )
+        return n_changed
+
+    def append_rows(self, spreadsheet_id, sheet_name, rows):
+        """시트에 append 된 행을 미러 끝에도 붙입니다 (미러가 없으면 무시)"""
+        with self._lock, self._conn:
+            meta = self._meta(spreadsheet_id, sheet_name)
+            if meta is None or not meta["header"]:
+                return
+            table, width = meta["table"], len(meta["header"])
+            last = self._conn.execute(f"SELECT COALESCE(MAX(_row), 1) FROM {table}").fetchone()[0]
+            data = []
+            for i, r in enumerate(rows, start=last + 1):
+                row = [str(v) for v in (list(r) + [""] * width)[:width]]
+                data.append([i, _row_hash(row)] + row)
+            self._conn.executemany(f"INSERT OR REPLACE INTO {table} VALUES ({', '.join(['?'] * (width + 2))})", data)
+            self._conn.execute(
+                "UPDATE _sheets SET version=version+1 WHERE spreadsheet_id=? AND sheet_name=?",
+                (spreadsheet_id, sheet_name)
+            )
+
+    # ---------- 읽기 ----------
+    def grid(self, spreadsheet_id, sheet_name):
+        """미러에 저장된 셀 값을 시트와 같은 모양(헤더 + 행)으로 반환 (동기화 전이면 None)"""
+        with self._lock:
+            meta = self._meta(spreadsheet_id, sheet_name)
+            if meta is None:
+                return None
+            if not meta["header"]:
+                return [[]]
+            cols = ", ".join(f"c{i}" for i in range(len(meta["header"])))
+            rows = self._conn.execute(f"SELECT _row, {cols} FROM {meta['table']} ORDER BY _row").fetchall()
+        # 중간에 빈 행이 있으면 시트와 똑같이 빈칸으로 채웁니다.
+        out = [list(meta["header"])]
+        blank = [""] * len(meta["header"])
+        for r in rows:
+            while len(out) < r[0] - 1:
+                out.append(list(blank))
+            out.append(list(r[1:]))
+        return out
+
+    def query(self, spreadsheet_id, sheet_name, date_from=None, date_to=None, **equals):
+        """날짜 구간/컬럼 일치 조건으로 필요한 행만 꺼냅니다. (헤더, 행 목록) 반환"""
+        with self._lock:
+            meta = self._meta(spreadsheet_id, sheet_name)
+            if meta is None or not meta["header"]:
+                return None
+            header = meta["header"]
+            where, params = [], []
+            date_idx = next((i for i, c in enumerate(header) if c in DATE_COLUMN_NAMES), None)
+            if date_idx is not None and date_from is not None:
+                where.append(f"c{date_idx} >= ?")
+                params.append(str(date_from))
+            if date_idx is not None and date_to is not None:
+                where.append(f"c{date_idx} <= ?")
+                params.append(str(date_to))
+            for name, value in equals.items():
+                if name not in header:
+                    raise KeyError(name)
+                where.append(f"c{header.index(name)} = ?")
+                params.append(str(value))
+            cols = ", ".join(f"c{i}" for i in range(len(header)))
+            sql = f"SELECT {cols} FROM {meta['table']}"
+            if where:
+                sql += " WHERE " + " AND ".join(where)
+            rows = [list(r) for r in self._conn.execute(sql + " ORDER BY _row", params)]
+        return header, rows
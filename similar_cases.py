@@ -0,0 +1,238 @@
+import math
+import re
+import threading
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from config import DataManager
+from jam_archive import JAM_ARCHIVE
+
+
+# ========================================================
+# 🧭 유사 과거 사례 (Jam 입력 중 현상/ErrorMassage 로 비슷한 이력 찾기)
+# ========================================================
+# - 장비 탭마다 "Error Masage + 현상" 글자 2~3-gram 의 TF-IDF 벡터 색인을 만들어 두고, 코사인 유사도로 상위 건을 찾습니다.
+#   (한글 띄어쓰기/오타가 달라도 글자 조각이 겹치면 잡힙니다)
+# - 색인은 데이터 버전(시트 스냅샷)마다 만들고, 뒤에 행만 붙은 경우에는 새 행만 추가합니다.
+#   (행이 늘면 모든 gram 의 IDF 가 바뀌므로 전체 행의 벡터 길이를 현재 IDF 로 다시 계산합니다 → 점수는 항상 0~1 코사인.
+#    시트가 다른 방식으로 바뀌면 통째로 다시 만듭니다)
+# - 시트 읽기/색인 갱신은 백그라운드에서만 하고, 조회는 메모리 색인만 봅니다 → 입력할 때마다 불러도 수 ms.
+# - 보관 탭("<탭> 보관", jam_archive.py)으로 옮긴 이전 달도 장비별 색인을 하나 더 두고 같이 찾습니다.
+#   보관 탭은 보관 실행 때만 바뀌므로 바뀌면 통째로 다시 만듭니다.
+SIMILAR_NGRAMS = (2, 3)
+SIMILAR_TOP_K = 5
+SIMILAR_MIN_SCORE = 0.2
+SIMILAR_REFRESH_SEC = 60
+SIMILAR_TEXT_COLUMNS = ("Error Masage", "현상")
+SIMILAR_RECORD_COLUMNS = ("Date", "Errorcode", "Error Masage", "현상", "원인", "조치", "조치자")
+
+
+def _norm_text(text):
+    return re.sub(r"\s+", " ", re.sub(r"\.0$", "", str(text))).strip().lower()
+
+
+def _grams(text):
+    counts = Counter()
+    for n in SIMILAR_NGRAMS:
+        counts.update(text[i:i + n] for i in range(len(text) - n + 1))
+    return counts
+
+
+class _TabIndex:
+    """장비 탭 하나의 TF-IDF 색인 (gram → 행 번호 / tf 배열)"""
+
+    def __init__(self):
+        self.rows = {}      # gram → array('i') 행 번호
+        self.tfs = {}       # gram → array('f') 행 안에서의 등장 횟수
+        self.norms = np.ones(0)  # 행별 벡터 길이 (현재 IDF 기준, add() 때마다 다시 계산)
+        self.records = []
+        self.snapshot = None
+
+    def idf(self, gram):
+        posting = self.rows.get(gram)
+        n = len(posting) if posting is not None else 0
+        return math.log((len(self.records) + 1) / (n + 1)) + 1.0
+
+    def add(self, df, start, stop):
+        columns = {c: df[c].iloc[start:stop].tolist() if c in df.columns else [""] * (stop - start)
+                   for c in set(SIMILAR_TEXT_COLUMNS) | set(SIMILAR_RECORD_COLUMNS)}
+        docs = []
+        for i in range(stop - start):
+            text = " ".join(_norm_text(columns[c][i]) for c in SIMILAR_TEXT_COLUMNS)
+            docs.append(_grams(text))
+            self.records.append({c: "" if pd.isna(columns[c][i]) else str(columns[c][i]) for c in SIMILAR_RECORD_COLUMNS})
+        # 문서 빈도를 먼저 반영하고 나서 벡터 길이를 계산합니다.
+        for offset, grams in enumerate(docs):
+            row = start + offset
+            for g, tf in grams.items():
+                if g not in self.rows:
+                    self.rows[g] = array("i")
+                    self.tfs[g] = array("f")
+                self.rows[g].append(row)
+                self.tfs[g].append(tf)
+        self.norms = self._norms()
+
+    def _norms(self):
+        """모든 행의 벡터 길이를 현재 IDF 로 계산 (gram 별 목록을 한 번에 이어 붙여 bincount 1번)"""
+        n = len(self.records)
+        if not self.rows:
+            return np.ones(n)
+        grams = list(self.rows)
+        lengths = np.fromiter((len(self.rows[g]) for g in grams), dtype=np.int64, count=len(grams))
+        idf = np.log((n + 1) / (lengths + 1)) + 1.0
+        rows = np.concatenate([np.frombuffer(self.rows[g], dtype=np.int32) for g in grams])
+        weights = np.concatenate([np.frombuffer(self.tfs[g], dtype=np.float32) for g in grams]) * np.repeat(idf, lengths)
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=n))
+        norms[norms == 0] = 1.0
+        return norms
+
+    def search(self, query_grams, k):
+        """(점수 배열, 행 번호 배열) 상위 k 건"""
+        n = len(self.records)
+        if not n or not query_grams:
+            return np.empty(0), np.empty(0, dtype=np.int64)
+        scores = np.zeros(n, dtype=np.float64)
+        q_norm = 0.0
+        for g, q_tf in query_grams.items():
+            w = q_tf * self.idf(g)
+            q_norm += w * w
+            posting = self.rows.get(g)
+            if posting is None:
+                continue
+            rows = np.frombuffer(posting, dtype=np.int32)
+            tfs = np.frombuffer(self.tfs[g], dtype=np.float32)
+            scores += np.bincount(rows, weights=tfs * (w * self.idf(g)), minlength=n)
+        scores /= self.norms * math.sqrt(q_norm or 1.0)
+        k = min(k, n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.lexsort((-top, -scores[top]))]  # 점수가 같으면 최근(아래쪽) 행 먼저
+        return scores[top], top
+
+
+class SimilarCaseIndex:
+    def __init__(self, spreadsheet_id, sheet_name, archived=False):
+        self.spreadsheet_id = spreadsheet_id
+        self.sheet_name = sheet_name
+        self.archived = archived
+        self._lock = threading.Lock()
+        self._index = _TabIndex()
+        self.synced_at = 0.0
+        self.builds = 0
+        self.appended = 0
+
+    @property
+    def ready(self):
+        return self.synced_at > 0
+
+    def refresh(self):
+        """시트(읽기 캐시 경유)를 확인해서 바뀐 만큼만 색인에 반영"""
+        if self.archived:
+            df, snapshot = JAM_ARCHIVE.load_tab(self.spreadsheet_id, self.sheet_name)
+            df = JAM_ARCHIVE.completed(df)
+            size = len(df)
+        else:
+            dm = DataManager(self.spreadsheet_id, self.sheet_name)
+            df, _ = dm._load_entry()
+            snapshot = dm.snapshot
+            size = min(max(len(snapshot) - 1, 0), len(df)) if snapshot else 0
+        current = self._index
+        old = current.snapshot
+        if snapshot is old:
+            self.synced_at = time.time()
+            return
+        if (not self.archived and old and snapshot and len(current.records) == len(old) - 1
+                and len(snapshot) >= len(old) and snapshot[:len(old)] == old):
+            with self._lock:
+                current.add(df, len(current.records), size)
+                current.snapshot = snapshot
+            self.appended += size - (len(old) - 1)
+        else:
+            # 통째로 다시 만들 때는 새 색인을 따로 만든 뒤 바꿔 끼우므로 그동안에도 조회는 기존 색인으로 됩니다.
+            index = _TabIndex()
+            index.add(df, 0, size)
+            index.snapshot = snapshot
+            with self._lock:
+                self._index = index
+            self.builds += 1
+        self.synced_at = time.time()
+
+    def search(self, query_grams, k):
+        with self._lock:
+            scores, rows = self._index.search(query_grams, k)
+            return [(float(s), self._index.records[r]) for s, r in zip(scores, rows)]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+_refreshing = set()
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="similar-cases")
+
+
+def get_similar_index(spreadsheet_id, sheet_name, archived=False):
+    """장비 탭별로 프로세스 전체가 공유하는 유사 사례 색인 (archived=True 면 그 장비의 보관 탭 색인)"""
+    key = (spreadsheet_id, sheet_name, archived)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = SimilarCaseIndex(spreadsheet_id, sheet_name, archived)
+        return index
+
+
+def _refresh_in_background(index):
+    key = (index.spreadsheet_id, index.sheet_name, index.archived)
+    with _indexes_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def run():
+        try:
+            index.refresh()
+        except Exception:
+            pass  # 다음 조회 때 다시 시도 (기존 색인은 그대로 사용)
+        finally:
+            with _indexes_lock:
+                _refreshing.discard(key)
+    _executor.submit(run)
+
+
+def warm(spreadsheet_id, sheet_names):
+    """색인이 없거나 SIMILAR_REFRESH_SEC 가 지난 탭만 백그라운드 갱신을 걸어둡니다 (바로 반환)"""
+    now = time.time()
+    for name in sheet_names:
+        for archived in (False, True):
+            index = get_similar_index(spreadsheet_id, name, archived)
+            if now - index.synced_at >= SIMILAR_REFRESH_SEC:
+                _refresh_in_background(index)
+
+
+def find_similar(spreadsheet_id, sheet_names, text, k=SIMILAR_TOP_K, min_score=SIMILAR_MIN_SCORE):
+    """text(현상/ErrorMassage 입력값)와 비슷한 과거 이력 상위 k 건 → DataFrame (장비, 유사도, 원인, 조치 ...)
+
+    아직 색인이 준비되지 않은 탭은 건너뜁니다 (warm() 이 백그라운드에서 준비).
+    """
+    warm(spreadsheet_id, sheet_names)
+    query = _grams(_norm_text(text))
+    found = []
+    for name in sheet_names:
+        for archived in (False, True):
+            # 같은 내용이 반복 입력된 이력이 많으므로 넉넉히 받아서 중복을 뺍니다.
+            for score, record in get_similar_index(spreadsheet_id, name, archived).search(query, k * 4):
+                if score >= min_score:
+                    found.append((score, name, record))
+    found.sort(key=lambda r: -r[0])
+    rows, seen = [], set()
+    for score, name, record in found:
+        case = (record["Error Masage"], record["현상"], record["원인"], record["조치"])
+        if case in seen:
+            continue
+        seen.add(case)
+        rows.append({"장비": name, "유사도": round(score * 100), **record})
+        if len(rows) == k:
+            break
+    return pd.DataFrame(rows, columns=["장비", "유사도", *SIMILAR_RECORD_COLUMNS])
@@ -0,0 +1,255 @@
+import math
+import threading
+import time
+from collections import Counter, deque
+
+import pandas as pd
+
+from config import add_append_listener, add_change_listener
+from jam_cube import hot_cube, cold_cube, combine
+
+
+# ========================================================
+# 🚨 SPC 관리도 (장비별 일별 Jam 이상 감지: EWMA / CUSUM)
+# ========================================================
+# - 감시 항목: 일별 Errorcount(많으면 이상), 일별 PPJ(적으면 이상), Err.Point 별 일별 Jam 건수(많으면 이상)
+# - 항목마다 상태는 숫자 몇 개뿐입니다 (기준 평균/분산, EWMA 값, CUSUM 누적값).
+#   하루가 끝날 때(그 뒤 날짜의 행이 들어올 때) 그날 값으로 한 번씩만 갱신하므로 전체 이력을 다시 훑지 않습니다.
+#     · 행 추가(enqueue_row / save_new_row 알림) → 오늘 합계에 더하기만 (O(1))
+#     · 날짜가 넘어가면 → 항목마다 EWMA / CUSUM / 기준값 1회 갱신
+# - 기준 평균/분산은 지수 가중(반감기 SPC_BASELINE_HALF_LIFE 일)으로 따라가고, 처음 SPC_MIN_DAYS 일은 판정하지 않습니다.
+#     EWMA : z = λx + (1-λ)z,  관리 한계 = 평균 ± L·σ·√(λ/(2-λ))
+#     CUSUM: 표준화 값 s = (x-평균)/σ 로 C = max(0, C + s - k), C > h 이면 이상 (이상 판정 후 0 으로 초기화)
+# - 처음 조회할 때 jam_cube 집계표(hot + 보관 월)로 한 번 만들고, 이후에는 위 알림으로만 갱신합니다.
+#   과거 날짜 행이 들어오거나(순서 어긋남), 앱에서 행을 수정/삭제하거나(update_row / delete_row / save 알림),
+#   SPC_REBUILD_SEC 가 지나면(시트에서 직접 고친 경우 대비) 다음 조회 때 다시 만듭니다.
+# - 판정은 끝난 날(다음 날짜 행이 들어온 날)만 기본으로 보여줍니다. 마지막 날은 입력 중이라 PPJ 등이 낮게 나올 수 있으므로
+#   include_open_day=True 일 때만 "잠정" 으로 따로 표시해서 붙입니다.
+SPC_LAMBDA = 0.2
+SPC_L = 3.0
+SPC_CUSUM_K = 0.5
+SPC_CUSUM_H = 5.0
+SPC_BASELINE_HALF_LIFE = 60
+SPC_MIN_DAYS = 14
+SPC_REBUILD_SEC = 900
+SPC_MAX_FLAGS = 2000
+
+_BASELINE_ALPHA = 1 - 0.5 ** (1 / SPC_BASELINE_HALF_LIFE)
+_EWMA_WIDTH = SPC_L * math.sqrt(SPC_LAMBDA / (2 - SPC_LAMBDA))
+FLAG_COLUMNS = ["Date", "항목", "방법", "값", "기준", "한계", "통계량", "잠정"]
+
+
+def _number(value):
+    try:
+        return float(str(value).replace(",", ""))
+    except ValueError:
+        return 0.0
+
+
+class SeriesState:
+    """항목 하나의 관리도 상태 (direction: "hi" 면 큰 값이 이상, "lo" 면 작은 값이 이상)"""
+
+    __slots__ = ("direction", "count_like", "n", "mean", "var", "ewma", "cusum")
+
+    def __init__(self, direction="hi", count_like=True):
+        self.direction = direction
+        self.count_like = count_like
+        self.n = 0
+        self.mean = 0.0
+        self.var = 0.0
+        self.ewma = None
+        self.cusum = 0.0
+
+    def sigma(self):
+        std = math.sqrt(self.var)
+        # 건수 항목은 거의 항상 0 이라 분산이 0 에 가까우므로 포아송 σ(√평균, 최소 0.5)를 하한으로 씁니다.
+        floor = max(math.sqrt(max(self.mean, 0.0)), 0.5) if self.count_like else 0.01 * abs(self.mean) + 1e-9
+        return max(std, floor)
+
+    def step(self, x, commit=True):
+        """하루 값 x 를 반영 → [(방법, 기준, 한계, 통계량)] 이상 판정 목록 (commit=False 면 상태는 그대로)"""
+        flags = []
+        sign = 1.0 if self.direction == "hi" else -1.0
+        ewma, cusum = self.ewma, self.cusum
+        if self.n >= SPC_MIN_DAYS:
+            sigma = self.sigma()
+            ewma = SPC_LAMBDA * x + (1 - SPC_LAMBDA) * (self.mean if ewma is None else ewma)
+            limit = self.mean + sign * _EWMA_WIDTH * sigma
+            if sign * (ewma - limit) > 0:
+                flags.append(("EWMA", self.mean, limit, ewma))
+            cusum = max(0.0, cusum + sign * (x - self.mean) / sigma - SPC_CUSUM_K)
+            if cusum > SPC_CUSUM_H:
+                flags.append(("CUSUM", self.mean, SPC_CUSUM_H, cusum))
+                cusum = 0.0
+        if commit:
+            # 기준값: 처음에는 단순 평균, 데이터가 쌓이면 지수 가중 평균/분산
+            alpha = max(1.0 / (self.n + 1), _BASELINE_ALPHA)
+            delta = x - self.mean
+            self.mean += alpha * delta
+            self.var = (1 - alpha) * (self.var + alpha * delta * delta)
+            self.n += 1
+            self.ewma, self.cusum = ewma, cusum
+        return flags
+
+
+class EquipmentSPC:
+    """장비 탭 하나의 SPC 상태"""
+
+    def __init__(self, spreadsheet_id, sheet_name):
+        self.spreadsheet_id = spreadsheet_id
+        self.sheet_name = sheet_name
+        self._lock = threading.Lock()
+        self._reset()
+        self.built_at = 0.0
+        self.stale = True
+        self.stats = {"builds": 0, "rows": 0, "days": 0}
+
+    def _reset(self):
+        self.series = {"Errorcount": SeriesState("hi"), "PPJ": SeriesState("lo", count_like=False)}
+        self.flags = deque(maxlen=SPC_MAX_FLAGS)
+        self.day = None                 # 아직 끝나지 않은(마지막) 날짜
+        self.day_jams = 0
+        self.day_units = 0.0
+        self.day_points = Counter()
+
+    # ---------- 하루 마감 ----------
+    def _values(self, jams, units, points):
+        values = {"Errorcount": float(jams)}
+        if units > 0:
+            values["PPJ"] = units / jams if jams > 0 else float(units)  # metrics._ratio 와 같은 규칙
+        for point in points:
+            if f"Err.Point:{point}" not in self.series:
+                self.series[f"Err.Point:{point}"] = SeriesState("hi")
+        for name in self.series:
+            if name.startswith("Err.Point:"):
+                values[name] = float(points.get(name[len("Err.Point:"):], 0))
+        return values
+
+    def _close(self, day, jams, units, points, commit=True):
+        found = []
+        for name, x in self._values(jams, units, points).items():
+            for method, center, limit, stat in self.series[name].step(x, commit):
+                found.append((day, name, method, x, center, limit, stat, not commit))
+        if commit:
+            self.flags.extend(found)
+            self.stats["days"] += 1
+        return found
+
+    def _advance(self, day):
+        """day 이전까지 열려 있던 날을 마감 (사이에 빈 날은 Jam 0 / 생산 0 인 날로)"""
+        if self.day is not None:
+            self._close(self.day, self.day_jams, self.day_units, self.day_points)
+            gap = self.day + pd.Timedelta(days=1)
+            while gap < day:
+                self._close(gap, 0, 0.0, Counter())
+                gap += pd.Timedelta(days=1)
+        self.day, self.day_jams, self.day_units, self.day_points = day, 0, 0.0, Counter()
+
+    # ---------- 전체 다시 만들기 / 행 추가 ----------
+    def rebuild(self, cube):
+        """jam_cube 집계표(전체 기간)로 상태를 새로 만듭니다"""
+        with self._lock:
+            self._reset()
+            if not cube.empty:
+                daily = cube.groupby("Date", sort=True).agg(Errorcount=("Errorcount", "sum"), Totalunit=("Totalunit", "max"))
+                points = cube[(cube["Err.Point"] != "") & (cube["Errorcount"] > 0)]
+                by_day = {d: Counter(dict(zip(g["Err.Point"], g["Errorcount"])))
+                          for d, g in points.groupby("Date", sort=False)[["Err.Point", "Errorcount"]]}
+                for day, jams, units in zip(daily.index, daily["Errorcount"].tolist(), daily["Totalunit"].tolist()):
+                    self._advance(pd.Timestamp(day))
+                    self.day_jams, self.day_units = int(jams), float(units)
+                    self.day_points = Counter({str(k): int(v) for k, v in by_day.get(day, {}).items()})
+            self.built_at = time.time()
+            self.stale = False
+            self.stats["builds"] += 1
+
+    def add_row(self, record):
+        """새 Jam 행 하나 반영 (오늘 합계에 더하기만, 날짜가 넘어가면 이전 날 마감)"""
+        try:
+            day = pd.Timestamp(str(record.get("Date", "")).strip())
+        except ValueError:
+            return
+        if pd.isna(day):
+            return
+        day = day.normalize()
+        jams = int(_number(record.get("Errorcount")))
+        units = _number(record.get("Totalunit"))
+        point = str(record.get("Err.Point", "")).strip()
+        with self._lock:
+            if self.stale:
+                return  # 다음 조회 때 어차피 다시 만듭니다
+            if self.day is not None and day < self.day:
+                self.stale = True  # 지난 날짜 행: 이미 마감한 날이 바뀌므로 다시 만들어야 함
+                return
+            if self.day is None or day > self.day:
+                self._advance(day)
+            self.day_jams += jams
+            self.day_units = max(self.day_units, units)
+            if point and jams > 0:
+                self.day_points[point] += jams
+            self.stats["rows"] += 1
+
+    # ---------- 조회 ----------
+    def flag_table(self, start=None, end=None, include_open_day=False):
+        """끝난 날의 이상 판정 목록 DataFrame (include_open_day 면 아직 끝나지 않은 마지막 날도 잠정=True 로 포함)"""
+        with self._lock:
+            rows = list(self.flags)
+            if include_open_day and self.day is not None:
+                rows += self._close(self.day, self.day_jams, self.day_units, self.day_points, commit=False)
+        df = pd.DataFrame(rows, columns=FLAG_COLUMNS)
+        df["Date"] = pd.to_datetime(df["Date"])  # 판정이 하나도 없어도 날짜 컬럼 (.dt 사용 가능)
+        if start is not None:
+            df = df[df["Date"] >= pd.Timestamp(start).normalize()]
+        if end is not None:
+            df = df[df["Date"] <= pd.Timestamp(end).normalize()]
+        return df.reset_index(drop=True)
+
+    def mark_stale(self):
+        """이미 반영한 행이 수정/삭제됨 → 다음 조회 때 다시 만듭니다"""
+        with self._lock:
+            self.stale = True
+
+    def summary(self):
+        """항목별 현재 상태 {항목: {기준, σ, EWMA, CUSUM, 일수}}"""
+        with self._lock:
+            return {name: {"기준": s.mean, "σ": s.sigma(), "EWMA": s.ewma, "CUSUM": s.cusum, "일수": s.n}
+                    for name, s in self.series.items()}
+
+
+_monitors = {}
+_monitors_lock = threading.Lock()
+
+
+def get_spc(spreadsheet_id, sheet_name):
+    key = (spreadsheet_id, sheet_name)
+    with _monitors_lock:
+        monitor = _monitors.get(key)
+        if monitor is None:
+            monitor = _monitors[key] = EquipmentSPC(spreadsheet_id, sheet_name)
+        return monitor
+
+
+def ensure_spc(dm, entry=None):
+    """DataManager(방금 load/load_entries 한 것)의 SPC 상태 (처음 / 순서 어긋남 / 오래됨 일 때만 집계표로 다시 만듦)"""
+    monitor = get_spc(dm.spreadsheet_id, dm.sheet_name)
+    if monitor.stale or time.time() - monitor.built_at >= SPC_REBUILD_SEC:
+        monitor.rebuild(combine([hot_cube(dm, entry), cold_cube(dm.spreadsheet_id, dm.sheet_name)]))
+    return monitor
+
+
+def _on_append(spreadsheet_id, sheet_name, record):
+    with _monitors_lock:
+        monitor = _monitors.get((spreadsheet_id, sheet_name))
+    if monitor is not None:
+        monitor.add_row(record)
+
+
+def _on_change(spreadsheet_id, sheet_name):
+    with _monitors_lock:
+        monitor = _monitors.get((spreadsheet_id, sheet_name))
+    if monitor is not None:
+        monitor.mark_stale()
+
+
+add_append_listener(_on_append)
+add_change_listener(_on_change)
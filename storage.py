@@ -0,0 +1,167 @@
+import csv
+import os
+import random
+import threading
+import time
+
+from sheet_mirror import SheetMirror
+
+
+# ========================================================
+# 💾 시트 저장소 (DataManager 가 쓰는 셀 단위 읽기/쓰기 인터페이스)
+# ========================================================
+# 모든 저장소는 아래 메서드를 같은 의미로 제공합니다. (구글 시트 구현은 config.SheetsBackend)
+#   change_token(sid, name)       : 내용이 바뀌면 달라지는 값 (읽기 캐시 재검증용)
+#   read_grid(sid, name)          : 시트 전체 셀 값 [[헤더], [행], ...] (빈 시트면 [[]])
+#   read_grids(sid, names)        : 여러 시트를 한 번에 → {이름: grid}
+#   read_header(sid, name)        : 1행(헤더)
+#   read_row(sid, name, row)      : row 행의 셀 값 (끝의 빈칸은 생략될 수 있음)
+#   read_rows(sid, name, start, end): start~end 행의 셀 값 목록 (행 수는 항상 end-start+1, 끝의 빈칸은 생략될 수 있음)
+#   write_blocks(sid, name, blocks): [(시작행, 시작열, 2차원 값)] 을 그대로 덮어쓰기 (1부터 시작)
+#   append_rows(sid, name, rows)  : 맨 아래에 행 추가
+#   delete_rows(sid, name, start, end=None): start~end 행 삭제 (아래 행은 위로 당겨짐)
+#   delete_row_ranges(sid, name, ranges): 여러 (start, end) 구간을 요청 1번으로 삭제 (번호는 모두 삭제 전 기준)
+#   ensure_sheet(sid, name)       : 탭이 없으면 빈 탭으로 새로 만들기 (보관 탭 등)
+
+
+def _read_csv_grid(path):
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return [row for row in csv.reader(f)]
+
+
+def _merge_seed_grids(grids):
+    """같은 시트로 들어갈 CSV 여러 개를 첫 파일의 헤더 기준으로 합칩니다 (없는 컬럼은 빈칸)"""
+    grids = [g for g in grids if g and g[0]]
+    if not grids:
+        return [[]]
+    header = list(grids[0][0])
+    out = [header]
+    for grid in grids:
+        index = [grid[0].index(c) if c in grid[0] else None for c in header]
+        for row in grid[1:]:
+            out.append([row[i] if i is not None and i < len(row) else "" for i in index])
+    return out
+
+
+class LocalBackend:
+    """구글 시트 대신 로컬 SQLite 파일에 시트를 보관하는 저장소
+
+    seeds = {시트 이름: [CSV 경로, ...]} 를 주면, 처음 읽을 때 비어 있는 시트를 CSV 내용으로 채웁니다.
+    (스프레드시트 ID 와 상관없이 시트 이름으로 매칭)
+    """
+
+    def __init__(self, db_path, seeds=None):
+        self.store = SheetMirror(db_path)
+        self.seeds = seeds or {}
+        self._lock = threading.RLock()
+
+    def _ensure(self, spreadsheet_id, sheet_name):
+        if self.store.version(spreadsheet_id, sheet_name) is not None:
+            return
+        with self._lock:
+            if self.store.version(spreadsheet_id, sheet_name) is not None:
+                return
+            paths = [p for p in self.seeds.get(sheet_name, []) if os.path.exists(p)]
+            self.store.apply_grid(spreadsheet_id, sheet_name, _merge_seed_grids([_read_csv_grid(p) for p in paths]))
+
+    def change_token(self, spreadsheet_id, sheet_name):
+        self._ensure(spreadsheet_id, sheet_name)
+        return ("local", self.store.version(spreadsheet_id, sheet_name))
+
+    def read_grid(self, spreadsheet_id, sheet_name):
+        self._ensure(spreadsheet_id, sheet_name)
+        return self.store.grid(spreadsheet_id, sheet_name)
+
+    def read_grids(self, spreadsheet_id, sheet_names):
+        return {name: self.read_grid(spreadsheet_id, name) for name in sheet_names}
+
+    def read_header(self, spreadsheet_id, sheet_name):
+        grid = self.read_grid(spreadsheet_id, sheet_name)
+        return list(grid[0]) if grid else []
+
+    def read_row(self, spreadsheet_id, sheet_name, row):
+        grid = self.read_grid(spreadsheet_id, sheet_name)
+        return list(grid[row - 1]) if 0 < row <= len(grid) else []
+
+    def read_rows(self, spreadsheet_id, sheet_name, start, end):
+        grid = self.read_grid(spreadsheet_id, sheet_name)
+        return [list(grid[r - 1]) if 0 < r <= len(grid) else [] for r in range(start, end + 1)]
+
+    def write_blocks(self, spreadsheet_id, sheet_name, blocks):
+        with self._lock:
+            grid = [list(r) for r in self.read_grid(spreadsheet_id, sheet_name)]
+            if grid == [[]]:
+                grid = []
+            for row, col, values in blocks:
+                for r_off, cells in enumerate(values):
+                    r = row - 1 + r_off
+                    while len(grid) <= r:
+                        grid.append([])
+                    line = grid[r]
+                    if len(line) < col - 1 + len(cells):
+                        line.extend([""] * (col - 1 + len(cells) - len(line)))
+                    line[col - 1:col - 1 + len(cells)] = ["" if v is None else str(v) for v in cells]
+            # 시트처럼 맨 아래의 완전히 빈 행은 남기지 않습니다.
+            while grid and not any(str(v) for v in grid[-1]):
+                grid.pop()
+            width = len(grid[0]) if grid else 0
+            self.store.apply_grid(spreadsheet_id, sheet_name, [(r + [""] * width)[:width] for r in grid] or [[]])
+
+    def append_rows(self, spreadsheet_id, sheet_name, rows):
+        with self._lock:
+            grid = self.read_grid(spreadsheet_id, sheet_name)
+            if not grid or not grid[0]:
+                # 빈 시트에 append 하면 첫 행이 헤더가 됩니다 (구글 시트와 동일)
+                self.store.apply_grid(spreadsheet_id, sheet_name, [[str(v) for v in r] for r in rows])
+            else:
+                self.store.append_rows(spreadsheet_id, sheet_name, [["" if v is None else str(v) for v in r] for r in rows])
+
+
+    def delete_rows(self, spreadsheet_id, sheet_name, start, end=None):
+        with self._lock:
+            grid = self.read_grid(spreadsheet_id, sheet_name)
+            end = start if end is None else end
+            grid = grid[:start - 1] + grid[end:]
+            self.store.apply_grid(spreadsheet_id, sheet_name, grid or [[]])
+
+    def delete_row_ranges(self, spreadsheet_id, sheet_name, ranges):
+        with self._lock:
+            grid = list(self.read_grid(spreadsheet_id, sheet_name))
+            for start, end in sorted(ranges, reverse=True):
+                del grid[start - 1:end]
+            self.store.apply_grid(spreadsheet_id, sheet_name, grid or [[]])
+
+    def ensure_sheet(self, spreadsheet_id, sheet_name):
+        # 로컬 저장소는 처음 읽을 때 빈 시트가 만들어집니다.
+        self._ensure(spreadsheet_id, sheet_name)
+
+
+class LatencyBackend:
+    """다른 저장소를 감싸서 호출마다 지연을 넣습니다 (느린 현장 네트워크 재현 / 화면별 프로파일링용)"""
+
+    READS = ("change_token", "read_grid", "read_grids", "read_header", "read_row", "read_rows")
+    WRITES = ("write_blocks", "append_rows", "delete_rows", "delete_row_ranges", "ensure_sheet")
+
+    def __init__(self, inner, read_ms=0, write_ms=0, jitter=0.2):
+        self.inner = inner
+        self.read_ms = read_ms
+        self.write_ms = write_ms
+        self.jitter = jitter
+
+    def _sleep(self, ms):
+        if ms > 0:
+            time.sleep(ms / 1000.0 * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def __getattr__(self, name):
+        target = getattr(self.inner, name)
+        if name in self.READS:
+            ms = self.read_ms
+        elif name in self.WRITES:
+            ms = self.write_ms
+        else:
+            return target
+
+        def wrapper(*args, **kwargs):
+            self._sleep(ms)
+            return target(*args, **kwargs)
+        return wrapper
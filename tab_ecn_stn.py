@@ -1,9 +1,9 @@
 import streamlit as st
 import pandas as pd
-import io
 import re
 from datetime import datetime
 from config import EQUIPMENT_OPTIONS
+from export import xlsx_download, XLSX_MIME
 
 class ECNSTNTab:
     def __init__(self, db_ecn):
@@ -221,17 +221,15 @@ class ECNSTNTab:
                     save_btn = st.button("💾 변경사항 구글 시트에 저장하기", type="primary", use_container_width=True)
                 
                 with action_col2:
-                    import openpyxl
-                    output_excel = io.BytesIO()
-                    with pd.ExcelWriter(output_excel, engine='openpyxl') as writer:
-                        cols_to_drop = ['Original_Index']
-                        filtered_df.drop(columns=cols_to_drop, errors='ignore').to_excel(writer, index=False, sheet_name='ECN_Data')
+                    # ★ 버튼을 눌렀을 때만 엑셀 생성 (같은 목록이면 캐시 사용)
+                    cols_to_drop = ['Original_Index']
                     st.download_button(
                         label="📥 현재 리스트 엑셀 다운로드",
-                        data=output_excel.getvalue(),
+                        data=xlsx_download(filtered_df.drop(columns=cols_to_drop, errors='ignore'), "ECN_Data"),
                         file_name=f"ECN_{equipment}_{unit}_{datetime.now().strftime('%Y%m%d')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        use_container_width=True
+                        mime=XLSX_MIME,
+                        use_container_width=True,
+                        on_click="ignore"
                     )
                     
                 with st.expander("➕ 새 ECN 항목 구글 시트에 바로 등록하기"):
@@ -1,9 +1,30 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from config import DataManager
+from config import DataManager, JAM_SHEET_OPTIONS
+from schema import JAM_COLUMNS
+from jam_archive import JAM_ARCHIVE, JAM_HOT_MONTHS, archive_tab, hot_cutoff
+from jam_cube import hot_cube, cube_range, combine
+from equipment_reports import REPORTS
+from metrics import daily_table, reliability, labels, FREQ_RULES
+from charts import auto_freq, x_axis, line_trace, bar_trace, FREQ_LABELS
+from spc import ensure_spc
 import datetime
+import hmac
+
+# 보관 실행(장비 탭에서 행 삭제)은 st.secrets 의 관리자 비밀번호를 입력해야 할 수 있습니다.
+ADMIN_PASSWORD_SECRET = "ADMIN_PASSWORD"
+
+
+def _admin_password():
+    """st.secrets 의 관리자 비밀번호 (설정되지 않았으면 None)"""
+    try:
+        return st.secrets.get(ADMIN_PASSWORD_SECRET) or None
+    except Exception:
+        return None
+
 
 class EquipmentDataTab:
     def __init__(self, db_jam):
@@ -14,9 +35,9 @@ class EquipmentDataTab:
         st.markdown("### 📊 장비 가동 정밀 데이터 분석")
         st.markdown("<hr style='margin-top: 5px; margin-bottom: 15px;'>", unsafe_allow_html=True)
         
-        DB_SHEET_OPTIONS = ["SLH1 #1", "SLH1 #4", "SLH1 #5", "SLH1 #6", "SLH1 #7"]
+        DB_SHEET_OPTIONS = JAM_SHEET_OPTIONS
         
-        col1, col2 = st.columns([2, 8])
+        col1, col2, col3 = st.columns([2, 6, 2])
         with col1:
             equip_val = st.selectbox("분석할 장비 선택", DB_SHEET_OPTIONS)
 
@@ -24,36 +45,34 @@ class EquipmentDataTab:
         # 1. Jam 데이터 로드
         # ==========================================
         target_tab = "SLH1 #1" if equip_val == "SLH1 #1" else equip_val
-            
-        exact_columns = [
-            "Date", "Totalunit", "Errorcode", "Errorcount", "Error Masage", 
-            "현상", "원인", "조치", "Err.Point", "분류", "조치자", "Err. Time", 
-            "MTBA", "MTTR", "MTBI", "도번", "수량", "입고일", "반입일", "조치위치", "조치결과"
-        ]
         
         try:
-            db_machine = DataManager(self.db_jam.spreadsheet_id, target_tab, exact_columns)
-            df, _ = db_machine.load()
+            # ★ 전 호기 탭을 한 번의 API 호출로 읽어 캐시에 올려두므로, 장비를 바꿔도 다시 받지 않습니다.
+            loaded = DataManager.load_entries(self.db_jam.spreadsheet_id, DB_SHEET_OPTIONS, JAM_COLUMNS)
+            dm, entry, _ = loaded[target_tab]
+            # ★ 원본 행 대신 (날짜, Err.Point, 분류) 일별 집계표를 씁니다. 새 행이 붙으면 그 행만 더합니다 (jam_cube.py)
+            df_hot = hot_cube(dm, entry)
         except Exception as e:
             st.error(f"🚨 데이터 로드 실패: {e}")
             return
-            
-        if df.empty:
+
+        self.render_archive_admin(target_tab)
+
+        # ★ 장비 탭에는 최근 몇 달(hot)만 있고, 그 이전 달은 "<탭> 보관" 탭(cold)에 있습니다 (jam_archive.py)
+        archived = JAM_ARCHIVE.bounds(self.db_jam.spreadsheet_id, target_tab)
+        # ★ Jam 시트에 입력되지 않은 달은 라인 팀 월간 보고서(data/SLH1/*.xlsx)에서 가져옵니다 (equipment_reports.py)
+        report_months = REPORTS.months(target_tab)
+        if df_hot.empty and archived is None and not report_months:
             st.info(f"💡 '{equip_val}' 장비 데이터가 없습니다.")
             return
 
-        # ==========================================
-        # 2. 데이터 전처리
-        # ==========================================
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-        df = df.dropna(subset=['Date']).sort_values('Date')
-        
-        numeric_cols = ['Totalunit', 'Errorcount', 'MTBA', 'MTTR', 'MTBI']
-        for c in numeric_cols:
-            df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0)
-
         # ★ 조회 기간(날짜) 선택 필터 (달력 제한 해제)
-        max_date_data = df['Date'].max().date()
+        if not df_hot.empty:
+            max_date_data = df_hot['Date'].max().date()
+        elif archived is not None:
+            max_date_data = archived[1].date()
+        else:
+            max_date_data = (pd.Period(report_months[-1], freq="M").end_time).date()
         
         with col2:
             default_start = max_date_data - datetime.timedelta(days=30)
@@ -62,6 +81,9 @@ class EquipmentDataTab:
                 "📅 조회 기간 선택 (데이터가 없는 날짜도 자유롭게 선택 가능합니다)", 
                 value=(default_start, max_date_data)
             )
+        with col3:
+            # ★ 기간이 길면 자동으로 주간/월간으로 묶어서 그립니다 (charts.py)
+            freq_label = st.radio("집계 단위", ["자동"] + list(FREQ_LABELS.values()), horizontal=True, key="equip_freq")
             
         if len(date_range) == 2:
             start_date, end_date = date_range
@@ -72,68 +94,62 @@ class EquipmentDataTab:
             st.warning("날짜를 선택해주세요.")
             return
             
-        # 선택한 날짜 구간으로 데이터 필터링
-        mask = (df['Date'].dt.date >= start_date) & (df['Date'].dt.date <= end_date)
-        df_filtered = df.loc[mask]
+        # ==========================================
+        # 2. 선택한 날짜 구간의 집계 (보관 파일은 구간과 겹치는 달의 집계만 읽음)
+        # ==========================================
+        # Date 는 날짜(자정), Errorcount 는 합계, Totalunit/MTBA/MTTR/MTBI 는 최대값입니다.
+        df_filtered = cube_range(dm, entry, start_date, end_date)
+        covered = set(JAM_ARCHIVE.manifest(self.db_jam.spreadsheet_id, target_tab)["partitions"])
+        if not df_hot.empty:
+            covered |= set(df_hot['Date'].dt.strftime('%Y-%m'))
+        df_report, used_months = REPORTS.cube(target_tab, start_date, end_date, skip_months=covered)
+        if used_months:
+            df_filtered = combine([df_filtered, df_report])
+            st.caption(f"📑 월간 보고서에서 가져온 달: {', '.join(used_months)} (Err.Point 는 스테이션 기준, MTBA/MTTR/MTBI 없음)")
 
         date_title_str = f"{start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}"
 
-        # ✅ 시작일~종료일 사이의 '모든 달력 날짜' 뼈대 생성
-        full_date_range = pd.date_range(start=start_date, end=end_date).date
+        # ★ 시작일~종료일 모든 날짜의 지표 (PPJ, 누적 PPJ, MTBA/MTTR/MTBI 누적 평균)를 NumPy 로 한 번에 계산 (metrics.py)
+        freq = auto_freq(start_date, end_date) if freq_label == "자동" else {v: k for k, v in FREQ_LABELS.items()}[freq_label]
+        unit = FREQ_LABELS[freq]
+        df_daily = reliability(daily_table(df_filtered, start_date, end_date), freq=freq)
+        # ★ 점이 많으면 날짜 축 + LTTB 축소 + WebGL, 적을 때만 점 위 숫자 라벨 (charts.py)
+        x_vals, x_axis_args = x_axis(df_daily, freq)
+
+        # ★ SPC 이상 감지 (EWMA / CUSUM). 상태는 행이 추가될 때마다 그날 값만 갱신되므로 여기서는 조회만 합니다 (spc.py)
+        #   입력 중인 마지막 날은 값이 덜 모여 잘못 ✖ 표시될 수 있으므로 끝난 날만 보여줍니다.
+        df_flags = ensure_spc(dm, entry).flag_table(start_date, end_date)
+        jam_flags = df_flags[df_flags['항목'] != 'PPJ']
+        ppj_flags = df_flags[df_flags['항목'] == 'PPJ']
 
         # ==========================================
         # 3. 생산 Unit 대비 Jam 발생 & PPJ 누적 그래프 (★ 풀 사이즈 확장)
         # ==========================================
         st.markdown(f"#### 📊 {date_title_str} 기본 가동 현황 (PPJ 및 생산대비 Jam)")
         
-        if not df_filtered.empty:
-            grouped_basic = df_filtered.groupby(df_filtered['Date'].dt.date).agg({
-                'Totalunit': 'max',
-                'Errorcount': 'sum'
-            })
-        else:
-            grouped_basic = pd.DataFrame(columns=['Totalunit', 'Errorcount'])
-
-        df_daily_basic = grouped_basic.reindex(full_date_range).fillna(0).reset_index()
-        df_daily_basic.rename(columns={'index': 'Date'}, inplace=True)
-        
-        df_daily_basic['Date'] = pd.to_datetime(df_daily_basic['Date'])
-        df_daily_basic['DateStr'] = df_daily_basic['Date'].dt.strftime('%m/%d')
-
-        df_daily_basic['Cum_Totalunit'] = df_daily_basic['Totalunit'].cumsum()
-        df_daily_basic['Cum_Errorcount'] = df_daily_basic['Errorcount'].cumsum()
-
-        df_daily_basic['PPJ'] = df_daily_basic.apply(
-            lambda row: row['Totalunit'] / row['Errorcount'] if row['Errorcount'] > 0 else row['Totalunit'], 
-            axis=1
-        )
-        df_daily_basic['Cum_PPJ'] = df_daily_basic.apply(
-            lambda row: row['Cum_Totalunit'] / row['Cum_Errorcount'] if row['Cum_Errorcount'] > 0 else row['Cum_Totalunit'], 
-            axis=1
-        )
+        df_daily_basic = df_daily
 
         # [그래프 1] 생산 Unit 대비 Jam 발생 (한 칸 전체 차지)
         fig_tu = make_subplots(specs=[[{"secondary_y": True}]])
         
         fig_tu.add_trace(
-            go.Scatter(
-                x=df_daily_basic['DateStr'], y=df_daily_basic['Totalunit'], 
-                mode='lines+markers+text', name='생산량', line=dict(color='#3498DB', width=3),
-                text=df_daily_basic['Totalunit'].apply(lambda x: f"<b>{x:,.0f}</b>"), 
-                textposition='top left', textfont=dict(size=12) 
+            line_trace(
+                x_vals, df_daily_basic['Totalunit'], '생산량',
+                line=dict(color='#3498DB', width=3), textposition='top left'
             ), secondary_y=False
         )
         fig_tu.add_trace(
-            go.Scatter(
-                x=df_daily_basic['DateStr'], y=df_daily_basic['Errorcount'], 
-                mode='lines+markers+text', name='Jam 발생', line=dict(color='#E74C3C', width=3),
-                text=df_daily_basic['Errorcount'].apply(lambda x: f"<b>{x:,.0f}</b>"), 
-                textposition='top right', textfont=dict(size=12) 
+            line_trace(
+                x_vals, df_daily_basic['Errorcount'], 'Jam 발생',
+                line=dict(color='#E74C3C', width=3), textposition='top right'
             ), secondary_y=True
         )
         
-        fig_tu.update_layout(title="생산량 대비 Jam 발생", margin=dict(l=20, r=20, t=40, b=20), height=400, hovermode="x unified")
-        fig_tu.update_xaxes(type='category')
+        if not jam_flags.empty:
+            fig_tu.add_trace(self.flag_trace(df_daily_basic, x_vals, jam_flags['Date'], 'Errorcount', freq), secondary_y=True)
+        
+        fig_tu.update_layout(title=f"{unit} 생산량 대비 Jam 발생", margin=dict(l=20, r=20, t=40, b=20), height=400, hovermode="x unified")
+        fig_tu.update_xaxes(**x_axis_args)
         
         max_tu = df_daily_basic['Totalunit'].max()
         max_err = df_daily_basic['Errorcount'].max()
@@ -144,31 +160,36 @@ class EquipmentDataTab:
 
         st.markdown("<br>", unsafe_allow_html=True) # 그래프 사이 간격 띄우기
 
-        # [그래프 2] 일별 PPJ 및 누적 평균 PPJ (한 칸 전체 차지)
+        # [그래프 2] 일별(주간/월간) PPJ 및 누적 평균 PPJ (한 칸 전체 차지)
         fig_ppj = go.Figure()
         
-        fig_ppj.add_trace(go.Scatter(
-            x=df_daily_basic['DateStr'], y=df_daily_basic['PPJ'], 
-            mode='lines+markers+text', name='일별 PPJ', line=dict(color='#27AE60', width=3),
-            text=df_daily_basic['PPJ'].apply(lambda x: f"<b>{x:,.0f}</b>"), 
-            textposition='top left', textfont=dict(size=12)
+        fig_ppj.add_trace(line_trace(
+            x_vals, df_daily_basic['PPJ'], f'{unit} PPJ',
+            line=dict(color='#27AE60', width=3), textposition='top left'
         ))
         
-        fig_ppj.add_trace(go.Scatter(
-            x=df_daily_basic['DateStr'], y=df_daily_basic['Cum_PPJ'], 
-            mode='lines+markers+text', name='누적 평균 PPJ', line=dict(color='#F39C12', width=3),
-            text=df_daily_basic['Cum_PPJ'].apply(lambda x: f"<b>{x:,.0f}</b>"), 
-            textposition='top right', textfont=dict(size=12)
+        fig_ppj.add_trace(line_trace(
+            x_vals, df_daily_basic['Cum_PPJ'], '누적 평균 PPJ',
+            line=dict(color='#F39C12', width=3), textposition='top right'
         ))
         
-        fig_ppj.update_layout(title="일별 PPJ 및 누적 평균 PPJ", margin=dict(l=20, r=20, t=40, b=20), height=400, hovermode="x unified")
-        fig_ppj.update_xaxes(type='category')
+        if not ppj_flags.empty:
+            fig_ppj.add_trace(self.flag_trace(df_daily_basic, x_vals, ppj_flags['Date'], 'PPJ', freq))
+        
+        fig_ppj.update_layout(title=f"{unit} PPJ 및 누적 평균 PPJ", margin=dict(l=20, r=20, t=40, b=20), height=400, hovermode="x unified")
+        fig_ppj.update_xaxes(**x_axis_args)
         
         max_ppj = max(df_daily_basic['PPJ'].max(), df_daily_basic['Cum_PPJ'].max())
         fig_ppj.update_yaxes(dtick=2500, tickformat=",", range=[0, max_ppj * 1.2 if max_ppj > 0 else 10])
         
         st.plotly_chart(fig_ppj, use_container_width=True, theme="streamlit")
 
+        if not df_flags.empty:
+            with st.expander(f"🚨 SPC 이상 감지 {df_flags['Date'].nunique()}일 (EWMA / CUSUM, 그래프의 ✖ 표시)"):
+                df_flags_view = df_flags.drop(columns='잠정').assign(Date=df_flags['Date'].dt.strftime('%Y-%m-%d'))
+                st.dataframe(df_flags_view.sort_values('Date', ascending=False), use_container_width=True, hide_index=True,
+                             column_config={c: st.column_config.NumberColumn(format="%.2f") for c in ["값", "기준", "한계", "통계량"]})
+
         st.markdown("<hr style='margin-top: 10px; margin-bottom: 20px;'>", unsafe_allow_html=True)
 
         # ==========================================
@@ -176,18 +197,7 @@ class EquipmentDataTab:
         # ==========================================
         st.markdown(f"#### 📈 {date_title_str} 정밀 분석 추이 (MTBA / MTTR / MTBI)")
         
-        if not df_filtered.empty:
-            grouped_mt = df_filtered.groupby(df_filtered['Date'].dt.date)[['MTBA', 'MTTR', 'MTBI']].max()
-        else:
-            grouped_mt = pd.DataFrame(columns=['MTBA', 'MTTR', 'MTBI'])
-
-        df_daily_mt = grouped_mt.reindex(full_date_range).fillna(0).reset_index()
-        df_daily_mt.rename(columns={'index': 'Date'}, inplace=True)
-        df_daily_mt['Date'] = pd.to_datetime(df_daily_mt['Date'])
-        df_daily_mt['DateStr'] = df_daily_mt['Date'].dt.strftime('%m/%d')
-        
-        for col in ['MTBA', 'MTTR', 'MTBI']:
-            df_daily_mt[f'{col}_cum_avg'] = df_daily_mt[col].expanding().mean()
+        df_daily_mt = df_daily
             
         fig1 = make_subplots(specs=[[{"secondary_y": True}]])
 
@@ -198,19 +208,13 @@ class EquipmentDataTab:
         ]
 
         for col, bar_color, line_color in metrics:
-            fig1.add_trace(go.Bar(
-                x=df_daily_mt['DateStr'], y=df_daily_mt[col], 
-                name=f'{col} (일별)', marker_color=bar_color,
-                text=df_daily_mt[col].apply(lambda x: f"<b>{x:,.0f}</b>"), 
-                textposition='outside', textfont=dict(size=12)
+            fig1.add_trace(bar_trace(
+                x_vals, df_daily_mt[col], f'{col} ({unit})', marker_color=bar_color
             ), secondary_y=False)
             
-            fig1.add_trace(go.Scatter(
-                x=df_daily_mt['DateStr'], y=df_daily_mt[f'{col}_cum_avg'], 
-                mode='lines+markers+text', name=f'{col} 누적평균', 
-                line=dict(color=line_color, width=2),
-                text=df_daily_mt[f'{col}_cum_avg'].apply(lambda x: f"<b>{x:,.1f}</b>"), 
-                textposition='top right', textfont=dict(size=12)
+            fig1.add_trace(line_trace(
+                x_vals, df_daily_mt[f'{col}_cum_avg'], f'{col} 누적평균', decimals=1,
+                line=dict(color=line_color, width=2), textposition='top right'
             ), secondary_y=True)
         
         fig1.update_layout(
@@ -220,11 +224,11 @@ class EquipmentDataTab:
             barmode='group', 
             legend=dict(orientation="h", yanchor="bottom", y=1.05, xanchor="right", x=1)
         )
-        fig1.update_xaxes(type='category')
+        fig1.update_xaxes(**x_axis_args)
         
         max_mt_daily = df_daily_mt[['MTBA', 'MTTR', 'MTBI']].max().max()
         max_mt_cum = df_daily_mt[['MTBA_cum_avg', 'MTTR_cum_avg', 'MTBI_cum_avg']].max().max()
-        fig1.update_yaxes(title_text="일별 측정 수치", secondary_y=False, range=[0, max_mt_daily * 1.2 if max_mt_daily > 0 else 10])
+        fig1.update_yaxes(title_text=f"{unit} 측정 수치", secondary_y=False, range=[0, max_mt_daily * 1.2 if max_mt_daily > 0 else 10])
         fig1.update_yaxes(title_text="누적 평균 수치", secondary_y=True, showgrid=False, range=[0, max_mt_cum * 1.2 if max_mt_cum > 0 else 10])
         
         st.plotly_chart(fig1, use_container_width=True, theme="streamlit")
@@ -237,7 +241,7 @@ class EquipmentDataTab:
         with col_g1:
             st.markdown("#### 🍩 에러 발생 모듈 (Err.Point) 점유율")
             if not df_filtered.empty:
-                err_point_counts = df_filtered.groupby('Err.Point')['Errorcount'].sum().reset_index()
+                err_point_counts = df_filtered.groupby('Err.Point', observed=True)['Errorcount'].sum().reset_index()
                 err_point_counts = err_point_counts[(err_point_counts['Err.Point'] != "") & (err_point_counts['Errorcount'] > 0)]
                 
                 if not err_point_counts.empty:
@@ -253,7 +257,7 @@ class EquipmentDataTab:
         with col_g2:
             st.markdown("#### 📊 장애 분류별 발생 건수")
             if not df_filtered.empty:
-                type_counts = df_filtered.groupby('분류')['Errorcount'].sum().reset_index()
+                type_counts = df_filtered.groupby('분류', observed=True)['Errorcount'].sum().reset_index()
                 type_counts = type_counts[(type_counts['분류'] != "") & (type_counts['Errorcount'] > 0)].sort_values(by='Errorcount', ascending=True)
                 
                 if not type_counts.empty:
@@ -262,7 +266,7 @@ class EquipmentDataTab:
                         x=type_counts['Errorcount'], 
                         orientation='h', 
                         marker_color='#F39C12',
-                        text=type_counts['Errorcount'].apply(lambda x: f"<b>{x:,.0f}</b>"), 
+                        text=labels(type_counts['Errorcount']), 
                         textposition='outside', 
                         textfont=dict(size=14) 
                     )])
@@ -274,3 +278,57 @@ class EquipmentDataTab:
                     st.info("해당 기간에 분류 데이터가 없습니다.")
             else:
                 st.info("해당 기간에 분류 데이터가 없습니다.")
+
+    @staticmethod
+    def flag_trace(df_daily, x_vals, flag_dates, col, freq):
+        """SPC 이상 판정 날짜(주간/월간이면 그 날짜가 속한 구간)를 ✖ 표시하는 trace"""
+        flag_dates = pd.Series(pd.to_datetime(flag_dates).unique())
+        if FREQ_RULES[freq] is not None:
+            flag_dates = flag_dates.dt.to_period(FREQ_RULES[freq]).dt.start_time
+        positions = np.flatnonzero(df_daily['Date'].isin(flag_dates).to_numpy())
+        return go.Scatter(
+            x=[x_vals[i] for i in positions], y=df_daily[col].to_numpy()[positions],
+            mode='markers', name='⚠️ 이상 감지 (SPC)',
+            marker=dict(symbol='x', size=14, color='#C0392B', line=dict(width=2))
+        )
+
+    # ==========================================
+    # 🗄️ 오래된 Jam 데이터 보관 (관리자용)
+    # ==========================================
+    def render_archive_admin(self, target_tab):
+        sid = self.db_jam.spreadsheet_id
+        with st.sidebar.expander("🗄️ 오래된 Jam 데이터 보관 (관리자)"):
+            parts = JAM_ARCHIVE.manifest(sid, target_tab)["partitions"]
+            if parts:
+                st.caption(f"보관된 달: {min(parts)} ~ {max(parts)} ({len(parts)}개월, {sum(p['rows'] for p in parts.values())}건)")
+            else:
+                st.caption("보관된 데이터가 없습니다.")
+            st.caption(f"최근 {JAM_HOT_MONTHS}개월(이번 달 포함)만 장비 탭에 남기고, 그 이전 달은 같은 스프레드시트의 '{archive_tab(target_tab)}' 탭으로 옮깁니다.")
+            # ★ 보관은 장비 탭에서 행을 지우므로 관리자 비밀번호 + 확인 체크를 거쳐야 실행됩니다.
+            expected = _admin_password()
+            if expected is None:
+                st.caption(f"🔒 st.secrets 에 {ADMIN_PASSWORD_SECRET} 가 설정되어 있어야 보관을 실행할 수 있습니다.")
+                return
+            password = st.text_input("관리자 비밀번호", type="password", key="jam_archive_password")
+            if not password:
+                return
+            if not hmac.compare_digest(str(password).encode("utf-8"), str(expected).encode("utf-8")):
+                st.error("🚨 관리자 비밀번호가 맞지 않습니다.")
+                return
+            cutoff = hot_cutoff().strftime("%Y-%m-%d")
+            confirmed = st.checkbox(
+                f"'{target_tab}' 탭에서 {cutoff} 이전 행을 '{archive_tab(target_tab)}' 탭으로 옮기고 지우는 것을 확인합니다.",
+                key=f"jam_archive_confirm_{target_tab}_{st.session_state.get('jam_archive_runs', 0)}"
+            )
+            if st.button(f"'{target_tab}' 보관 실행", key="jam_archive_btn", disabled=not confirmed):
+                # 한 번 실행하면 확인 체크는 새로 받습니다.
+                st.session_state["jam_archive_runs"] = st.session_state.get("jam_archive_runs", 0) + 1
+                try:
+                    moved = JAM_ARCHIVE.archive(sid, target_tab)
+                except Exception as e:
+                    st.error(f"🚨 보관 실패: {e}")
+                else:
+                    if moved:
+                        st.success("✅ " + ", ".join(f"{m} {n}건" for m, n in moved.items()) + " 보관 완료")
+                    else:
+                        st.info("보관할 오래된 데이터가 없습니다.")
@@ -0,0 +1,106 @@
+import streamlit as st
+import plotly.graph_objects as go
+import plotly.express as px
+from plotly.subplots import make_subplots
+from config import DataManager, JAM_SHEET_OPTIONS
+from schema import JAM_COLUMNS
+from jam_cube import hot_cubes, fleet_cube
+from metrics import daily_table, reliability, ranking
+import datetime
+import time
+
+FREQ_OPTIONS = {"일별": "D", "주간": "W", "월간": "M"}
+
+
+class FleetCompareTab:
+    def __init__(self, db_jam):
+        self.db_jam = db_jam
+
+    def render(self):
+        st.markdown("<div style='height: 5px;'></div>", unsafe_allow_html=True)
+        st.markdown("### 🏭 SLH1 전 호기 비교 분석")
+        st.markdown("<hr style='margin-top: 5px; margin-bottom: 15px;'>", unsafe_allow_html=True)
+
+        sid = self.db_jam.spreadsheet_id
+        col1, col2, col3 = st.columns([4, 4, 2])
+        with col1:
+            selected = st.multiselect("비교할 장비", JAM_SHEET_OPTIONS, default=JAM_SHEET_OPTIONS)
+        if not selected:
+            st.info("💡 비교할 장비를 선택해주세요.")
+            return
+
+        # ==========================================
+        # 1. 전 호기 데이터 로드 (★ 캐시에 없는 탭은 한 번의 일괄 호출, 탭별 집계는 동시에)
+        # ==========================================
+        started = time.perf_counter()
+        try:
+            loaded = DataManager.load_entries(sid, JAM_SHEET_OPTIONS, JAM_COLUMNS)
+            last_dates = [c['Date'].max() for c in hot_cubes(loaded).values() if not c.empty]
+        except Exception as e:
+            st.error(f"🚨 데이터 로드 실패: {e}")
+            return
+
+        max_date_data = max(last_dates).date() if last_dates else datetime.date.today()
+        with col2:
+            date_range = st.date_input(
+                "📅 조회 기간 선택", value=(max_date_data - datetime.timedelta(days=30), max_date_data), key="fleet_date_range"
+            )
+        with col3:
+            freq_label = st.radio("집계 단위", list(FREQ_OPTIONS), horizontal=True, key="fleet_freq")
+
+        if len(date_range) == 2:
+            start_date, end_date = date_range
+        elif len(date_range) == 1:
+            start_date = end_date = date_range[0]
+        else:
+            st.warning("날짜를 선택해주세요.")
+            return
+
+        cube = fleet_cube(sid, selected, start_date, end_date, loaded=loaded)
+        # ★ 합쳐진 집계표 하나로 전 장비 지표 / 순위를 한 번에 계산합니다 (metrics.py)
+        daily = daily_table(cube, start_date, end_date, by="장비")
+        trend = reliability(daily, freq=FREQ_OPTIONS[freq_label], by="장비")
+        rank = ranking(daily, cube, by="장비")
+        st.caption(f"⏱️ {len(selected)}대 로드 및 집계 {time.perf_counter() - started:.2f}초")
+
+        if cube.empty:
+            st.info("해당 기간에 데이터가 없습니다.")
+            return
+
+        # ==========================================
+        # 2. 추이 비교 (PPJ / Jam 발생 / MTBA / MTTR)
+        # ==========================================
+        date_title_str = f"{start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}"
+        st.markdown(f"#### 📈 {date_title_str} {freq_label} 추이 비교")
+
+        panels = [("PPJ", "PPJ"), ("Errorcount", "Jam 발생"), ("MTBA", "MTBA"), ("MTTR", "MTTR")]
+        fig = make_subplots(rows=2, cols=2, subplot_titles=[title for _, title in panels], shared_xaxes=True, vertical_spacing=0.12)
+        colors = px.colors.qualitative.Plotly
+        for i, name in enumerate(selected):
+            part = trend[trend["장비"] == name]
+            for j, (col, _) in enumerate(panels):
+                fig.add_trace(go.Scatter(
+                    x=part["Date"], y=part[col], mode="lines+markers", name=name,
+                    legendgroup=name, showlegend=(j == 0), line=dict(color=colors[i % len(colors)], width=2)
+                ), row=j // 2 + 1, col=j % 2 + 1)
+        fig.update_layout(height=650, margin=dict(l=20, r=20, t=40, b=20), hovermode="x unified",
+                          legend=dict(orientation="h", yanchor="bottom", y=1.05, xanchor="right", x=1))
+        st.plotly_chart(fig, use_container_width=True, theme="streamlit")
+
+        # ==========================================
+        # 3. 장비 순위 (PPJ 낮은 순 = 개선이 필요한 순)
+        # ==========================================
+        st.markdown(f"#### 🏆 {date_title_str} 장비 순위 (PPJ 낮은 순)")
+        st.dataframe(
+            rank, use_container_width=True, hide_index=True,
+            column_config={
+                "생산량": st.column_config.NumberColumn(format="localized"),
+                "Jam": st.column_config.NumberColumn(format="localized"),
+                "PPJ": st.column_config.NumberColumn(format="localized"),
+                "Jam_Rate": st.column_config.NumberColumn("천 개당 Jam", format="%.2f"),
+                "MTBA": st.column_config.NumberColumn(format="%.1f"),
+                "MTTR": st.column_config.NumberColumn(format="%.1f"),
+                "MTBI": st.column_config.NumberColumn(format="%.1f"),
+                "최다 Err.Point Jam": st.column_config.NumberColumn(format="localized"),
+            }
+        )
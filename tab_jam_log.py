@@ -1,8 +1,36 @@
 import streamlit as st
 import pandas as pd
-import io
+import time
 from datetime import datetime
-from config import DataManager
+from config import DataManager, APPEND_QUEUE, JAM_SHEET_OPTIONS, ROW_ID_COLUMN, RowConflictError
+from schema import JAM_COLUMNS
+from error_catalog import get_error_catalog
+from jam_search import get_search_index, search_all, search_archive
+from jam_archive import JAM_ARCHIVE, archive_tab
+from similar_cases import find_similar, get_similar_index, warm as warm_similar_cases
+from export import xlsx_download, XLSX_MIME
+
+ALL_EQUIPMENT = "전체 장비"
+
+# 상세 검색: 입력창(session key) → 검색 대상 컬럼
+CTRL_F_RULES = [
+    ("date_search", "Date"),
+    ("total_unit", "Totalunit"),
+    ("err_code", "Errorcode"),
+    ("err_cnt", "Errorcount"),
+    ("err_point", "Err.Point"),
+    ("err_msg", "Error Masage"),
+    ("symp", "현상"),
+    ("cause", "원인"),
+    ("action", "조치"),
+    ("worker", "조치자"),
+    ("mtba", "MTBA"),
+    ("mttr", "MTTR"),
+    ("mtbi", "MTBI")
+]
+
+# 누적 이력 표: 현재 페이지만 화면(브라우저)으로 보냅니다.
+JAM_PAGE_SIZES = [50, 100, 200, 500]
 
 class JamLogTab:
     def __init__(self, db_jam):
@@ -104,6 +132,8 @@ class JamLogTab:
                     st.session_state[k] = ""
             
             # 2. ★ 먹통의 원인이었던 '드롭다운' 필터 완벽 분기 처리
+            if not search_mode_active and st.session_state.get("equip_val") == ALL_EQUIPMENT:
+                st.session_state.equip_val = JAM_SHEET_OPTIONS[0]  # '전체 장비'는 검색 모드 전용
             if not search_mode_active:
                 st.session_state.err_cnt = "1" 
                 st.session_state.type_val = "S/W Logic 불량"
@@ -116,55 +146,46 @@ class JamLogTab:
             st.success(st.session_state.save_success_msg)
             st.session_state.save_success_msg = ""
 
+        # 쓰기 큐에 넣은 행의 구글 시트 전송 상태 표시
+        tickets = st.session_state.get("jam_append_tickets", [])
+        if tickets:
+            states = [APPEND_QUEUE.status(t) for t in tickets]
+            retrying = [msg for state, msg in states if state == "retrying"]
+            pending_cnt = sum(1 for state, _ in states if state in ("pending", "retrying"))
+            if retrying:
+                st.warning(f"⚠️ 구글 시트 전송 재시도 중 ({pending_cnt}건 대기) - 입력하신 내용은 안전하게 보관되어 있습니다. (상세에러: {retrying[-1]})")
+            elif pending_cnt:
+                st.caption(f"⏳ 구글 시트로 전송 대기 중 ({pending_cnt}건)")
+            st.session_state.jam_append_tickets = [t for t, (state, _) in zip(tickets, states) if state in ("pending", "retrying")]
+
         # ==========================================
         # 자동완성 로직 (입력 모드에서만 동작)
         # ==========================================
+        def error_list_tab(equip_name):
+            return "SLH1_R-Dimm&LPCAMM ErrorList" if equip_name == "SLH1 #1" else "SLH1_SoCAMM ErrorList"
+
         def autofill(source_field):
             if st.session_state.get('search_mode', False): return 
             
             equip_name = st.session_state.get("equip_val", "SLH1 #1")
-            target_error_tab = "SLH1_R-Dimm&LPCAMM ErrorList" if equip_name == "SLH1 #1" else "SLH1_SoCAMM ErrorList"
-                
+            search_val = str(st.session_state.get(source_field, "")).strip()
+            if not search_val: return
+
+            # ★ 공유 에러 카탈로그(메모리 색인)에서 바로 찾습니다 - 시트 다운로드/정규식 변환 없음
             try:
-                db_err = DataManager(self.db_jam.spreadsheet_id, target_error_tab)
-                df_err, _ = db_err.load()
-                if df_err.empty: return 
+                catalog = get_error_catalog(self.db_jam.spreadsheet_id, error_list_tab(equip_name))
             except Exception:
                 return 
-            
-            search_val = str(st.session_state.get(source_field, "")).strip()
-            if not search_val: return
 
-            df_err = df_err.fillna("")
-            for col in df_err.columns:
-                df_err[col] = df_err[col].astype(str).str.replace(r"\.0$", "", regex=True).str.strip()
-            
-            def get_real_col(*possible_names):
-                for c in df_err.columns:
-                    c_clean = str(c).lower().replace(" ", "")
-                    for p in possible_names:
-                        if c_clean == p.lower().replace(" ", ""): return c
-                return None
-
-            col_code = get_real_col("errorcode", "알람코드", "code")
-            col_point = get_real_col("err.point", "모듈", "point", "errpoint")
-            col_msg = get_real_col("errormasage", "알람명", "errormessage", "message", "error message")
-            
-            source_to_col = {"err_code": col_code, "err_point": col_point, "err_msg": col_msg}
-            search_col = source_to_col.get(source_field)
-            
-            if search_col and search_col in df_err.columns:
-                match = df_err[df_err[search_col].str.lower() == search_val.lower()]
-                if match.empty: 
-                    match = df_err[df_err[search_col].str.contains(search_val, case=False, na=False)]
-                
-                if not match.empty:
-                    row = match.iloc[0] 
-                    if source_field != "err_code" and col_code: st.session_state.err_code = str(row[col_code])
-                    if source_field != "err_point" and col_point: st.session_state.err_point = str(row[col_point])
-                    if source_field != "err_msg" and col_msg: st.session_state.err_msg = str(row[col_msg])
+            field = {"err_code": "code", "err_point": "point", "err_msg": "msg"}.get(source_field)
+            found = catalog.lookup(field, search_val) if field else None
+            if found:
+                columns = catalog.columns()
+                if source_field != "err_code" and columns.get("code"): st.session_state.err_code = found["code"]
+                if source_field != "err_point" and columns.get("point"): st.session_state.err_point = found["point"]
+                if source_field != "err_msg" and columns.get("msg"): st.session_state.err_msg = found["msg"]
 
-        DB_SHEET_OPTIONS = ["SLH1 #1", "SLH1 #4", "SLH1 #5", "SLH1 #6", "SLH1 #7"]
+        DB_SHEET_OPTIONS = JAM_SHEET_OPTIONS
 
         # ==========================================
         # 입력 및 검색 폼
@@ -174,7 +195,8 @@ class JamLogTab:
                 st.info("🔍 **[검색 모드 활성화]** 단어를 입력하고 Enter를 누르면 해당 열에서 데이터를 찾아냅니다. (엑셀 Ctrl+F와 동일)")
 
             r1 = st.columns([1.8, 1.2, 1.0, 1.2, 1.2, 0.8])
-            with r1[0]: equip_val = st.selectbox("장비명", DB_SHEET_OPTIONS, key="equip_val")
+            equip_options = [ALL_EQUIPMENT] + DB_SHEET_OPTIONS if search_mode_active else DB_SHEET_OPTIONS
+            with r1[0]: equip_val = st.selectbox("장비명", equip_options, key="equip_val")
             with r1[1]: 
                 if search_mode_active:
                     date_val_search = st.text_input("Date (예: 2024-05)", key="date_search")
@@ -240,24 +262,52 @@ class JamLogTab:
                 with r6[4]: action_loc_val = st.text_input("조치위치", key="action_loc")
                 with r6[5]: result_val = st.selectbox("조치결과", ["완료", "진행중", "대기"], key="result")
 
+        # ==========================================
+        # 🧭 유사 과거 사례 (입력 모드에서 현상 / ErrorMassage 입력 시)
+        # ==========================================
+        if not search_mode_active:
+            self.render_similar_cases(equip_val, err_msg_val, symp_val)
+
         # ==========================================
         # DB 연결 및 데이터 로드 
         # ==========================================
-        exact_columns = [
-            "Date", "Totalunit", "Errorcode", "Errorcount", "Error Masage", 
-            "현상", "원인", "조치", "Err.Point", "분류", "조치자", "Err. Time", 
-            "MTBA", "MTTR", "MTBI", "도번", "수량", "입고일", "반입일", "조치위치", "조치결과"
-        ]
+        exact_columns = JAM_COLUMNS
+
+        if equip_val == ALL_EQUIPMENT:
+            if btn_write:
+                st.warning("🚨 현재 '검색 모드'가 켜져 있습니다. 데이터를 저장하시려면 우측의 [❌ 검색 종료] 버튼을 눌러주세요.")
+            self.render_fleet_search(exact_columns)
+            return
         
         db_machine = None
         df_machine = pd.DataFrame(columns=exact_columns)
+        df_archived = pd.DataFrame(columns=exact_columns)
 
         try:
             db_machine = DataManager(self.db_jam.spreadsheet_id, equip_val, exact_columns)
-            df_machine, _ = db_machine.load()
+            # 행 번호(_row)를 붙여 읽어서, 페이지에서 고친 행만 시트의 해당 행에 다시 씁니다.
+            df_machine, _ = db_machine.load(with_row_ids=True, with_row_keys=False)
         except Exception as e:
             st.error(f"🚨 구글 시트 연결 실패: '{equip_val}' 탭 연결 중 오류가 발생했습니다. (상세에러: {e})")
 
+        # ★ 보관 탭("<탭> 보관")으로 옮긴 이전 달도 같이 보여줍니다 (읽기 전용, jam_archive.py)
+        if db_machine is not None:
+            try:
+                if search_mode_active:
+                    df_archived = search_archive(
+                        self.db_jam.spreadsheet_id, equip_val, exact_columns,
+                        [c for _, c in CTRL_F_RULES], self.search_criteria(exact_columns)
+                    )
+                else:
+                    df_archived = JAM_ARCHIVE.archived_rows(self.db_jam.spreadsheet_id, equip_val, exact_columns)
+            except Exception as e:
+                st.warning(f"⚠️ '{archive_tab(equip_val)}' 탭을 읽지 못해 보관된 이전 달은 빠졌습니다. (상세에러: {e})")
+
+        # 자동완성용 에러 카탈로그를 미리 올려둡니다 (프로세스 공유, 이미 있으면 바로 반환)
+        if not search_mode_active:
+            try: get_error_catalog(self.db_jam.spreadsheet_id, error_list_tab(equip_val))
+            except Exception: pass
+
         if btn_write:
             if search_mode_active:
                 st.warning("🚨 현재 '검색 모드'가 켜져 있습니다. 데이터를 저장하시려면 우측의 [❌ 검색 종료] 버튼을 눌러주세요.")
@@ -267,15 +317,18 @@ class JamLogTab:
                 try: final_err_cnt = int(err_cnt_val)
                 except ValueError: final_err_cnt = 1 
 
-                new_data = pd.DataFrame([{
+                new_data = {
                     "Date": date_val.strftime("%Y-%m-%d"), "Totalunit": total_unit_val, "Errorcode": err_code_val,
                     "Errorcount": final_err_cnt, "Error Masage": err_msg_val, "현상": symp_val, "원인": cause_val,
                     "조치": action_val, "Err.Point": err_point_val, "분류": type_val, "조치자": worker_val,
                     "Err. Time": time_val.strftime("%H:%M"), "MTBA": mtba_val, "MTTR": mttr_val, "MTBI": mtbi_val,
                     "도번": part_no_val, "수량": qty_val, "입고일": in_date_val, "반입일": out_date_val,
                     "조치위치": action_loc_val, "조치결과": result_val
-                }])
-                db_machine.save(pd.concat([df_machine, new_data], ignore_index=True).fillna(""))
+                }
+                # ★ 전체 시트를 다시 쓰지 않고 쓰기 큐에 넣어서 모아 보냅니다 (append_rows 1회)
+                ticket = db_machine.enqueue_row(new_data)
+                if ticket:
+                    st.session_state.setdefault("jam_append_tickets", []).append(ticket)
                 st.session_state.save_success_msg = f"✅ 정상 저장되었습니다."
                 st.session_state.clear_form = True 
                 st.rerun()
@@ -285,38 +338,31 @@ class JamLogTab:
         # ==========================================
         # 엑셀과 100% 동일한 직관적 Ctrl+F 필터링 로직
         # ==========================================
-        if db_machine is not None and not df_machine.empty:
+        if db_machine is not None and not (df_machine.empty and df_archived.empty):
             df_display = df_machine.copy()
-            
-            if search_mode_active:
-                # 필터 검색 규칙 맵핑
-                ctrl_f_rules = [
-                    ("date_search", "Date"),
-                    ("total_unit", "Totalunit"),
-                    ("err_code", "Errorcode"),
-                    ("err_cnt", "Errorcount"),
-                    ("err_point", "Err.Point"),
-                    ("err_msg", "Error Masage"),
-                    ("symp", "현상"),
-                    ("cause", "원인"),
-                    ("action", "조치"),
-                    ("worker", "조치자"),
-                    ("mtba", "MTBA"),
-                    ("mttr", "MTTR"),
-                    ("mtbi", "MTBI")
-                ]
+            if ROW_ID_COLUMN not in df_display.columns:
+                df_display[ROW_ID_COLUMN] = pd.Series(dtype=object)
+
+            include_archive = search_mode_active
+            if not search_mode_active and not df_archived.empty:
+                include_archive = st.toggle(
+                    f"🗄️ 보관된 이전 달 포함 ({len(df_archived)}건, 읽기 전용)", value=df_machine.empty, key="jam_include_archive"
+                )
 
+            if search_mode_active:
                 # 각 텍스트 입력창 확인하여 필터 적용
-                for state_key, exact_col_name in ctrl_f_rules:
-                    search_val = st.session_state.get(state_key, "")
-                    if search_val and exact_col_name in df_display.columns:
-                        search_str = str(search_val).strip()
-                        
-                        # 구글 시트 숫자 데이터에서 넘어올 수 있는 소수점(.0) 방어 처리 후 필터링
-                        col_data_str = df_display[exact_col_name].astype(str).str.replace(r"\.0$", "", regex=True)
-                        mask = col_data_str.str.contains(search_str, case=False, na=False, regex=False)
-                        df_display = df_display[mask]
+                # ★ 매번 전체 컬럼을 문자열 변환/스캔하지 않고, 장비 탭별 역색인(jam_search.py)의 교집합으로 찾습니다.
+                #   (구글 시트 숫자 데이터의 소수점(.0) 방어 처리는 색인을 만들 때 한 번만 합니다)
+                criteria = self.search_criteria(df_display.columns)
+                if criteria:
+                    search_index = get_search_index(self.db_jam.spreadsheet_id, equip_val, [c for _, c in CTRL_F_RULES])
+                    df_display = df_display.iloc[search_index.search(df_machine, db_machine.snapshot, criteria)]
+
+            if include_archive and not df_archived.empty:
+                # 보관된 행은 장비 탭의 행 번호가 없으므로 수정할 수 없습니다.
+                df_display = pd.concat([df_display, df_archived.assign(**{ROW_ID_COLUMN: pd.NA})], ignore_index=True)
 
+            if search_mode_active:
                 # 드롭다운 분류 필터 적용
                 type_val_search = st.session_state.get("type_val", "전체")
                 if type_val_search != "전체" and "분류" in df_display.columns:
@@ -329,34 +375,159 @@ class JamLogTab:
             with view_cols[0]:
                 st.markdown(f"#### 🔍 {equip_val} 누적 이력 조회 ({len(df_display)}건)")
             with view_cols[1]:
-                buffer = io.BytesIO()
-                try:
-                    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                        df_display.to_excel(writer, index=False, sheet_name='데이터')
-                    download_data = buffer.getvalue()
-                    file_name = f"{equip_val}_데이터_{datetime.now().strftime('%Y%m%d')}.xlsx"
-                    mime_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                except Exception:
-                    download_data = df_display.to_csv(index=False).encode('utf-8-sig') 
-                    file_name = f"{equip_val}_데이터_{datetime.now().strftime('%Y%m%d')}.csv"
-                    mime_type = "text/csv"
-
+                # ★ 엑셀 파일은 버튼을 눌렀을 때만 만들고, 같은 내용이면 캐시된 파일을 그대로 씁니다 (export.py)
                 st.download_button(
-                    label="📥 엑셀 다운로드", data=download_data, file_name=file_name, mime=mime_type,
-                    use_container_width=True, key="jam_log_download_btn" 
+                    label="📥 엑셀 다운로드", data=xlsx_download(df_display.drop(columns=[ROW_ID_COLUMN], errors="ignore"), "데이터"),
+                    file_name=f"{equip_val}_데이터_{datetime.now().strftime('%Y%m%d')}.xlsx", mime=XLSX_MIME,
+                    use_container_width=True, key="jam_log_download_btn", on_click="ignore"
                 )
             with view_cols[2]:
                 st.empty() 
 
+            # ★ 전체 이력 대신 현재 페이지만 표로 보내고, 행 번호(_row)를 인덱스로 숨겨서 편집 결과를 원래 행에 맞춥니다.
+            page_df = self.render_pager(equip_val, df_display).set_index(ROW_ID_COLUMN)
+
             if search_mode_active:
-                st.dataframe(df_display, use_container_width=True, hide_index=True)
+                st.dataframe(page_df, use_container_width=True, hide_index=True)
                 st.info("💡 검색 모드에서는 데이터 안전과 즉각적인 필터링을 위해 표가 '읽기 전용'으로 전환됩니다.")
+            elif include_archive:
+                st.dataframe(page_df, use_container_width=True, hide_index=True)
+                st.info("💡 보관된 이전 달을 함께 볼 때는 표가 '읽기 전용'입니다. 수정하시려면 보관 포함을 꺼주세요.")
             else:
-                edited_df = st.data_editor(df_display, use_container_width=True, hide_index=True, num_rows="dynamic")
+                # 페이지마다 편집 상태를 따로 둡니다 (다른 페이지로 넘어가면 저장하지 않은 편집은 사라짐)
+                edited_df = st.data_editor(
+                    page_df, use_container_width=True, hide_index=True, num_rows="dynamic",
+                    key=f"jam_editor_{equip_val}_{st.session_state.jam_page_size}_{st.session_state.jam_page}"
+                )
                 if st.button(f"💾 '{equip_val}' 표 변경사항 저장", type="primary"):
-                    db_machine.save(edited_df.fillna(""))
-                    st.success("✅ 변경사항이 저장되었습니다!")
-                    st.rerun()
+                    try:
+                        updated, deleted, added = self.save_page_edits(db_machine, page_df, edited_df)
+                    except RowConflictError as err:
+                        st.error(f"🚨 {err}")
+                    else:
+                        st.session_state.save_success_msg = f"✅ 변경사항이 저장되었습니다! (수정 {updated}건 · 삭제 {deleted}건 · 추가 {added}건)"
+                        st.rerun()
                         
         elif db_machine is not None:
             st.info(f"'{equip_val}' 시트에 등록된 데이터가 없습니다.")
+
+    def render_similar_cases(self, equip_val, err_msg_val, symp_val):
+        sid = self.db_jam.spreadsheet_id
+        # 점수가 같으면 지금 고른 장비의 이력이 먼저 나오도록 순서를 둡니다.
+        names = [equip_val] + [n for n in JAM_SHEET_OPTIONS if n != equip_val]
+        query = f"{err_msg_val} {symp_val}".strip()
+        if not query:
+            warm_similar_cases(sid, names)  # 입력 전에 색인을 미리 준비 (백그라운드)
+            return
+
+        # ★ 메모리 TF-IDF 색인만 조회하므로 입력할 때마다 불러도 폼이 느려지지 않습니다 (similar_cases.py)
+        started = time.perf_counter()
+        found = find_similar(sid, names, query)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with st.expander(f"🧭 유사 과거 사례 ({len(found)}건)", expanded=not found.empty):
+            if not found.empty:
+                st.dataframe(
+                    found, use_container_width=True, hide_index=True,
+                    column_config={"유사도": st.column_config.ProgressColumn("유사도", format="%d%%", min_value=0, max_value=100)}
+                )
+            elif not get_similar_index(sid, equip_val).ready:
+                st.caption("⏳ 과거 이력 색인을 준비 중입니다. 잠시 후 다시 표시됩니다.")
+            else:
+                st.caption("비슷한 과거 이력이 없습니다.")
+            st.caption(f"조회 {elapsed_ms:.1f} ms")
+
+    def render_pager(self, equip_val, df_display):
+        """페이지 크기/번호 선택 + 건수 표시 → 현재 페이지에 해당하는 행만 반환"""
+        if st.session_state.get("jam_page_equip") != equip_val:
+            st.session_state.jam_page_equip = equip_val
+            st.session_state.jam_page = 1
+
+        total = len(df_display)
+        page_cols = st.columns([1.2, 1.2, 5.6])
+        with page_cols[0]:
+            page_size = st.selectbox("페이지당 행 수", JAM_PAGE_SIZES, key="jam_page_size")
+        pages = max((total - 1) // page_size + 1, 1)
+        if not 1 <= st.session_state.get("jam_page", 1) <= pages:
+            st.session_state.jam_page = min(max(st.session_state.get("jam_page", 1), 1), pages)
+        with page_cols[1]:
+            page = st.number_input(f"페이지 (총 {pages})", min_value=1, max_value=pages, step=1, key="jam_page")
+        start = (page - 1) * page_size
+        end = min(start + page_size, total)
+        with page_cols[2]:
+            st.caption(f"전체 {total}건 중 {start + 1 if total else 0}–{end}번째 표시")
+        return df_display.iloc[start:end]
+
+    def save_page_edits(self, db_machine, page_df, edited_df):
+        """페이지 편집 결과를 행 번호 기준으로 원래 페이지와 비교해서, 바뀐 행만 시트에 반영 → (수정, 삭제, 추가) 건수
+
+        수정/삭제는 save_row_edits 한 번으로(대상 행 읽기 1번 + 수정 1번 + 삭제 1번), 새 행은 쓰기 큐(enqueue_row)로 보냅니다.
+        """
+        before = page_df.fillna("").astype(str)
+        edited = edited_df.fillna("")
+        kept = edited.index.isin(before.index)
+
+        updates = {}
+        for row_id, row in edited[kept].iterrows():
+            changes = {col: row[col] for col in edited.columns if str(row[col]) != before.at[row_id, col]}
+            if changes:
+                updates[row_id] = changes
+        deleted_ids = sorted(set(before.index) - set(edited.index[kept]))
+        touched = sorted(set(updates) | set(deleted_ids))
+        if touched:
+            db_machine.save_row_edits(updates, deleted_ids, dict(zip(touched, db_machine.row_keys(touched))))
+        updated = len(updates)
+
+        added = 0
+        for _, row in edited[~kept].iterrows():
+            if not any(str(v).strip() for v in row.values):
+                continue
+            ticket = db_machine.enqueue_row(row.to_dict())
+            if ticket:
+                st.session_state.setdefault("jam_append_tickets", []).append(ticket)
+            added += 1
+        return updated, len(deleted_ids), added
+
+    def search_criteria(self, columns):
+        """상세 검색 입력창 값 → {컬럼: 검색어}"""
+        criteria = {}
+        for state_key, exact_col_name in CTRL_F_RULES:
+            search_val = st.session_state.get(state_key, "")
+            if search_val and exact_col_name in columns:
+                criteria[exact_col_name] = str(search_val).strip()
+        return criteria
+
+    # ==========================================
+    # 🌐 전체 장비 동시 검색 (검색 모드 전용)
+    # ==========================================
+    def render_fleet_search(self, exact_columns):
+        criteria = self.search_criteria(exact_columns)
+        type_val_search = st.session_state.get("type_val", "전체")
+        type_filter = None if type_val_search == "전체" else type_val_search
+
+        title_slot = st.empty()
+        status_slot = st.empty()
+        table_slot = st.empty()
+        title_slot.markdown(f"#### 🔍 {ALL_EQUIPMENT} 누적 이력 조회 (검색 중...)")
+
+        # ★ 장비 탭을 동시에 읽고 검색하며, 끝난 장비부터 표에 바로 붙여서 보여줍니다.
+        parts, timings = [], []
+        for name, found, elapsed, err in search_all(
+            self.db_jam.spreadsheet_id, JAM_SHEET_OPTIONS, exact_columns,
+            [c for _, c in CTRL_F_RULES], criteria, type_filter
+        ):
+            if err is not None:
+                timings.append(f"❌ {name} 실패 ({elapsed:.2f}초, {err})")
+            else:
+                timings.append(f"✅ {name} {len(found)}건 ({elapsed:.2f}초)")
+                if not found.empty:
+                    parts.append(found.assign(장비=name))
+
+            merged = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=["장비"] + list(exact_columns))
+            if "Date" in merged.columns and not merged.empty:
+                merged = merged.sort_values(by=["Date", "Err. Time"], ascending=[False, False]).reset_index(drop=True)
+            merged = merged[["장비"] + [c for c in merged.columns if c != "장비"]]
+            status_slot.caption(" · ".join(timings))
+            table_slot.dataframe(merged, use_container_width=True, hide_index=True)
+
+        title_slot.markdown(f"#### 🔍 {ALL_EQUIPMENT} 누적 이력 조회 ({len(merged)}건)")
+        st.info("💡 전체 장비 검색 결과는 '읽기 전용'입니다. 수정하시려면 장비를 선택해주세요.")
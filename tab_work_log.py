@@ -1,14 +1,17 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
-from config import EQUIPMENT_OPTIONS
+from config import EQUIPMENT_OPTIONS, APPEND_QUEUE, ROW_ID_COLUMN, ROW_KEY_COLUMN, RowConflictError
+from export import xlsx_download, XLSX_MIME
 
 class WorkLogTab:
     def __init__(self, db_log):
         self.db_log = db_log
 
     def render(self):
-        df_log, _ = self.db_log.load()
+        # ★ 행 번호/내용 지문을 같이 받아서, 수정/삭제 때 해당 행 하나만 시트에 보냅니다.
+        df_log, _ = self.db_log.load(with_row_ids=True)
+        hidden_cols = ['날짜_dt', ROW_ID_COLUMN, ROW_KEY_COLUMN]
         
         if not df_log.empty and '날짜' in df_log.columns:
             df_log['날짜_dt'] = pd.to_datetime(df_log['날짜'], errors='coerce')
@@ -17,6 +20,17 @@ class WorkLogTab:
 
         st.sidebar.markdown("---")
         st.sidebar.markdown("### 📝 일지 작성/수정/삭제")
+
+        # 쓰기 큐에 넣은 일지의 구글 시트 전송 상태 표시
+        tickets = st.session_state.get("work_log_append_tickets", [])
+        if tickets:
+            states = [APPEND_QUEUE.status(t) for t in tickets]
+            pending_cnt = sum(1 for state, _ in states if state in ("pending", "retrying"))
+            if any(state == "retrying" for state, _ in states):
+                st.sidebar.warning(f"⚠️ 구글 시트 전송 재시도 중 ({pending_cnt}건 대기)")
+            elif pending_cnt:
+                st.sidebar.caption(f"⏳ 구글 시트로 전송 대기 중 ({pending_cnt}건)")
+            st.session_state.work_log_append_tickets = [t for t, (state, _) in zip(tickets, states) if state in ("pending", "retrying")]
         mode = st.sidebar.selectbox("기능 선택", ["➕ 작성", "✏️ 수정", "❌ 삭제"])
         
         if mode == "➕ 작성":
@@ -28,9 +42,11 @@ class WorkLogTab:
                 a2 = st.text_input("첨부 2 (G-Drive 링크)") 
                 if st.form_submit_button("저장하기"):
                     user_name = st.session_state.get('user_name', '본인')
-                    new_row = pd.DataFrame([{"날짜": str(d), "장비": e, "작성자": user_name, "업무내용": c, "비고": a2.strip(), "첨부": a1.strip()}])
-                    save_df = pd.concat([df_log.drop(columns=['날짜_dt'], errors='ignore'), new_row], ignore_index=True)
-                    self.db_log.save(save_df)
+                    new_row = {"날짜": str(d), "장비": e, "작성자": user_name, "업무내용": c, "비고": a2.strip(), "첨부": a1.strip()}
+                    # ★ 전체 시트를 다시 쓰지 않고 쓰기 큐에 넣어서 모아 보냅니다
+                    ticket = self.db_log.enqueue_row(new_row)
+                    if ticket:
+                        st.session_state.setdefault("work_log_append_tickets", []).append(ticket)
                     st.cache_data.clear() 
                     st.rerun()
 
@@ -59,11 +75,14 @@ class WorkLogTab:
                 e_attach2 = st.text_input("첨부 2 수정 (G-Drive 링크)", value="" if pd.isna(val_attach2) else str(val_attach2))
                 
                 if st.form_submit_button("수정 완료"):
-                    df_log.loc[idx, ['날짜', '장비', '작성자', '업무내용', '비고', '첨부']] = [str(e_date), e_equip, e_author, e_content, e_attach2.strip(), e_attach1.strip()]
-                    save_df = df_log.drop(columns=['날짜_dt'], errors='ignore')
-                    self.db_log.save(save_df)
-                    st.cache_data.clear() 
-                    st.rerun()
+                    changes = {"날짜": str(e_date), "장비": e_equip, "작성자": e_author, "업무내용": e_content, "비고": e_attach2.strip(), "첨부": e_attach1.strip()}
+                    try:
+                        self.db_log.update_row(df_log.loc[idx, ROW_ID_COLUMN], changes, df_log.loc[idx, ROW_KEY_COLUMN])
+                    except RowConflictError as err:
+                        st.sidebar.error(f"🚨 {err}")
+                    else:
+                        st.cache_data.clear() 
+                        st.rerun()
 
         elif mode == "❌ 삭제" and not df_log.empty:
             idx = st.sidebar.selectbox(
@@ -73,10 +92,13 @@ class WorkLogTab:
             )
             st.sidebar.warning(f"내용: {str(df_log.loc[idx, '업무내용'])[:50]}...")
             if st.sidebar.button("🗑️ 최종 삭제 (복구 불가)", type="primary"):
-                save_df = df_log.drop(idx).drop(columns=['날짜_dt'], errors='ignore')
-                self.db_log.save(save_df)
-                st.cache_data.clear() 
-                st.rerun()
+                try:
+                    self.db_log.delete_row(df_log.loc[idx, ROW_ID_COLUMN], df_log.loc[idx, ROW_KEY_COLUMN])
+                except RowConflictError as err:
+                    st.sidebar.error(f"🚨 {err}")
+                else:
+                    st.cache_data.clear() 
+                    st.rerun()
                 
        # ==========================================
         # ★ 통일된 상단 대제목 및 엑셀 다운로드 버튼
@@ -87,27 +109,20 @@ class WorkLogTab:
             st.markdown("### 📝 팀 업무일지 대시보드")
                 
         with col_excel:
-            export_df = df_log.drop(columns=['날짜_dt'], errors='ignore') if not df_log.empty else df_log
+            export_df = df_log.drop(columns=hidden_cols, errors='ignore') if not df_log.empty else df_log
             export_df = export_df.rename(columns={"비고": "첨부 2", "첨부": "첨부 1"})
-            csv_data = export_df.to_csv(index=False, encoding='utf-8-sig').encode('utf-8-sig')
             
-            # 🚨 아래 다운로드 버튼 맨 끝에 key="..." 가 추가되었습니다!
+            # ★ 버튼을 눌렀을 때만 엑셀 생성 (같은 내용이면 캐시 사용)
             st.download_button(
                 label="📥 엑셀 다운로드", 
-                data=csv_data, 
-                file_name=f"work_log_{datetime.now().strftime('%Y%m%d')}.csv", 
+                data=xlsx_download(export_df, "업무일지"), 
+                file_name=f"work_log_{datetime.now().strftime('%Y%m%d')}.xlsx", 
+                mime=XLSX_MIME,
                 use_container_width=True,
-                key="work_log_download_btn"  # <--- 이 부분이 추가됨!
+                key="work_log_download_btn",
+                on_click="ignore"
             )
 
-        st.markdown("<hr style='margin-top: 5px; margin-bottom: 15px;'>", unsafe_allow_html=True)
-                
-        with col_excel:
-            export_df = df_log.drop(columns=['날짜_dt'], errors='ignore') if not df_log.empty else df_log
-            export_df = export_df.rename(columns={"비고": "첨부 2", "첨부": "첨부 1"})
-            csv_data = export_df.to_csv(index=False, encoding='utf-8-sig').encode('utf-8-sig')
-            st.download_button(label="📥 엑셀 다운로드", data=csv_data, file_name=f"work_log_{datetime.now().strftime('%Y%m%d')}.csv", use_container_width=True)
-
         st.markdown("<hr style='margin-top: 5px; margin-bottom: 5px;'>", unsafe_allow_html=True)
 
         filter_col1, filter_col2, filter_col3 = st.columns([3, 3, 4])
@@ -136,8 +151,7 @@ class WorkLogTab:
                 filtered_df['작성자'].astype(str).str.contains(keyword, na=False, case=False)
             ]
 
-        if '날짜_dt' in filtered_df.columns:
-            filtered_df = filtered_df.drop(columns=['날짜_dt'])
+        filtered_df = filtered_df.drop(columns=hidden_cols, errors='ignore')
 
         if '첨부' in filtered_df.columns:
             filtered_df['첨부'] = filtered_df['첨부'].apply(lambda x: x if pd.notna(x) and str(x).strip() != "" else None)
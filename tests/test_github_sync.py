@@ -0,0 +1,123 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from github_sync import GithubSync, LocalGitSource  # noqa: E402
+
+
+# ========================================================
+# GithubSync.sync_once 를 LocalGitSource(임시 git 저장소)로 돌려 봅니다
+# ========================================================
+def _git(repo, *args):
+    subprocess.run(
+        ["git", "-C", str(repo), "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        check=True,
+        capture_output=True,
+    )
+
+
+def _commit(repo, files=(), removed=(), message="update"):
+    """files: {경로: 내용} 을 쓰고 removed 를 지운 뒤 커밋"""
+    for path, text in dict(files).items():
+        dest = repo / path
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.write_text(text, encoding="utf-8")
+    for path in removed:
+        _git(repo, "rm", "-q", path)
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "--allow-empty", "-m", message)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = tmp_path / "remote"
+    path.mkdir()
+    _git(path, "init", "-q")
+    _commit(path, {"data/a.csv": "a,1\n", "data/sub/b.csv": "b,1\n", "README.md": "readme\n"}, message="init")
+    return path
+
+
+@pytest.fixture
+def sync(repo, tmp_path):
+    return GithubSync(LocalGitSource(str(repo)), root=str(tmp_path / "local"))
+
+
+def _read(sync, path):
+    with open(os.path.join(sync.root, *path.split("/")), encoding="utf-8") as f:
+        return f.read()
+
+
+def _exists(sync, path):
+    return os.path.exists(os.path.join(sync.root, *path.split("/")))
+
+
+def test_first_sync_downloads_prefix_only(sync):
+    result = sync.sync_once()
+    assert result["status"] == "synced"
+    assert sorted(result["updated"]) == ["data/a.csv", "data/sub/b.csv"]
+    assert result["downloaded"] == 2
+    assert _read(sync, "data/a.csv") == "a,1\n"
+    assert _read(sync, "data/sub/b.csv") == "b,1\n"
+    assert not _exists(sync, "README.md")
+
+
+def test_add_modify_delete(repo, sync):
+    sync.sync_once()
+    _commit(repo, {"data/a.csv": "a,2\n", "data/c.csv": "c,1\n"}, removed=["data/sub/b.csv"])
+
+    result = sync.sync_once()
+    assert result["status"] == "synced"
+    assert sorted(result["updated"]) == ["data/a.csv", "data/c.csv"]
+    assert result["removed"] == ["data/sub/b.csv"]
+    assert result["downloaded"] == 2
+    assert _read(sync, "data/a.csv") == "a,2\n"
+    assert _read(sync, "data/c.csv") == "c,1\n"
+    assert not _exists(sync, "data/sub/b.csv")
+
+
+def test_same_content_is_not_downloaded_again(repo, sync):
+    sync.sync_once()
+    _commit(repo, {"data/copy.csv": "a,1\n"})  # a.csv 와 같은 blob
+
+    result = sync.sync_once()
+    assert result["updated"] == ["data/copy.csv"]
+    assert result["downloaded"] == 0
+    assert _read(sync, "data/copy.csv") == "a,1\n"
+
+
+def test_unchanged_head_stops_at_etag(sync):
+    sync.sync_once()
+    result = sync.sync_once()
+    assert result == {"status": "unchanged", "downloaded": 0, "updated": [], "removed": [], "calls": 1}
+
+
+def test_commit_outside_prefix_stops_at_tree(repo, sync):
+    sync.sync_once()
+    _commit(repo, {"README.md": "changed\n"})
+
+    result = sync.sync_once()
+    assert result["status"] == "unchanged"
+    assert result["updated"] == [] and result["removed"] == []
+    assert result["calls"] == 2  # head + 루트 트리 조회만
+    assert sync.sync_once()["calls"] == 1  # 새 ETag 가 저장됨
+
+
+def test_state_survives_restart(repo, sync):
+    sync.sync_once()
+    restarted = GithubSync(LocalGitSource(str(repo)), root=sync.root)
+    assert restarted.sync_once()["status"] == "unchanged"
+
+
+def test_locally_deleted_file_is_restored(repo, sync):
+    sync.sync_once()
+    os.remove(os.path.join(sync.root, "data", "a.csv"))
+    _commit(repo, {"data/c.csv": "c,1\n"})
+
+    result = sync.sync_once()
+    assert sorted(result["updated"]) == ["data/a.csv", "data/c.csv"]
+    assert result["downloaded"] == 1  # a.csv 는 보관소에서 복사
+    assert _read(sync, "data/a.csv") == "a,1\n"